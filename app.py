@@ -14,8 +14,10 @@ from src.utils.file_loader import load_and_validate_data
 from src.utils.database_loader import (
     render_database_connection_ui,
     load_from_database,
+    load_raw_rows,
     validate_database_data
 )
+from src.utils.sales_index import get_sales_index, select_sales
 from src.ui.components import (
     show_data_statistics,
     render_sidebar,
@@ -73,9 +75,16 @@ def main():
             df_raw, success = load_from_database(db_config)
             if success and df_raw is not None:
                 df = validate_database_data(df_raw)
+                # Сохраняем набор и подключение для последующих перезапусков
+                st.session_state.db_data = df
+                st.session_state.db_config = db_config
+                # Исходные строки прежнего набора больше не относятся к нему
+                st.session_state.pop('raw_rows', None)
+        elif 'db_data' in st.session_state:
+            df = st.session_state.db_data
 
     # Рендер боковой панели с параметрами
-    forecast_days, remove_outliers, smooth_method, smooth_window = render_sidebar()
+    forecast_days, remove_outliers, smooth_method, smooth_window, profile = render_sidebar()
 
     # Проверка наличия данных
     if df is None:
@@ -105,7 +114,8 @@ def main():
             forecast_days,
             remove_outliers,
             smooth_method,
-            smooth_window
+            smooth_window,
+            profile
         )
         # Обновляем состояние
         st.session_state.selected_magazin = magazin
@@ -145,25 +155,40 @@ def main():
         with col1:
             filter_magazin = st.multiselect(
                 "Фильтр по магазинам",
-                options=df['Magazin'].unique().tolist(),
+                options=get_sales_index(df).magazins,
                 default=[]
             )
 
         with col2:
             filter_segment = st.multiselect(
                 "Фильтр по сегментам",
-                options=df['Segment'].unique().tolist(),
+                options=get_sales_index(df).segments(),
                 default=[]
             )
 
         # Применение фильтров
-        filtered_data = df.copy()
+        filtered_data = select_sales(df, filter_magazin, filter_segment)
 
-        if filter_magazin:
-            filtered_data = filtered_data[filtered_data['Magazin'].isin(filter_magazin)]
+        if df.attrs.get('aggregated'):
+            st.info(
+                "📉 Загружены дневные суммы по магазинам, сегментам и моделям. "
+                "Исходные строки можно загрузить для выбранных магазинов."
+            )
 
-        if filter_segment:
-            filtered_data = filtered_data[filtered_data['Segment'].isin(filter_segment)]
+            if st.button(
+                "📥 Загрузить исходные строки",
+                disabled=not filter_magazin,
+                help="Выберите магазины в фильтре выше"
+            ):
+                raw_rows = load_raw_rows(st.session_state.db_config, filter_magazin)
+                if raw_rows is not None:
+                    # Сохраняем строки, чтобы они не пропали при следующих перезапусках
+                    st.session_state.raw_rows = {'magazins': set(filter_magazin), 'data': raw_rows}
+
+            # Исходные строки показываются, пока отбор магазинов входит в загруженные
+            raw_rows = st.session_state.get('raw_rows')
+            if raw_rows is not None and filter_magazin and set(filter_magazin) <= raw_rows['magazins']:
+                filtered_data = select_sales(raw_rows['data'], filter_magazin, filter_segment)
 
         # Отображение данных
         st.dataframe(
@@ -0,0 +1,62 @@
+"""
+Бенчмарк векторных базовых моделей
+
+Прогнозирует матрицу синтетических рядов (регулярные и прерывистые)
+каждым методом и печатает время и число рядов в секунду. Для сравнения
+обучает Prophet на нескольких рядах той же матрицы.
+
+Запуск:
+    python -m benchmarks.bench_baseline_models --series 10000 --days 730 --periods 30
+"""
+
+import argparse
+import logging
+import time
+import numpy as np
+import pandas as pd
+from src.models.baseline_models import BASELINE_METHODS, forecast_matrix
+from src.models.prophet_model import fit_prophet_forecast
+
+
+def synthetic_matrix(series, days, rng):
+    """Ряды с недельной сезонностью; половина - прерывистый спрос"""
+    t = np.arange(days)
+    level = rng.uniform(0.2, 40, (series, 1))
+    weekly = 1 + 0.3 * np.sin(2 * np.pi * t / 7 + rng.uniform(0, 6, (series, 1)))
+    values = rng.poisson(level * weekly).astype('float64')
+    values[::2] *= rng.random((len(values[::2]), days)) < 0.2
+    return values
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--series', type=int, default=10000)
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--periods', type=int, default=30)
+    parser.add_argument('--prophet-series', type=int, default=5)
+    args = parser.parse_args()
+
+    values = synthetic_matrix(args.series, args.days, np.random.default_rng(42))
+
+    print(f"Рядов: {args.series}, история: {args.days} дн., горизонт: {args.periods} дн.")
+    print(f"{'Метод':<18}{'Время, с':>10}{'Рядов/с':>12}")
+
+    for method in BASELINE_METHODS:
+        start = time.perf_counter()
+        forecast_matrix(values, args.periods, method)
+        elapsed = time.perf_counter() - start
+        print(f"{method:<18}{elapsed:>10.2f}{args.series / elapsed:>12.0f}")
+
+    logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+    logging.getLogger('prophet').setLevel(logging.ERROR)
+    dates = pd.date_range('2022-01-01', periods=args.days)
+
+    start = time.perf_counter()
+    for row in values[1:2 * args.prophet_series:2]:
+        fit_prophet_forecast(pd.DataFrame({'ds': dates, 'y': row}), args.periods)
+    elapsed = time.perf_counter() - start
+    print(f"{'prophet':<18}{elapsed:>10.2f}{args.prophet_series / elapsed:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
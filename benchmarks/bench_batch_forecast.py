@@ -0,0 +1,51 @@
+"""
+Бенчмарк пакетного прогнозирования на пуле процессов
+
+Обучает Prophet для всех рядов магазин × сегмент синтетического набора
+при 1, 4 и N (все ядра) процессах и печатает пропускную способность.
+
+Запуск:
+    python -m benchmarks.bench_batch_forecast --shops 20 --workers 1,4,0
+"""
+
+import argparse
+import os
+import time
+import pandas as pd
+from src.models.batch_forecast import batch_forecast
+from benchmarks.synthetic_sales import iter_chunks
+
+
+def synthetic_frame(rows, shops, months):
+    """Синтетический набор в колонках загрузчика"""
+    df = pd.concat(iter_chunks(rows, shops=shops, months=months), ignore_index=True)
+    return df.rename(columns={'shop': 'Magazin', 'Gender': 'Segment'})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--shops', type=int, default=20)
+    parser.add_argument('--months', type=int, default=12)
+    parser.add_argument('--levels', default='Magazin,Segment')
+    parser.add_argument('--workers', default='1,4,0', help='Списком; 0 - все ядра')
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.rows, args.shops, args.months)
+    levels = args.levels.split(',')
+    cores = os.cpu_count() or 1
+
+    print(f"Ядер: {cores}")
+    print(f"{'Процессов':>10}{'Рядов':>8}{'Ошибок':>8}{'Время, с':>10}{'Рядов/с':>10}")
+
+    for workers in (int(w) or cores for w in args.workers.split(',')):
+        start = time.perf_counter()
+        forecast, failures = batch_forecast(df, levels, workers=workers)
+        elapsed = time.perf_counter() - start
+        series = forecast.groupby(levels, observed=True).ngroups
+
+        print(f"{workers:>10}{series:>8}{len(failures):>8}{elapsed:>10.1f}{series / elapsed:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
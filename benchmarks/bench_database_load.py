@@ -0,0 +1,101 @@
+"""
+Бенчмарк загрузки продаж через локальные движки (SQLite, DuckDB над Parquet)
+
+Сравнивает последовательную постраничную выгрузку, параллельную выгрузку
+по месяцам и загрузку дневных сумм теми же запросами, что и для SQL Server.
+
+Запуск:
+    python -m benchmarks.bench_database_load --rows 10000000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from src.config.settings import DATABASE_CONFIG
+from src.utils.database_loader import (
+    _aggregate_columns,
+    _assemble_sales_frame,
+    _extract_partitioned,
+    _stream_aggregate_columns,
+    _stream_sales_rows,
+    get_source_pool
+)
+from benchmarks.synthetic_sales import iter_chunks, write_parquet, write_sqlite
+
+TABLE = 'Sales_table'
+
+
+def serial_load(pool, dialect):
+    """Последовательная keyset-выгрузка одним соединением"""
+    with pool.connection() as conn:
+        return _stream_sales_rows(
+            conn, TABLE, DATABASE_CONFIG['history_months'],
+            DATABASE_CONFIG['page_size'], DATABASE_CONFIG['fetch_size'],
+            dialect=dialect
+        )
+
+
+def parallel_load(pool, dialect):
+    """Параллельная выгрузка по месяцам"""
+    return _extract_partitioned(
+        pool, TABLE, DATABASE_CONFIG['history_months'],
+        workers=DATABASE_CONFIG['workers'], dialect=dialect
+    )
+
+
+def aggregated_load(pool, dialect):
+    """Дневные суммы с группировкой в движке"""
+    dimensions = tuple(DATABASE_CONFIG['aggregate_dimensions'])
+    with pool.connection() as conn:
+        chunks = _stream_aggregate_columns(
+            conn, TABLE, DATABASE_CONFIG['history_months'], dimensions,
+            DATABASE_CONFIG['fetch_size'], dialect=dialect
+        )
+    return _assemble_sales_frame([chunks], _aggregate_columns(dimensions, dialect))
+
+
+def measure(func, pool, dialect):
+    """Время выполнения и объем памяти результата"""
+    start = time.perf_counter()
+    df = func(pool, dialect)
+    elapsed = time.perf_counter() - start
+    return elapsed, df.memory_usage(deep=True).sum() / 1024 ** 2, len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=2000000)
+    parser.add_argument('--backends', default='sqlite,duckdb')
+    parser.add_argument('--dir', default=tempfile.gettempdir(),
+                        help='Каталог синтетических файлов')
+    args = parser.parse_args()
+
+    paths = {
+        'sqlite': os.path.join(args.dir, f'bench_sales_{args.rows}.db'),
+        'duckdb': os.path.join(args.dir, f'bench_sales_{args.rows}.parquet')
+    }
+
+    print(f"{'Движок':<8}{'Режим':<12}{'Время, с':>10}{'Память, МБ':>13}{'Строк':>13}")
+
+    for backend in args.backends.split(','):
+        path = paths[backend]
+        if not os.path.exists(path):
+            print(f"Генерация {args.rows:,} строк: {path}")
+            if backend == 'sqlite':
+                write_sqlite(path, TABLE, iter_chunks(args.rows))
+            else:
+                write_parquet(path, iter_chunks(args.rows))
+
+        pool, dialect = get_source_pool(backend, '', '', '', '', '', TABLE, path)
+
+        for name, func in [('serial', serial_load), ('parallel', parallel_load),
+                           ('aggregated', aggregated_load)]:
+            elapsed, memory, rows = measure(func, pool, dialect)
+            print(f"{backend:<8}{name:<12}{elapsed:>10.2f}{memory:>13.1f}{rows:>13,}")
+
+        pool.close_all()
+
+
+if __name__ == '__main__':
+    main()
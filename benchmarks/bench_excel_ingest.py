@@ -0,0 +1,90 @@
+"""
+Бенчмарк загрузки Excel: полное чтение pd.read_excel против быстрого пути
+
+Запуск:
+    python -m benchmarks.bench_excel_ingest --rows 500000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from src.config.settings import REQUIRED_COLUMNS
+from src.utils.file_loader import read_sales_excel, parse_sales_dates
+
+# Лишние колонки типичной выгрузки, которые приложению не нужны
+EXTRA_COLUMNS = ['Purchaiseprice', 'Barcode', 'Color', 'Size', 'Supplier', 'Comment']
+
+
+def generate_workbook(path, rows, seed=42):
+    """Создает книгу с продажами (даты строками в формате ДД.ММ.ГГГГ)"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2023-01-01', periods=365, freq='D').strftime('%d.%m.%Y')
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(REQUIRED_COLUMNS + EXTRA_COLUMNS)
+
+    shop = rng.integers(0, 20, rows)
+    day = rng.integers(0, len(dates), rows)
+    art = rng.integers(0, 5000, rows)
+    price = rng.uniform(100, 3000, rows).round(2)
+    qty = rng.integers(1, 5, rows)
+
+    for i in range(rows):
+        sheet.append([
+            f'Shop{shop[i]}', dates[day[i]], f'A{art[i]}', f'Product {art[i]}',
+            f'M{art[i] // 10}', f'Seg{art[i] % 4}', float(price[i]), int(qty[i]),
+            float(price[i] * qty[i]),
+            float(price[i] * 0.6), f'482{art[i]:09d}', 'black', 'M', f'Supplier{shop[i]}', ''
+        ])
+
+    workbook.save(path)
+
+
+def legacy_ingest(path):
+    """Прежний путь: чтение всех колонок и разбор дат с dayfirst"""
+    df = pd.read_excel(path)
+    df['Datasales'] = pd.to_datetime(df['Datasales'], errors='coerce', dayfirst=True)
+    return df
+
+
+def fast_ingest(path):
+    """Быстрый путь: проекция колонок, план типов, фиксированный формат дат"""
+    df, _ = read_sales_excel(path)
+    df['Datasales'] = parse_sales_dates(df['Datasales'])
+    return df
+
+
+def measure(func, path):
+    """Время выполнения и пиковый прирост памяти DataFrame"""
+    start = time.perf_counter()
+    df = func(path)
+    elapsed = time.perf_counter() - start
+    return elapsed, df.memory_usage(deep=True).sum() / 1024 ** 2, len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--path', default=None, help='Использовать готовую книгу')
+    args = parser.parse_args()
+
+    path = args.path
+    if path is None:
+        path = os.path.join(tempfile.gettempdir(), f'bench_sales_{args.rows}.xlsx')
+        if not os.path.exists(path):
+            print(f"Генерация книги на {args.rows:,} строк: {path}")
+            generate_workbook(path, args.rows)
+
+    print(f"{'Путь':<10}{'Время, с':>12}{'Память, МБ':>14}{'Строк':>12}")
+    for name, func in [('legacy', legacy_ingest), ('fast', fast_ingest)]:
+        elapsed, memory, rows = measure(func, path)
+        print(f"{name:<10}{elapsed:>12.2f}{memory:>14.1f}{rows:>12,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Бенчмарк смены горизонта прогноза
+
+Сравнивает полную переподгонку Prophet при смене горизонта с продлением
+прогноза уже обученной модели (extend_forecast) для одного ряда.
+
+Запуск:
+    python -m benchmarks.bench_horizon_change --days 730 --horizons 30,60,90,14
+"""
+
+import argparse
+import logging
+import numpy as np
+from src.models.prophet_model import extend_forecast, fit_prophet_forecast
+from benchmarks.bench_incremental_fit import synthetic_series, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--horizons', default='30,60,90,14')
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+    logging.getLogger('prophet').setLevel(logging.ERROR)
+
+    data = synthetic_series(args.days, np.random.default_rng(42))
+    horizons = [int(h) for h in args.horizons.split(',')]
+
+    print(f"История: {args.days} дн.")
+    print(f"{'Переход':<12}{'Переподгонка, мс':>18}{'Продление, мс':>16}")
+
+    for previous, periods in zip(horizons, horizons[1:]):
+        refit, extend = [], []
+        for _ in range(args.repeats):
+            model, forecast = fit_prophet_forecast(data, previous)
+            refit.append(timed(fit_prophet_forecast, data, periods)[1])
+            extend.append(timed(extend_forecast, model, forecast, periods)[1])
+
+        print(f"{f'{previous} -> {periods}':<12}{np.median(refit) * 1000:>18.0f}{np.median(extend) * 1000:>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
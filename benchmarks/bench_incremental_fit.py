@@ -0,0 +1,110 @@
+"""
+Бенчмарк дообучения Prophet с теплым стартом
+
+Для каждого синтетического ряда имитирует ежедневное обновление:
+к истории добавляется по одному дню, и модель обучается либо заново
+(холодный старт), либо от параметров вчерашней модели (теплый старт).
+Печатает время подгонки и расхождение прогнозов с холодной подгонкой.
+
+Запуск:
+    python -m benchmarks.bench_incremental_fit --series 20 --days 730 --refreshes 7
+"""
+
+import argparse
+import logging
+import shutil
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from prophet import Prophet
+from src.config.settings import MODEL_CACHE_CONFIG, PROPHET_PARAMS
+from src.models.prophet_model import fit_prophet_forecast, forecast_series, warm_start_params
+
+HORIZON = 30
+
+
+def synthetic_series(days, rng):
+    """Дневной ряд продаж с трендом, недельной и годовой сезонностью"""
+    t = np.arange(days)
+    level = rng.uniform(10, 50)
+    y = (level * (1 + 0.0005 * t)
+         * (1 + 0.2 * np.sin(2 * np.pi * t / 7 + rng.uniform(0, 6)))
+         * (1 + 0.3 * np.sin(2 * np.pi * t / 365.25 + rng.uniform(0, 6))))
+    return pd.DataFrame({
+        'ds': pd.date_range('2022-01-01', periods=days),
+        'y': rng.poisson(np.maximum(y, 0)).astype('float64')
+    })
+
+
+def timed(func, *args, **kwargs):
+    """Результат и время вызова"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--series', type=int, default=20)
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--refreshes', type=int, default=7)
+    args = parser.parse_args()
+
+    logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+    logging.getLogger('prophet').setLevel(logging.ERROR)
+    MODEL_CACHE_CONFIG['path'] = tempfile.mkdtemp()
+
+    rng = np.random.default_rng(42)
+    stats = {'cold_fit': [], 'warm_fit': [], 'cold_total': [], 'warm_total': [],
+             'yhat_diff': [], 'cold_mae': [], 'warm_mae': [], 'warm_used': 0}
+
+    try:
+        for number in range(args.series):
+            full = synthetic_series(args.days + args.refreshes + HORIZON, rng)
+            start = args.days
+
+            # Исходная модель ряда (вчерашний прогон)
+            forecast_series(full.iloc[:start], HORIZON, series_key=number)
+            previous = Prophet(**PROPHET_PARAMS).fit(full.iloc[:start])
+
+            for day in range(1, args.refreshes + 1):
+                history = full.iloc[:start + day]
+                actual = full.iloc[start + day:start + day + HORIZON]
+
+                # Только оптимизация Stan: холодная и от вчерашних параметров
+                _, cold_fit = timed(Prophet(**PROPHET_PARAMS).fit, history)
+                warm_model, warm_fit = timed(Prophet(**PROPHET_PARAMS).fit, history,
+                                             init=warm_start_params(previous))
+                previous = warm_model
+
+                # Полный путь: подгонка, прогноз и проверка дрейфа
+                (_, cold), cold_total = timed(fit_prophet_forecast, history, HORIZON)
+                (_, warm), warm_total = timed(forecast_series, history, HORIZON, series_key=number)
+
+                stats['cold_fit'].append(cold_fit)
+                stats['warm_fit'].append(warm_fit)
+                stats['cold_total'].append(cold_total)
+                stats['warm_total'].append(warm_total)
+
+                cold_future = cold['yhat'].tail(HORIZON).to_numpy()
+                warm_future = warm['yhat'].tail(HORIZON).to_numpy()
+                stats['yhat_diff'].append(np.abs(warm_future - cold_future).mean() / cold_future.mean())
+                stats['cold_mae'].append(np.abs(cold_future - actual['y'].to_numpy()).mean())
+                stats['warm_mae'].append(np.abs(warm_future - actual['y'].to_numpy()).mean())
+    finally:
+        shutil.rmtree(MODEL_CACHE_CONFIG['path'])
+
+    cold_fit, warm_fit = np.mean(stats['cold_fit']), np.mean(stats['warm_fit'])
+    cold_total, warm_total = np.mean(stats['cold_total']), np.mean(stats['warm_total'])
+
+    print(f"Рядов: {args.series}, история: {args.days} дн., обновлений: {args.refreshes}")
+    print(f"{'':<28}{'Холодный':>10}{'Теплый':>10}{'Ускорение':>11}")
+    print(f"{'Подгонка Stan, мс':<28}{cold_fit * 1000:>10.0f}{warm_fit * 1000:>10.0f}{cold_fit / warm_fit:>10.1f}x")
+    print(f"{'Подгонка + прогноз, мс':<28}{cold_total * 1000:>10.0f}{warm_total * 1000:>10.0f}{cold_total / warm_total:>10.1f}x")
+    print(f"{'MAE на 30 днях вперед':<28}{np.mean(stats['cold_mae']):>10.2f}{np.mean(stats['warm_mae']):>10.2f}")
+    print(f"Расхождение yhat теплого и холодного прогноза: {np.mean(stats['yhat_diff']) * 100:.2f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Бенчмарк предобработки матрицы рядов
+
+Удаляет выбросы и сглаживает матрицу синтетических рядов каждым
+методом: поштучно функциями рядов pandas (как в пакетных прогнозах)
+и одним проходом функциями матрицы. Печатает время обоих вариантов,
+ускорение и проверяет побитовое совпадение результатов.
+
+Запуск:
+    python -m benchmarks.bench_preprocessing --series 10000 --days 730 --window 7
+"""
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from src.utils.data_processing import (
+    remove_outliers_iqr, remove_outliers_iqr_matrix, smooth_data, smooth_matrix
+)
+from .bench_baseline_models import synthetic_matrix
+from .bench_incremental_fit import timed
+
+
+def by_series(values, func):
+    """Функция ряда pandas для каждой строки матрицы"""
+    return np.array([func(pd.Series(row)).to_numpy() for row in values])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--series', type=int, default=10000)
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--window', type=int, default=7)
+    args = parser.parse_args()
+
+    values = synthetic_matrix(args.series, args.days, np.random.default_rng(42))
+    window = args.window
+
+    steps = [
+        ('iqr', lambda: by_series(values, remove_outliers_iqr),
+         lambda: remove_outliers_iqr_matrix(values)),
+    ] + [
+        (method, lambda method=method: by_series(values, lambda data: smooth_data(data, method, window)),
+         lambda method=method: smooth_matrix(values, method, window))
+        for method in ('ma', 'ema', 'savgol')
+    ]
+
+    print(f"Рядов: {args.series}, история: {args.days} дн., окно: {window}")
+    print(f"{'Шаг':<10}{'По рядам, с':>14}{'Матрица, с':>14}{'Ускорение':>12}{'Совпадает':>12}")
+
+    for name, series_step, matrix_step in steps:
+        expected, series_time = timed(series_step)
+        result, matrix_time = timed(matrix_step)
+        same = np.array_equal(result, expected, equal_nan=True)
+        print(f"{name:<10}{series_time:>14.2f}{matrix_time:>14.2f}"
+              f"{series_time / matrix_time:>11.1f}x{'да' if same else 'нет':>12}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Бенчмарк профилей скорости Prophet
+
+Для каждого профиля из PROPHET_PROFILES обучает модель на синтетических
+рядах, прогнозирует 30 дней после истории и печатает время подгонки
+и прогноза, взвешенную ошибку и покрытие интервала на отложенных днях.
+
+Запуск:
+    python -m benchmarks.bench_prophet_profiles --series 10 --days 730
+"""
+
+import argparse
+import logging
+import numpy as np
+from src.config.settings import PROPHET_PROFILES
+from src.models.prophet_model import fit_prophet_forecast
+from benchmarks.bench_incremental_fit import synthetic_series, timed
+
+HORIZON = 30
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--series', type=int, default=10)
+    parser.add_argument('--days', type=int, default=730)
+    args = parser.parse_args()
+
+    logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+    logging.getLogger('prophet').setLevel(logging.ERROR)
+
+    rng = np.random.default_rng(3)
+    series = [synthetic_series(args.days + HORIZON, rng) for _ in range(args.series)]
+
+    print(f"Рядов: {args.series}, история: {args.days} дн., горизонт: {HORIZON} дн.")
+    print(f"{'Профиль':<12}{'Время, мс':>11}{'WAPE, %':>10}{'Покрытие 80%':>14}")
+
+    for profile in PROPHET_PROFILES:
+        elapsed, wape, coverage = [], [], []
+        for data in series:
+            history, actual = data.iloc[:args.days], data['y'].iloc[args.days:].to_numpy()
+            (_, forecast), seconds = timed(fit_prophet_forecast, history, HORIZON, profile=profile)
+            future = forecast.tail(HORIZON)
+
+            elapsed.append(seconds)
+            wape.append(np.abs(future['yhat'].to_numpy() - actual).sum() / actual.sum())
+            coverage.append(((actual >= future['yhat_lower'].to_numpy())
+                             & (actual <= future['yhat_upper'].to_numpy())).mean())
+
+        print(f"{profile:<12}{np.median(elapsed) * 1000:>11.0f}{np.mean(wape) * 100:>10.1f}"
+              f"{np.mean(coverage) * 100:>13.0f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Генератор синтетической таблицы продаж в схеме SQL Server источника
+
+Создает файл SQLite и/или Parquet для локальных движков загрузчика
+(см. src/utils/sql_backends.py). Данные пишутся пачками, поэтому
+десятки миллионов строк не требуют соответствующего объема памяти.
+
+Запуск:
+    python -m benchmarks.synthetic_sales --rows 10000000 --parquet sales.parquet --sqlite sales.db
+"""
+
+import argparse
+import os
+import sqlite3
+import time
+import numpy as np
+import pandas as pd
+
+# Колонки исходной таблицы в порядке SALES_QUERY_COLUMNS
+SOURCE_COLUMNS = ['shop', 'Datasales', 'Art', 'Name_Product', 'Model', 'Gender',
+                  'Cost_price', 'Price', 'Qty', 'Sum']
+
+GENDERS = ['Men', 'Women', 'Kids', 'Unisex']
+
+
+def generate_chunk(rows, rng, months=12, shops=20, articles=2000, now=None):
+    """
+    Пачка синтетических продаж за последние months месяцев
+
+    Популярность артикулов убывает по степенному закону, как в рознице:
+    небольшая часть моделей дает основную долю строк.
+
+    Returns:
+        pd.DataFrame: Колонки SOURCE_COLUMNS, строки в порядке Datasales
+    """
+    now = pd.Timestamp.now().normalize() if now is None else pd.Timestamp(now)
+    start = now - pd.DateOffset(months=months)
+    span_seconds = int((now - start).total_seconds())
+
+    seconds = np.sort(rng.integers(0, span_seconds, rows))
+    art = (articles * rng.power(0.3, rows)).astype('int64')
+    model = art // 10
+    price = (200 + (art % 97) * 30).astype('float64')
+    qty = rng.integers(1, 5, rows)
+
+    return pd.DataFrame({
+        'shop': np.char.add('Shop', rng.integers(0, shops, rows).astype(str)),
+        'Datasales': start + pd.to_timedelta(seconds, unit='s'),
+        'Art': np.char.add('A', art.astype(str)),
+        'Name_Product': np.char.add('Product ', art.astype(str)),
+        'Model': np.char.add('M', model.astype(str)),
+        'Gender': np.array(GENDERS)[model % len(GENDERS)],
+        'Cost_price': (price * 0.6).round(2),
+        'Price': price,
+        'Qty': qty,
+        'Sum': price * qty
+    })
+
+
+def write_sqlite(path, table, chunks):
+    """Записывает пачки в таблицу SQLite с индексом по Datasales"""
+    if os.path.exists(path):
+        os.remove(path)
+
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute(f'''
+            CREATE TABLE "{table}" (
+                shop TEXT, Datasales TIMESTAMP, Art TEXT, Name_Product TEXT,
+                Model TEXT, Gender TEXT, Cost_price REAL, Price REAL,
+                Qty INTEGER, "Sum" REAL
+            )
+        ''')
+        insert = f'INSERT INTO "{table}" VALUES ({", ".join("?" * len(SOURCE_COLUMNS))})'
+
+        for chunk in chunks:
+            chunk = chunk.assign(Datasales=chunk['Datasales'].dt.strftime('%Y-%m-%d %H:%M:%S'))
+            conn.executemany(insert, chunk.itertuples(index=False, name=None))
+
+        conn.execute(f'CREATE INDEX "ix_{table}_Datasales" ON "{table}" (Datasales)')
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def write_parquet(path, chunks):
+    """Записывает пачки в один Parquet файл группами строк"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def iter_chunks(rows, chunk_rows=1000000, seed=42, **kwargs):
+    """Пачки синтетических продаж общей длиной rows"""
+    rng = np.random.default_rng(seed)
+    for offset in range(0, rows, chunk_rows):
+        yield generate_chunk(min(chunk_rows, rows - offset), rng, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--months', type=int, default=12)
+    parser.add_argument('--table', default='Sales_table')
+    parser.add_argument('--sqlite', default=None, help='Файл SQLite')
+    parser.add_argument('--parquet', default=None, help='Файл Parquet')
+    args = parser.parse_args()
+
+    if not args.sqlite and not args.parquet:
+        parser.error('Укажите --sqlite и/или --parquet')
+
+    if args.sqlite:
+        start = time.perf_counter()
+        write_sqlite(args.sqlite, args.table, iter_chunks(args.rows, months=args.months))
+        print(f"SQLite: {args.sqlite} ({args.rows:,} строк, {time.perf_counter() - start:.1f} с)")
+
+    if args.parquet:
+        start = time.perf_counter()
+        write_parquet(args.parquet, iter_chunks(args.rows, months=args.months))
+        print(f"Parquet: {args.parquet} ({args.rows:,} строк, {time.perf_counter() - start:.1f} с)")
+
+
+if __name__ == '__main__':
+    main()
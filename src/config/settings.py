@@ -13,6 +13,40 @@ REQUIRED_COLUMNS = [
     'Model', 'Segment', 'Price', 'Qty', 'Sum'
 ]
 
+# Измерения (хранятся как категории) и меры (целые приводятся к узким типам)
+DIMENSION_COLUMNS = ['Magazin', 'Segment', 'Model', 'Art', 'Describe']
+MEASURE_COLUMNS = ['Qty', 'Price', 'Sum', 'Purchaiseprice']
+
+# Самый узкий целый тип мер: int8/int16 переполняются в производной арифметике
+# (Qty * k, diff, разности), поэтому сужение не идет ниже int32
+MEASURE_MIN_INT_DTYPE = 'int32'
+
+# Денежные меры: всегда float64, чтобы ошибки округления не копились в суммах выручки
+MONEY_COLUMNS = ['Price', 'Sum', 'Purchaiseprice']
+
+# План типов колонок при чтении Excel
+EXCEL_DTYPES = {
+    'Magazin': 'str',
+    'Art': 'str',
+    'Describe': 'str',
+    'Model': 'str',
+    'Segment': 'str',
+    'Price': 'float64',
+    'Qty': 'float64',
+    'Sum': 'float64'
+}
+
+# Форматы дат, проверяемые при определении формата Datasales (день первым)
+DATE_FORMATS = [
+    '%d.%m.%Y',
+    '%d.%m.%Y %H:%M:%S',
+    '%d.%m.%Y %H:%M',
+    '%Y-%m-%d',
+    '%Y-%m-%d %H:%M:%S',
+    '%d/%m/%Y',
+    '%d-%m-%Y'
+]
+
 # Параметры прогнозирования
 FORECAST_CONFIG = {
     'min_days': 7,
@@ -21,6 +55,64 @@ FORECAST_CONFIG = {
     'min_records': 10
 }
 
+# Кэш обученных моделей Prophet (память + диск)
+MODEL_CACHE_CONFIG = {
+    'path': '.model_cache',    # Каталог JSON файлов моделей
+    'max_size_mb': 512,        # Лимит размера каталога (LRU вытеснение)
+    'memory_entries': 32       # Моделей в памяти процесса
+}
+
+# Дообучение рядов с теплым стартом при появлении новых дней
+INCREMENTAL_FIT_CONFIG = {
+    'enabled': True,
+    'max_new_days': 14,        # Больше новых дней - полная подгонка
+    'drift_threshold': 3.0     # Средняя ошибка на новых днях, в шумах модели (sigma_obs)
+}
+
+# Пакетное прогнозирование всех рядов
+BATCH_FORECAST_CONFIG = {
+    'levels': ['Magazin', 'Segment'],  # Уровни рядов (например, ['Magazin', 'Model'])
+    'workers': 4,                      # Процессов обучения (1 - без пула)
+    'periods': 30                      # Горизонт прогноза, дней
+}
+
+# Фоновая очередь задач обучения (общая для сессий процесса)
+JOB_QUEUE_CONFIG = {
+    'workers': 2,              # Потоков обучения
+    'keep_finished': 64,       # Завершенных задач хранится для выдачи результата
+    'poll_interval': 1.0       # Период опроса состояния задачи во вкладке, сек
+}
+
+# Бэктестинг со скользящей точкой прогноза
+BACKTEST_CONFIG = {
+    'horizon': 14,             # Дней прогноза в каждом фолде
+    'step': 7,                 # Сдвиг точки прогноза между фолдами, дней
+    'folds': 4,                # Фолдов от конца ряда назад
+    'window': None,            # Окно обучения, дней (None - расширяющееся окно)
+    'min_train_days': 60,      # Фолды с более короткой историей пропускаются
+    'season': 7,               # Сезонный лаг наивного прогноза для MASE
+    'workers': 4               # Процессов (1 - без пула)
+}
+
+# Векторные базовые модели (NumPy, все ряды одной матрицей)
+BASELINE_CONFIG = {
+    'method': 'holt_winters',  # seasonal_naive, moving_average, holt_winters, croston, tsb
+    'season': 7,               # Длина сезона, дней
+    'window': 28,              # Окно скользящего среднего и недельного профиля, дней
+    'alpha': 0.2,              # Сглаживание уровня (Holt-Winters) и спроса (Croston/TSB)
+    'beta': 0.05,              # Сглаживание тренда (Holt-Winters) и вероятности спроса (TSB)
+    'gamma': 0.1,              # Сглаживание сезонности (Holt-Winters)
+    'phi': 0.98,               # Затухание тренда (Holt-Winters)
+    'interval_width': 0.8      # Ширина интервала, как у Prophet по умолчанию
+}
+
+# Иерархический прогноз с согласованием уровней
+HIERARCHY_CONFIG = {
+    'levels': ['Magazin', 'Segment', 'Model'],  # Уровни сверху вниз
+    'method': 'mint_shrink',                    # bottom_up, top_down, mint_shrink
+    'mint_dense_nodes': 2000                    # Больше узлов - MinT с диагональной ковариацией
+}
+
 # Параметры Prophet модели
 PROPHET_PARAMS = {
     'daily_seasonality': False,
@@ -31,6 +123,57 @@ PROPHET_PARAMS = {
     'seasonality_prior_scale': 10
 }
 
+# Профили скорости Prophet: переопределения PROPHET_PARAMS
+# (замеры: benchmarks/bench_prophet_profiles.py)
+PROPHET_PROFILES = {
+    'fast': {
+        'label': '⚡ Быстрый',
+        'params': {
+            'mcmc_samples': 0,          # MAP оценка
+            'uncertainty_samples': 0,   # Интервалы по ошибкам на истории, без симуляции
+            'yearly_seasonality': 5,    # Порядок Фурье годовой сезонности
+            'weekly_seasonality': 3,
+            'n_changepoints': 10
+        }
+    },
+    'balanced': {
+        'label': '⚖️ Сбалансированный',
+        'params': {
+            'mcmc_samples': 0,
+            'uncertainty_samples': 200
+        }
+    },
+    'accurate': {
+        'label': '🎯 Точный',
+        'params': {
+            'mcmc_samples': 300,        # Выборка апостериорного распределения (NUTS) вместо MAP
+            'uncertainty_samples': 1000
+        }
+    }
+}
+
+DEFAULT_PROPHET_PROFILE = 'balanced'
+
+# Подбор параметров Prophet по рядам (successive halving на коротких бэктестах)
+TUNING_CONFIG = {
+    'space': {                                  # Сетка переопределений PROPHET_PARAMS
+        'changepoint_prior_scale': [0.01, 0.05, 0.2, 0.5],
+        'seasonality_prior_scale': [0.1, 1.0, 10.0],
+        'seasonality_mode': ['additive', 'multiplicative']
+    },
+    'samples': None,           # Случайных конфигураций из сетки (None - вся сетка)
+    'eta': 3,                  # На следующую ступень проходит 1/eta конфигураций
+    'min_folds': 1,            # Фолдов бэктеста на первой ступени
+    'max_folds': 3,            # Фолдов на последней ступени
+    'horizon': 14,             # Дней прогноза в фолде
+    'step': 14,                # Сдвиг точки прогноза между фолдами, дней
+    'metric': 'WAPE',          # Метрика из BACKTEST_METRICS (меньше - лучше)
+    'retune_top': 3,           # Лучших прежних конфигураций, перепроверяемых на новых данных
+    'profile': 'fast',         # Профиль Prophet для фолдов подбора
+    'workers': 4,              # Процессов (1 - без пула)
+    'path': '.tuning'          # Каталог подобранных параметров
+}
+
 # Методы сглаживания
 SMOOTH_METHODS = {
     'none': 'Без сглаживания',
@@ -49,3 +192,62 @@ WEEKDAY_TRANSLATION = {
     'Saturday': 'Суббота',
     'Sunday': 'Воскресенье'
 }
+
+# Подписи дней недели по коду календаря (0 - понедельник)
+WEEKDAY_LABELS = list(WEEKDAY_TRANSLATION.values())
+WEEKDAY_SHORT_LABELS = ['Пн', 'Вт', 'Ср', 'Чт', 'Пт', 'Сб', 'Вс']
+
+# Параметры выгрузки из SQL Server
+DATABASE_CONFIG = {
+    'history_months': 12,      # Глубина истории
+    'page_size': 200000,       # Строк на страницу keyset-пагинации
+    'fetch_size': 20000,       # Строк на один вызов cursor.fetchmany
+    'extract_mode': 'parallel',  # 'parallel' (партиции) или 'serial'
+    'partition_by': 'month',   # Партиции: 'month' или 'shop'
+    'workers': 4,              # Потоков выгрузки (не больше размера пула)
+    'partition_retries': 2,    # Повторов для упавшей партиции
+    'load_mode': 'raw',        # 'raw' (исходные строки) или 'aggregated' (дневные суммы)
+    'aggregate_dimensions': ['Magazin', 'Segment', 'Model'],  # Группировка дневных сумм
+    'backend': 'sqlserver'     # Движок по умолчанию: 'sqlserver', 'sqlite', 'duckdb'
+}
+
+# Локальная копия таблицы продаж для инкрементальной синхронизации
+LOCAL_STORE_CONFIG = {
+    'path': '.sales_store',  # Каталог с Parquet копиями
+    'overlap_days': 3        # Окно перекрытия для поздних корректировок
+}
+
+# Персистентный кэш загруженных наборов данных
+DATASET_CACHE_CONFIG = {
+    'path': '.dataset_cache',  # Каталог кэша
+    'max_size_mb': 2048        # Лимит размера кэша (LRU вытеснение)
+}
+
+# Хранилище результатов прогнозов (Parquet по магазинам + индекс запусков)
+FORECAST_STORE_CONFIG = {
+    'path': '.forecast_store',  # Каталог хранилища
+    'compact_after': 64,        # Фрагментов индекса, после которых он уплотняется в один
+    'keep_runs': None           # Последних запусков ряда, остающихся при уплотнении (None - все)
+}
+
+# Плотные матрицы рядов (ряды × все дни набора) по уровням ключа
+SERIES_MATRIX_CONFIG = {
+    'levels': {                                 # Имя уровня -> измерения ключа ряда
+        'shop': ['Magazin'],
+        'shop_segment': ['Magazin', 'Segment'],
+        'shop_model': ['Magazin', 'Model']
+    },
+    'measure': 'Qty',                           # Мера в ячейках матрицы
+    'dtype': 'float32',                         # Тип значений (дневные суммы штук точны до 2^24)
+    'mmap': True                                # Читать сохраненные матрицы отображением в память
+}
+
+# Пул соединений с SQL Server
+DB_POOL_CONFIG = {
+    'max_size': 4,               # Максимум открытых соединений на сервер/пользователя
+    'idle_timeout': 300,         # Закрывать соединения после простоя, сек
+    'health_check_after': 30,    # Проверять SELECT 1 после простоя, сек
+    'acquire_timeout': 60,       # Ожидание свободного соединения, сек
+    'login_timeout': 15,         # Таймаут подключения pymssql, сек
+    'query_timeout': 300         # Таймаут запроса pymssql, сек (с запасом на страницу выгрузки)
+}
@@ -0,0 +1,202 @@
+"""Бэктестинг моделей прогноза со скользящей точкой прогноза (rolling origin)"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from ..config.settings import BACKTEST_CONFIG
+from ..utils.data_processing import preprocess_series
+from .batch_forecast import _quiet_worker
+from .prophet_model import forecast_series
+
+# Метрики фолда в порядке колонок таблицы оценок
+BACKTEST_METRICS = ['MAE', 'RMSE', 'WAPE', 'MASE']
+
+
+def make_folds(ds, horizon=None, step=None, folds=None, window=None, min_train_days=None):
+    """
+    Фолды бэктеста: точки прогноза отсчитываются от конца ряда назад
+
+    Последний фолд проверяется на последних horizon днях, каждый
+    предыдущий сдвинут на step дней раньше. Поэтому увеличение числа
+    фолдов добавляет более ранние фолды, не меняя уже посчитанные.
+
+    Args:
+        ds (pd.Series): Даты ряда
+        horizon (int): Дней прогноза в фолде
+        step (int): Сдвиг между точками прогноза, дней
+        folds (int): Число фолдов
+        window (int): Окно обучения, дней (None - вся история до точки прогноза)
+        min_train_days (int): Минимум дней истории фолда
+
+    Returns:
+        pd.DataFrame: fold, train_start, cutoff (последний день обучения), test_end
+                      в хронологическом порядке
+    """
+    horizon = horizon or BACKTEST_CONFIG['horizon']
+    step = step or BACKTEST_CONFIG['step']
+    folds = folds or BACKTEST_CONFIG['folds']
+    window = window if window is not None else BACKTEST_CONFIG['window']
+    min_train_days = min_train_days if min_train_days is not None else BACKTEST_CONFIG['min_train_days']
+
+    ds = pd.to_datetime(ds)
+    first_day, last_day = ds.min(), ds.max()
+    day = pd.Timedelta(days=1)
+
+    cutoffs = pd.Series(last_day - (horizon + step * np.arange(folds)[::-1]) * day)
+
+    table = pd.DataFrame({
+        'train_start': (cutoffs - (window - 1) * day).clip(lower=first_day) if window else first_day,
+        'cutoff': cutoffs,
+        'test_end': cutoffs + horizon * day
+    })
+    table = table[(table['cutoff'] - table['train_start']).dt.days + 1 >= min_train_days]
+    table.insert(0, 'fold', np.arange(len(table)))
+    return table.reset_index(drop=True)
+
+
+def _season_scale(y, season):
+    """Средняя ошибка сезонного наивного прогноза на обучении (знаменатель MASE)"""
+    if len(y) <= season:
+        return np.nan
+    scale = np.abs(y[season:] - y[:-season]).mean()
+    return scale if scale > 0 else np.nan
+
+
+def _preprocess_train(y, preprocessing):
+    """Предобработка обучающих дней фолда настройками ряда (как prepare_prophet_data)"""
+    if not preprocessing:
+        return y
+    smooth_method = preprocessing.get('smooth_method')
+    return preprocess_series(
+        y,
+        remove_outliers=preprocessing.get('remove_outliers', False),
+        smooth_method=smooth_method if smooth_method != 'none' else None,
+        smooth_window=preprocessing.get('smooth_window', 7)
+    )
+
+
+def _backtest_fold(fold, train, test, preprocessing, season, profile=None, params=None):
+    """
+    Обучение и прогноз одного фолда в процессе пула
+
+    Предобработка (выбросы, сглаживание) применяется только к обучающим
+    дням фолда, чтобы границы IQR и окна сглаживания не захватывали
+    тестовые дни; прогноз оценивается по исходным продажам test.
+    Модель проходит через кэш моделей по ключу обучающего ряда, поэтому
+    повторный бэктест и добавление фолдов не переобучают прежние фолды.
+
+    Returns:
+        tuple: (номер фолда, прогноз на тестовые дни или None, масштаб MASE,
+                текст ошибки или None, секунд на фолд)
+    """
+    start = time.perf_counter()
+    try:
+        periods = (test['ds'].max() - train['ds'].max()).days
+        prepared = train.assign(y=_preprocess_train(train['y'], preprocessing))
+        _, forecast = forecast_series(prepared, periods, preprocessing, profile=profile, params=params)
+
+        predictions = test.merge(forecast[['ds', 'yhat']], on='ds', how='left')
+        scale = _season_scale(train['y'].to_numpy(dtype='float64'), season)
+        return fold, predictions, scale, None, time.perf_counter() - start
+
+    except Exception as e:
+        return fold, None, np.nan, f"{type(e).__name__}: {e}", time.perf_counter() - start
+
+
+def score_predictions(predictions, scales):
+    """
+    Метрики всех фолдов одним векторным проходом
+
+    Args:
+        predictions (pd.DataFrame): fold, ds, y, yhat всех фолдов
+        scales (pd.Series): Масштаб MASE по номеру фолда
+
+    Returns:
+        pd.DataFrame: fold + BACKTEST_METRICS (WAPE в процентах)
+    """
+    errors = predictions['y'].to_numpy(dtype='float64') - predictions['yhat'].to_numpy(dtype='float64')
+    parts = pd.DataFrame({
+        'fold': predictions['fold'].to_numpy(),
+        'abs_error': np.abs(errors),
+        'sq_error': errors ** 2,
+        'abs_actual': np.abs(predictions['y'].to_numpy(dtype='float64'))
+    }).groupby('fold').agg(['sum', 'mean'])
+
+    sum_actual = parts[('abs_actual', 'sum')]
+    scores = pd.DataFrame({
+        'MAE': parts[('abs_error', 'mean')],
+        'RMSE': np.sqrt(parts[('sq_error', 'mean')]),
+        'WAPE': (parts[('abs_error', 'sum')] / sum_actual.where(sum_actual > 0)) * 100,
+    })
+    scores['MASE'] = scores['MAE'] / scales.reindex(scores.index)
+    return scores.rename_axis('fold').reset_index()
+
+
+def backtest(data, horizon=None, step=None, folds=None, window=None,
+             workers=None, preprocessing=None, profile=None, params=None):
+    """
+    Бэктест Prophet на ряду со скользящей точкой прогноза
+
+    Каждый фолд обучается только на днях до своей точки прогноза и
+    оценивается на следующих horizon днях. Фолды обучаются параллельно
+    в пуле процессов, модели фолдов кэшируются (см. _backtest_fold).
+
+    Args:
+        data (pd.DataFrame): Исходный дневной ряд с колонками ds и y (без предобработки)
+        horizon (int): Дней прогноза в фолде
+        step (int): Сдвиг между точками прогноза, дней
+        folds (int): Число фолдов
+        window (int): Окно обучения, дней (None - расширяющееся окно)
+        workers (int): Процессов (1 - последовательно в текущем процессе)
+        preprocessing (dict): Настройки предобработки ряда (remove_outliers,
+                              smooth_method, smooth_window): применяются
+                              к обучающим дням каждого фолда
+        profile (str): Профиль скорости Prophet из PROPHET_PROFILES
+        params (dict): Параметры Prophet ряда поверх профиля
+
+    Returns:
+        tuple: (оценки - фолды с датами и BACKTEST_METRICS,
+                прогнозы - fold, ds, y, yhat тестовых дней)
+    """
+    workers = workers or BACKTEST_CONFIG['workers']
+    data = data[['ds', 'y']].assign(ds=pd.to_datetime(data['ds'])).sort_values('ds')
+    table = make_folds(data['ds'], horizon, step, folds, window)
+
+    tasks = []
+    for fold in table.itertuples(index=False):
+        train = data[(data['ds'] >= fold.train_start) & (data['ds'] <= fold.cutoff)].reset_index(drop=True)
+        test = data[(data['ds'] > fold.cutoff) & (data['ds'] <= fold.test_end)].reset_index(drop=True)
+        tasks.append((fold.fold, train, test, preprocessing, BACKTEST_CONFIG['season'], profile, params))
+
+    results = []
+    workers = max(1, min(workers, len(tasks)))
+
+    if workers == 1:
+        _quiet_worker()
+        results = [_backtest_fold(*task) for task in tasks]
+    elif tasks:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_quiet_worker) as executor:
+            futures = {executor.submit(_backtest_fold, *task): task[0] for task in tasks}
+            for future in as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    # Процесс пула упал - ошибка фолда
+                    results.append((futures[future], None, np.nan, f"{type(e).__name__}: {e}", 0))
+
+    errors = {fold: error for fold, _, _, error, _ in results if error is not None}
+    scored = [(fold, predictions, scale) for fold, predictions, scale, error, _ in results if error is None]
+
+    if scored:
+        predictions = pd.concat(
+            [frame.assign(fold=fold) for fold, frame, _ in scored], ignore_index=True
+        )[['fold', 'ds', 'y', 'yhat']].sort_values(['fold', 'ds'], ignore_index=True)
+        scales = pd.Series({fold: scale for fold, _, scale in scored})
+        scores = table.merge(score_predictions(predictions, scales), on='fold', how='left')
+    else:
+        predictions = pd.DataFrame(columns=['fold', 'ds', 'y', 'yhat'])
+        scores = table.reindex(columns=list(table.columns) + BACKTEST_METRICS)
+
+    scores['error'] = scores['fold'].map(errors)
+    return scores, predictions
@@ -0,0 +1,380 @@
+"""
+Векторные базовые модели прогноза (NumPy)
+
+Все ряды прогнозируются одной матрицей (ряды × дни) без цикла по рядам,
+поэтому модели подходят для тысяч рядов уровня модели или артикула,
+где Prophet слишком медленный. Прогнозы имеют ту же схему, что и
+train_prophet_model: ds, yhat, yhat_lower, yhat_upper.
+"""
+
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+from ..config.settings import BASELINE_CONFIG
+from ..utils.data_processing import preprocess_matrix
+from ..utils.series_matrix import get_series_matrix
+
+# Колонки прогноза (как у Prophet)
+FORECAST_COLUMNS = ['ds', 'yhat', 'yhat_lower', 'yhat_upper']
+
+# Названия методов для интерфейса
+BASELINE_METHODS = {
+    'seasonal_naive': 'Сезонный наивный',
+    'moving_average': 'Скользящее среднее с недельным профилем',
+    'holt_winters': 'Холт-Винтерс (ETS A,Ad,A)',
+    'croston': 'Кростон (прерывистый спрос)',
+    'tsb': 'TSB (прерывистый спрос)'
+}
+
+
+def seasonal_naive(values, periods, season=None):
+    """
+    Сезонный наивный прогноз: значение того же дня прошлого сезона
+
+    Args:
+        values (np.ndarray): Матрица рядов × дней
+        periods (int): Горизонт прогноза, дней
+        season (int): Длина сезона, дней
+
+    Returns:
+        tuple: (подгонка на истории, прогноз, рост ошибки по горизонту)
+    """
+    season = season or BASELINE_CONFIG['season']
+    n_series, n_days = values.shape
+
+    fitted = np.full(values.shape, np.nan)
+    fitted[:, season:] = values[:, :-season]
+
+    last_season = values[:, n_days - season:]
+    steps = np.arange(periods)
+    forecast = last_season[:, steps % season]
+
+    # Ошибка растет с числом пройденных сезонов
+    growth = np.sqrt(steps // season + 1)
+    return fitted, forecast, growth
+
+
+def moving_average(values, periods, window=None, season=None):
+    """
+    Скользящее среднее с недельным профилем
+
+    Уровень - среднее последних window дней, профиль - отношение среднего
+    по позиции в сезоне к уровню на том же окне.
+
+    Args:
+        values (np.ndarray): Матрица рядов × дней
+        periods (int): Горизонт прогноза, дней
+        window (int): Окно, дней (округляется вниз до целых сезонов)
+        season (int): Длина сезона, дней
+
+    Returns:
+        tuple: (подгонка на истории, прогноз, рост ошибки по горизонту)
+    """
+    season = season or BASELINE_CONFIG['season']
+    window = window or BASELINE_CONFIG['window']
+    n_series, n_days = values.shape
+    window = max(season, min(window, n_days) // season * season)
+
+    recent = values[:, n_days - window:]
+    level = recent.mean(axis=1)
+    position_mean = recent.reshape(n_series, window // season, season).mean(axis=1)
+    profile = np.divide(position_mean, level[:, None],
+                        out=np.ones_like(position_mean), where=level[:, None] > 0)
+
+    # Скользящее среднее предыдущих window дней через накопленные суммы
+    cumsum = np.concatenate([np.zeros((n_series, 1)), np.cumsum(values, axis=1)], axis=1)
+    trailing = np.full(values.shape, np.nan)
+    trailing[:, window:] = (cumsum[:, window:n_days] - cumsum[:, :n_days - window]) / window
+
+    # Позиция дня в сезоне отсчитывается от начала последнего окна
+    history_positions = (np.arange(n_days) - n_days) % season
+    fitted = trailing * profile[:, history_positions]
+
+    steps = np.arange(periods)
+    forecast = level[:, None] * profile[:, steps % season]
+    return fitted, forecast, np.ones(periods)
+
+
+def holt_winters(values, periods, season=None, alpha=None, beta=None, gamma=None, phi=None):
+    """
+    Аддитивный Холт-Винтерс с затухающим трендом (ETS A,Ad,A)
+
+    Рекурсия идет по дням, а каждый шаг обновляет все ряды сразу.
+    Параметры сглаживания общие для рядов и берутся из BASELINE_CONFIG.
+
+    Args:
+        values (np.ndarray): Матрица рядов × дней
+        periods (int): Горизонт прогноза, дней
+        season (int): Длина сезона, дней
+        alpha, beta, gamma (float): Сглаживание уровня, тренда и сезонности
+        phi (float): Затухание тренда
+
+    Returns:
+        tuple: (одношаговая подгонка на истории, прогноз, рост ошибки по горизонту)
+    """
+    season = season or BASELINE_CONFIG['season']
+    alpha = alpha if alpha is not None else BASELINE_CONFIG['alpha']
+    beta = beta if beta is not None else BASELINE_CONFIG['beta']
+    gamma = gamma if gamma is not None else BASELINE_CONFIG['gamma']
+    phi = phi if phi is not None else BASELINE_CONFIG['phi']
+    n_series, n_days = values.shape
+
+    # Начальные уровень и сезонность по первому сезону
+    first = values[:, :season]
+    level = first.mean(axis=1)
+    trend = np.zeros(n_series)
+    seasonal = first - level[:, None]
+
+    fitted = np.empty(values.shape)
+    for day in range(n_days):
+        position = day % season
+        fitted[:, day] = level + phi * trend + seasonal[:, position]
+
+        actual = values[:, day]
+        new_level = alpha * (actual - seasonal[:, position]) + (1 - alpha) * (level + phi * trend)
+        trend = beta * (new_level - level) + (1 - beta) * phi * trend
+        seasonal[:, position] = gamma * (actual - new_level) + (1 - gamma) * seasonal[:, position]
+        level = new_level
+
+    steps = np.arange(1, periods + 1)
+    damped = np.cumsum(phi ** steps)
+    forecast = (level[:, None] + damped[None, :] * trend[:, None]
+                + seasonal[:, (n_days + steps - 1) % season])
+
+    # Приближение роста дисперсии как у простого экспоненциального сглаживания
+    growth = np.sqrt(1 + (steps - 1) * alpha ** 2)
+    return fitted, forecast, growth
+
+
+def croston(values, periods, alpha=None, beta=None, method='croston'):
+    """
+    Кростон и TSB для прерывистого спроса
+
+    Кростон сглаживает размер ненулевого спроса и интервал между ними
+    (прогноз - размер / интервал) и обновляется только в дни спроса.
+    TSB вместо интервала каждый день сглаживает вероятность спроса.
+
+    Args:
+        values (np.ndarray): Матрица рядов × дней
+        periods (int): Горизонт прогноза, дней
+        alpha (float): Сглаживание размера спроса (и интервала у Кростона)
+        beta (float): Сглаживание вероятности спроса (TSB)
+        method (str): 'croston' или 'tsb'
+
+    Returns:
+        tuple: (одношаговая подгонка на истории, прогноз, рост ошибки по горизонту)
+    """
+    alpha = alpha if alpha is not None else BASELINE_CONFIG['alpha']
+    beta = beta if beta is not None else BASELINE_CONFIG['beta']
+    n_series, n_days = values.shape
+
+    demand = values > 0
+    demand_days = demand.sum(axis=1)
+    size = np.divide(values.sum(axis=1), demand_days,
+                     out=np.zeros(n_series), where=demand_days > 0)
+    probability = demand_days / n_days
+    interval = n_days / np.maximum(demand_days, 1)
+    since_demand = np.ones(n_series)
+
+    fitted = np.empty(values.shape)
+    for day in range(n_days):
+        actual = values[:, day]
+        has_demand = demand[:, day]
+
+        if method == 'tsb':
+            fitted[:, day] = probability * size
+            probability = probability + beta * (has_demand - probability)
+        else:
+            fitted[:, day] = size / interval
+            interval = np.where(has_demand, interval + alpha * (since_demand - interval), interval)
+            since_demand = np.where(has_demand, 1, since_demand + 1)
+
+        size = np.where(has_demand, size + alpha * (actual - size), size)
+
+    level = probability * size if method == 'tsb' else size / interval
+    forecast = np.repeat(level[:, None], periods, axis=1)
+    return fitted, forecast, np.ones(periods)
+
+
+def history_mean(values, periods):
+    """
+    Среднее всей истории: прогноз рядов короче одного сезона
+
+    Сезонным методам нужен хотя бы один полный сезон, поэтому на более
+    короткой истории forecast_matrix использует этот метод. Подгонка -
+    среднее предыдущих дней.
+
+    Args:
+        values (np.ndarray): Матрица рядов × дней
+        periods (int): Горизонт прогноза, дней
+
+    Returns:
+        tuple: (подгонка на истории, прогноз, рост ошибки по горизонту)
+    """
+    n_series, n_days = values.shape
+
+    fitted = np.full(values.shape, np.nan)
+    fitted[:, 1:] = np.cumsum(values, axis=1)[:, :-1] / np.arange(1, n_days)
+
+    forecast = np.repeat(values.mean(axis=1)[:, None], periods, axis=1)
+    return fitted, forecast, np.ones(periods)
+
+
+def _tsb(values, periods, **params):
+    """TSB: Кростон со сглаживанием вероятности спроса"""
+    return croston(values, periods, method='tsb', **params)
+
+
+_METHODS = {
+    'seasonal_naive': seasonal_naive,
+    'moving_average': moving_average,
+    'holt_winters': holt_winters,
+    'croston': croston,
+    'tsb': _tsb
+}
+
+# Методы, которым нужна история не короче сезона
+_SEASONAL_METHODS = {'seasonal_naive', 'moving_average', 'holt_winters'}
+
+
+def forecast_matrix(values, periods, method=None, **params):
+    """
+    Прогноз всех рядов матрицы одним вызовом
+
+    Интервалы строятся по стандартному отклонению ошибок подгонки
+    на истории с ростом по горизонту, ширина - interval_width.
+    Сезонные методы на истории короче сезона заменяются средним
+    истории (history_mean).
+
+    Args:
+        values (np.ndarray): Матрица рядов × дней (пропущенные дни - нули)
+        periods (int): Горизонт прогноза, дней
+        method (str): Метод из BASELINE_METHODS
+        **params: Параметры метода (по умолчанию из BASELINE_CONFIG)
+
+    Returns:
+        dict: fitted (ряды × дни), yhat, yhat_lower, yhat_upper (ряды × горизонт)
+
+    Raises:
+        ValueError: Неизвестный метод или пустая история
+    """
+    method = method or BASELINE_CONFIG['method']
+    if method not in _METHODS:
+        raise ValueError(f"Неизвестный метод прогноза: {method}")
+
+    values = np.asarray(values, dtype='float64')
+    if values.shape[1] == 0:
+        raise ValueError("Нет истории для прогноза")
+
+    season = params.get('season') or BASELINE_CONFIG['season']
+    if method in _SEASONAL_METHODS and values.shape[1] < season:
+        # Меньше одного сезона: сезонный профиль не оценить
+        fitted, forecast, growth = history_mean(values, periods)
+    else:
+        fitted, forecast, growth = _METHODS[method](values, periods, **params)
+
+    residuals = values - fitted
+    valid = np.isfinite(residuals)
+    counts = valid.sum(axis=1)
+    residuals = np.where(valid, residuals, 0)
+    sigma = np.sqrt(np.divide((residuals ** 2).sum(axis=1), np.maximum(counts - 1, 1)))
+
+    z = NormalDist().inv_cdf(0.5 + BASELINE_CONFIG['interval_width'] / 2)
+    spread = z * sigma[:, None] * growth[None, :]
+    forecast = np.maximum(forecast, 0)
+
+    return {
+        'fitted': np.maximum(fitted, 0),
+        'yhat': forecast,
+        'yhat_lower': np.maximum(forecast - spread, 0),
+        'yhat_upper': forecast + spread
+    }
+
+
+def series_matrix(df, levels):
+    """
+    Плотная матрица дневных продаж Qty всех сочетаний уровней
+
+    Строки берутся из матрицы рядов уровня (см. SeriesMatrix), которая
+    кэшируется для набора; дни без продаж - нули.
+
+    Args:
+        df (pd.DataFrame): Набор продаж
+        levels (list): Уровни рядов, например ['Magazin', 'Model']
+
+    Returns:
+        tuple: (ключи рядов - DataFrame уровней, даты - DatetimeIndex,
+                матрица рядов × дней float64)
+    """
+    matrix = get_series_matrix(df, levels, 'Qty')
+    return matrix.keys.copy(), matrix.dates, matrix.values.astype('float64')
+
+
+def baseline_forecast(df, levels, method=None, periods=30, include_history=False,
+                      preprocessing=None, **params):
+    """
+    Прогнозы базовой моделью для всех рядов набора
+
+    Args:
+        df (pd.DataFrame): Набор продаж
+        levels (list): Уровни рядов, например ['Magazin', 'Model']
+        method (str): Метод из BASELINE_METHODS
+        periods (int): Горизонт прогноза, дней
+        include_history (bool): Включать подгонку на истории
+        preprocessing (dict): Аргументы preprocess_matrix (remove_outliers,
+                              smooth_method, smooth_window) или None
+        **params: Параметры метода
+
+    Returns:
+        pd.DataFrame: Длинная таблица: уровни + FORECAST_COLUMNS
+    """
+    keys, dates, values = series_matrix(df, levels)
+    if preprocessing:
+        values = preprocess_matrix(values, **preprocessing)
+    result = forecast_matrix(values, periods, method, **params)
+    return _long_table(keys, dates, values.shape[1], result, periods, include_history)
+
+
+def train_baseline_model(data, periods=30, method=None, **params):
+    """
+    Прогноз одного ряда базовой моделью в схеме train_prophet_model
+
+    Args:
+        data (pd.DataFrame): Ряд с колонками ds и y
+        periods (int): Горизонт прогноза, дней
+        method (str): Метод из BASELINE_METHODS
+
+    Returns:
+        pd.DataFrame: Прогноз на историю (подгонка) и periods дней вперед
+    """
+    ds = pd.to_datetime(data['ds'])
+    dates = pd.date_range(ds.min(), ds.max(), freq='D')
+    values = pd.Series(data['y'].to_numpy(dtype='float64'), index=ds).groupby(level=0).sum()
+    values = values.reindex(dates, fill_value=0).to_numpy()[None, :]
+
+    result = forecast_matrix(values, periods, method, **params)
+    return _long_table(pd.DataFrame(index=[0]), dates, len(dates), result, periods, True)
+
+
+def _long_table(keys, dates, n_days, result, periods, include_history):
+    """Матрицы прогноза в длинную таблицу: ключ ряда + FORECAST_COLUMNS"""
+    future = pd.date_range(dates[-1] + pd.Timedelta(days=1), periods=periods, freq='D')
+
+    if include_history:
+        # На истории интервал совпадает с подгонкой; дни без подгонки - NaN
+        fitted = result['fitted']
+        yhat = np.concatenate([fitted, result['yhat']], axis=1)
+        lower = np.concatenate([fitted, result['yhat_lower']], axis=1)
+        upper = np.concatenate([fitted, result['yhat_upper']], axis=1)
+        ds = dates.append(future)
+    else:
+        yhat, lower, upper = result['yhat'], result['yhat_lower'], result['yhat_upper']
+        ds = future
+
+    n_series, width = yhat.shape
+    table = keys.loc[keys.index.repeat(width)].reset_index(drop=True)
+    table['ds'] = np.tile(ds.to_numpy(), n_series)
+    table['yhat'] = yhat.ravel()
+    table['yhat_lower'] = lower.ravel()
+    table['yhat_upper'] = upper.ravel()
+    return table
@@ -0,0 +1,189 @@
+"""Пакетное прогнозирование всех рядов (магазин × сегмент, магазин × модель) на пуле процессов"""
+
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+from ..config.settings import BATCH_FORECAST_CONFIG, FORECAST_CONFIG
+from ..utils.data_processing import prepare_prophet_data
+from ..utils.forecast_store import series_id
+from ..utils.sales_cube import get_sales_cube
+from .baseline_models import BASELINE_METHODS, FORECAST_COLUMNS, baseline_forecast
+from .prophet_model import forecast_series
+
+
+def iter_series(df, levels=None):
+    """
+    Дневные ряды Qty всех сочетаний уровней
+
+    Ряды берутся одной сверткой куба продаж, без прохода по строкам
+    для каждого сочетания.
+
+    Args:
+        df (pd.DataFrame): Набор продаж
+        levels (list): Уровни рядов (по умолчанию из BATCH_FORECAST_CONFIG)
+
+    Yields:
+        tuple: (ключ - кортеж значений уровней, DataFrame с Datasales и Qty)
+    """
+    levels = list(levels or BATCH_FORECAST_CONFIG['levels'])
+    daily = get_sales_cube(df).rollup(levels + ['Datasales'])
+
+    for key, series in daily.groupby(levels, observed=True, sort=False):
+        yield key, series[['Datasales', 'Qty']].reset_index(drop=True)
+
+
+def _quiet_worker():
+    """Отключает построчный лог cmdstanpy в процессе обучения"""
+    logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+
+
+def _forecast_series(key, series, periods, include_history, preprocessing, levels, profile=None):
+    """
+    Прогноз одного ряда в процессе пула
+
+    Любая ошибка возвращается вместе с ключом, а не пробрасывается,
+    чтобы упавший ряд не останавливал остальные.
+
+    Returns:
+        tuple: (ключ, прогноз или None, текст ошибки или None, секунд на ряд)
+    """
+    # Импорт здесь: tuning использует пул и воркер этого модуля
+    from .tuning import tuned_params
+
+    start = time.perf_counter()
+    try:
+        # Тот же ключ ряда, что во вкладке прогноза и в хранилище прогнозов
+        series_key = series_id(dict(zip(levels, key)))
+        prophet_data, _ = prepare_prophet_data(series, **preprocessing)
+        _, forecast = forecast_series(prophet_data, periods, preprocessing, series_key=series_key,
+                                      profile=profile, params=tuned_params(series_key, preprocessing))
+
+        if not include_history:
+            forecast = forecast[forecast['ds'] > prophet_data['ds'].max()]
+
+        return key, forecast[FORECAST_COLUMNS].reset_index(drop=True), None, time.perf_counter() - start
+
+    except Exception as e:
+        return key, None, f"{type(e).__name__}: {e}", time.perf_counter() - start
+
+
+def batch_forecast(df, levels=None, periods=None, workers=None, remove_outliers=False,
+                   smooth_method=None, smooth_window=7, include_history=False,
+                   on_progress=None, method='prophet', profile=None):
+    """
+    Прогнозы Prophet или базовой модели для всех рядов набора
+
+    Ряды обучаются параллельно в пуле процессов: оптимизация Stan идет
+    в подпроцессе cmdstan, но подготовка модели, predict и выборка
+    интервалов неопределенности выполняются в Python под GIL, и на
+    тысячах рядов потоки упираются в них. Каждый ряд проходит через кэш
+    моделей: неизменный ряд не обучается повторно, а пополненный новыми
+    днями дообучается с теплым стартом. Ряды с подобранными параметрами
+    (см. tune_series) обучаются с ними. Ошибка одного ряда попадает
+    в таблицу ошибок и не прерывает остальные.
+
+    Args:
+        df (pd.DataFrame): Набор продаж
+        levels (list): Уровни рядов, например ['Magazin', 'Segment'] или ['Magazin', 'Model']
+        periods (int): Горизонт прогноза, дней
+        workers (int): Процессов обучения (1 - последовательно в текущем процессе)
+        remove_outliers (bool): Удалять выбросы (как во вкладке прогноза)
+        smooth_method (str): Метод сглаживания или None
+        smooth_window (int): Окно сглаживания
+        include_history (bool): Включать подгонку на истории, а не только будущие дни
+        on_progress (callable): Вызывается с (готово рядов, всего рядов)
+        method (str): 'prophet' или метод из BASELINE_METHODS - тогда все ряды
+                      прогнозируются одной матрицей без пула, а предобработка
+                      применяется ко всей матрице (preprocess_matrix)
+        profile (str): Профиль скорости Prophet из PROPHET_PROFILES
+
+    Returns:
+        tuple: (прогнозы - длинная таблица: уровни + FORECAST_COLUMNS,
+                ошибки - уровни + error)
+    """
+    levels = list(levels or BATCH_FORECAST_CONFIG['levels'])
+    periods = periods or BATCH_FORECAST_CONFIG['periods']
+    workers = workers or BATCH_FORECAST_CONFIG['workers']
+
+    preprocessing = {
+        'remove_outliers': remove_outliers,
+        'smooth_method': smooth_method,
+        'smooth_window': smooth_window
+    }
+
+    if method in BASELINE_METHODS:
+        forecast = baseline_forecast(df, levels, method, periods, include_history, preprocessing)
+        if on_progress:
+            on_progress(1, 1)
+        return forecast, _failure_table([], levels)
+
+    tasks = []
+    failures = []
+
+    for key, series in iter_series(df, levels):
+        if len(series) < FORECAST_CONFIG['min_records']:
+            failures.append((key, f"Недостаточно данных ({len(series)} дн.)"))
+        else:
+            tasks.append((key, series))
+
+    results = []
+    total = len(tasks)
+    done = 0
+
+    def collect(result):
+        nonlocal done
+        key, forecast, error, _ = result
+        if error is None:
+            results.append((key, forecast))
+        else:
+            failures.append((key, error))
+        done += 1
+        if on_progress:
+            on_progress(done, total)
+
+    workers = max(1, min(workers, total))
+
+    if workers == 1:
+        _quiet_worker()
+        for key, series in tasks:
+            collect(_forecast_series(key, series, periods, include_history, preprocessing,
+                                     levels, profile))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_quiet_worker) as executor:
+            futures = {
+                executor.submit(_forecast_series, key, series, periods,
+                                include_history, preprocessing, levels, profile): key
+                for key, series in tasks
+            }
+            for future in as_completed(futures):
+                try:
+                    collect(future.result())
+                except Exception as e:
+                    # Процесс пула упал (например, нехватка памяти) - ошибка ряда
+                    collect((futures[future], None, f"{type(e).__name__}: {e}", 0))
+
+    return _long_table(results, levels), _failure_table(failures, levels)
+
+
+def _long_table(results, levels):
+    """Прогнозы рядов в одну длинную таблицу в порядке ключей"""
+    if not results:
+        return pd.DataFrame(columns=levels + FORECAST_COLUMNS)
+
+    results.sort(key=lambda item: tuple(str(value) for value in item[0]))
+    forecasts = [forecast for _, forecast in results]
+    lengths = [len(forecast) for forecast in forecasts]
+
+    keys = pd.DataFrame([key for key, _ in results], columns=levels)
+    keys = keys.loc[keys.index.repeat(lengths)].reset_index(drop=True)
+
+    return pd.concat([keys, pd.concat(forecasts, ignore_index=True)], axis=1)
+
+
+def _failure_table(failures, levels):
+    """Ошибки рядов: уровни и текст ошибки"""
+    failures.sort(key=lambda item: tuple(str(value) for value in item[0]))
+    table = pd.DataFrame([key for key, _ in failures], columns=levels)
+    table['error'] = [error for _, error in failures]
+    return table
@@ -0,0 +1,285 @@
+"""
+Иерархический прогноз магазин → сегмент → модель с согласованием уровней
+
+Базовые прогнозы строятся векторными моделями только для уровней,
+которые нужны методу согласования, и сводятся в один согласованный
+прогноз через разреженную суммирующую матрицу S (узлы × нижние ряды).
+Любая агрегатная выборка читается суммой нижних рядов без отдельной
+подгонки и совпадает с прогнозом соответствующего узла.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import linalg, sparse
+from scipy.sparse.linalg import LinearOperator, cg
+from ..config.settings import BASELINE_CONFIG, HIERARCHY_CONFIG
+from ..utils.sales_index import dataset_cached
+from .baseline_models import forecast_matrix, series_matrix
+
+# Методы согласования для интерфейса
+RECONCILIATION_METHODS = {
+    'bottom_up': 'Снизу вверх',
+    'top_down': 'Сверху вниз (исторические доли)',
+    'mint_shrink': 'MinT (ковариация со сжатием)'
+}
+
+
+def summing_matrix(keys):
+    """
+    Разреженная суммирующая матрица иерархии
+
+    Строки - узлы всех уровней: итог, затем префиксы уровней
+    (магазин, магазин × сегмент, ...), последний блок - нижние ряды.
+
+    Args:
+        keys (pd.DataFrame): Ключи нижних рядов, колонки - уровни сверху вниз
+
+    Returns:
+        tuple: (S - scipy.sparse.csr_matrix узлы × нижние ряды,
+                узлы - DataFrame: level (глубина, 0 - итог) и уровни, None выше глубины)
+    """
+    levels = list(keys.columns)
+    n_bottom = len(keys)
+    columns = np.arange(n_bottom)
+
+    blocks = [sparse.csr_matrix(np.ones((1, n_bottom)))]
+    nodes = [pd.DataFrame({'level': [0]})]
+
+    for depth in range(1, len(levels) + 1):
+        prefix = levels[:depth]
+        codes, uniques = pd.factorize(pd.MultiIndex.from_frame(keys[prefix]), sort=True)
+        blocks.append(sparse.csr_matrix(
+            (np.ones(n_bottom), (codes, columns)), shape=(len(uniques), n_bottom)
+        ))
+        frame = uniques.to_frame(index=False, name=prefix)
+        frame.insert(0, 'level', depth)
+        nodes.append(frame)
+
+    nodes = pd.concat(nodes, ignore_index=True).reindex(columns=['level'] + levels)
+    nodes[levels] = nodes[levels].astype(object).where(nodes[levels].notna(), None)
+    return sparse.vstack(blocks, format='csr'), nodes
+
+
+def shrink_covariance(residuals):
+    """
+    Ковариация ошибок со сжатием к диагонали (Schäfer & Strimmer)
+
+    Интенсивность сжатия оценивается по данным: сумма дисперсий
+    внедиагональных корреляций к сумме их квадратов.
+
+    Args:
+        residuals (np.ndarray): Ошибки подгонки узлы × дни
+
+    Returns:
+        tuple: (ковариация узлы × узлы, интенсивность сжатия 0..1)
+    """
+    n_days = residuals.shape[1]
+    covariance = residuals @ residuals.T / n_days
+    variance = np.diag(covariance).copy()
+    std = np.sqrt(variance)
+    std[std == 0] = 1
+
+    scaled = residuals / std[:, None]
+    correlation = scaled @ scaled.T / n_days
+    squared = scaled ** 2
+    correlation_variance = (squared @ squared.T / n_days - correlation ** 2) * n_days ** 2 / (n_days - 1) ** 3
+
+    off_diagonal = ~np.eye(len(covariance), dtype=bool)
+    denominator = (correlation[off_diagonal] ** 2).sum()
+    intensity = correlation_variance[off_diagonal].sum() / denominator if denominator > 0 else 1.0
+    intensity = float(np.clip(intensity, 0, 1))
+
+    shrunk = (1 - intensity) * covariance
+    shrunk[np.diag_indices_from(shrunk)] = variance
+    return shrunk, intensity
+
+
+def reconcile_mint(summing, base, residuals):
+    """
+    Согласование MinT: нижние ряды = (S' W⁻¹ S)⁻¹ S' W⁻¹ ŷ
+
+    Для иерархий больше mint_dense_nodes узлов ковариация сжимается
+    полностью до диагонали, чтобы не строить плотные матрицы узлы × узлы.
+
+    Args:
+        summing (scipy.sparse.csr_matrix): Суммирующая матрица S
+        base (np.ndarray): Базовые прогнозы всех узлов × горизонт
+        residuals (np.ndarray): Ошибки подгонки всех узлов × дни
+
+    Returns:
+        np.ndarray: Согласованные прогнозы нижних рядов × горизонт
+    """
+    variance = (residuals ** 2).mean(axis=1)
+    # Нулевая дисперсия (ряды без продаж) делает W вырожденной
+    jitter = 1e-8 * max(variance.max(), 1)
+
+    if summing.shape[0] > HIERARCHY_CONFIG['mint_dense_nodes']:
+        # Плотная W узлы × узлы не помещается в память: диагональная W
+        # (полное сжатие). S' W⁻¹ S плотная из-за узла итога, поэтому
+        # система решается сопряженными градиентами через произведения с S
+        weights = 1 / (variance + jitter)
+        n_bottom = summing.shape[1]
+        normal = LinearOperator((n_bottom, n_bottom), dtype='float64',
+                                matvec=lambda x: summing.T @ (weights * (summing @ x)))
+        diagonal = summing.multiply(summing).T @ weights
+        preconditioner = LinearOperator((n_bottom, n_bottom), dtype='float64',
+                                        matvec=lambda x: x / diagonal)
+        right = summing.T @ (weights[:, None] * base)
+        return np.column_stack([
+            cg(normal, right[:, step], M=preconditioner, rtol=1e-10)[0]
+            for step in range(right.shape[1])
+        ])
+
+    covariance, _ = shrink_covariance(residuals)
+    covariance[np.diag_indices_from(covariance)] += jitter
+
+    factor = linalg.cho_factor(covariance)
+    dense = summing.toarray()
+    weighted_summing = linalg.cho_solve(factor, dense)
+    weighted_base = linalg.cho_solve(factor, base)
+
+    return linalg.solve(dense.T @ weighted_summing, dense.T @ weighted_base, assume_a='pos')
+
+
+class HierarchicalForecast:
+    """Согласованный прогноз иерархии: нижние ряды, суммирующая матрица и узлы"""
+
+    def __init__(self, keys, dates, summing, nodes, bottom, spread, correlated, method):
+        """
+        Args:
+            keys (pd.DataFrame): Ключи нижних рядов
+            dates (pd.DatetimeIndex): Дни горизонта
+            summing (scipy.sparse.csr_matrix): Суммирующая матрица S
+            nodes (pd.DataFrame): Узлы иерархии в порядке строк S
+            bottom (np.ndarray): Согласованные прогнозы нижних рядов × горизонт
+            spread (np.ndarray): Полуширина интервала нижних рядов × горизонт
+            correlated (bool): Интервалы нижних рядов складываются линейно
+                               (сверху вниз), иначе как независимые
+            method (str): Метод согласования
+        """
+        self.keys = keys
+        self.levels = list(keys.columns)
+        self.dates = dates
+        self.summing = summing
+        self.nodes = nodes
+        self.bottom = bottom
+        self.spread = spread
+        self.correlated = correlated
+        self.method = method
+
+    @property
+    def reconciled(self):
+        """Согласованные прогнозы всех узлов × горизонт (S @ нижние ряды)"""
+        return self.summing @ self.bottom
+
+    def view(self, **selection):
+        """
+        Прогноз любой агрегатной выборки суммой нижних рядов
+
+        Args:
+            **selection: Значения уровней, например Magazin='Shop1';
+                         пропущенный уровень означает все значения
+
+        Returns:
+            pd.DataFrame: ds, yhat, yhat_lower, yhat_upper (пустой, если выборка пуста)
+        """
+        mask = np.ones(len(self.keys), dtype=bool)
+        for level, value in selection.items():
+            if level not in self.levels:
+                raise ValueError(f"Неизвестный уровень иерархии: {level}")
+            mask &= (self.keys[level] == value).to_numpy()
+
+        if not mask.any():
+            return pd.DataFrame(columns=['ds', 'yhat', 'yhat_lower', 'yhat_upper'])
+
+        yhat = self.bottom[mask].sum(axis=0)
+        if self.correlated:
+            spread = self.spread[mask].sum(axis=0)
+        else:
+            spread = np.sqrt((self.spread[mask] ** 2).sum(axis=0))
+
+        return pd.DataFrame({
+            'ds': self.dates,
+            'yhat': yhat,
+            'yhat_lower': np.maximum(yhat - spread, 0),
+            'yhat_upper': yhat + spread
+        })
+
+    def node_table(self):
+        """Согласованные прогнозы узлов в длинной таблице: узел + ds, yhat"""
+        width = len(self.dates)
+        table = self.nodes.loc[self.nodes.index.repeat(width)].reset_index(drop=True)
+        table['ds'] = np.tile(self.dates.to_numpy(), len(self.nodes))
+        table['yhat'] = self.reconciled.ravel()
+        return table
+
+
+def hierarchical_forecast(df, levels=None, periods=30, method=None, base_method=None):
+    """
+    Согласованный прогноз всех уровней иерархии
+
+    Базовые модели обучаются только там, где нужно методу: снизу вверх -
+    нижние ряды, сверху вниз - только итог (доли из истории), MinT -
+    все узлы. Отрицательные нижние прогнозы MinT обрезаются до нуля
+    до суммирования, поэтому согласованность сохраняется.
+
+    Args:
+        df (pd.DataFrame): Набор продаж
+        levels (list): Уровни сверху вниз (по умолчанию из HIERARCHY_CONFIG)
+        periods (int): Горизонт прогноза, дней
+        method (str): Метод из RECONCILIATION_METHODS
+        base_method (str): Базовая модель из BASELINE_METHODS
+
+    Returns:
+        HierarchicalForecast: Согласованный прогноз
+    """
+    levels = list(levels or HIERARCHY_CONFIG['levels'])
+    method = method or HIERARCHY_CONFIG['method']
+    base_method = base_method or BASELINE_CONFIG['method']
+
+    if method not in RECONCILIATION_METHODS:
+        raise ValueError(f"Неизвестный метод согласования: {method}")
+
+    keys, dates, values = series_matrix(df, levels)
+    summing, nodes = summing_matrix(keys)
+    horizon = pd.date_range(dates[-1] + pd.Timedelta(days=1), periods=periods, freq='D')
+
+    if method == 'bottom_up':
+        base = forecast_matrix(values, periods, base_method)
+        bottom = base['yhat']
+        spread = base['yhat_upper'] - base['yhat']
+        correlated = False
+
+    elif method == 'top_down':
+        base = forecast_matrix(values.sum(axis=0, keepdims=True), periods, base_method)
+        total = values.sum()
+        proportions = values.sum(axis=1) / total if total > 0 else np.full(len(keys), 1 / len(keys))
+        bottom = proportions[:, None] * base['yhat']
+        spread = proportions[:, None] * (base['yhat_upper'] - base['yhat'])
+        correlated = True
+
+    else:
+        base = forecast_matrix(summing @ values, periods, base_method)
+        residuals = summing @ values - base['fitted']
+        residuals = residuals[:, np.isfinite(residuals).all(axis=0)]
+        bottom = np.maximum(reconcile_mint(summing, base['yhat'], residuals), 0)
+        n_bottom = len(keys)
+        spread = (base['yhat_upper'] - base['yhat'])[-n_bottom:]
+        correlated = False
+
+    return HierarchicalForecast(keys, horizon, summing, nodes, bottom, spread, correlated, method)
+
+
+def get_hierarchical_forecast(df, periods=30, method=None, base_method=None):
+    """
+    Согласованный прогноз набора из кэша процесса или новый
+
+    Returns:
+        HierarchicalForecast: Прогноз уровней HIERARCHY_CONFIG
+    """
+    method = method or HIERARCHY_CONFIG['method']
+    base_method = base_method or BASELINE_CONFIG['method']
+    return dataset_cached(
+        ('hierarchy', periods, method, base_method), df,
+        lambda data: hierarchical_forecast(data, periods=periods, method=method, base_method=base_method)
+    )
@@ -1,36 +1,434 @@
 """Модели прогнозирования на основе Prophet"""
 
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from io import StringIO
+from statistics import NormalDist
 import numpy as np
+import pandas as pd
 import streamlit as st
-from prophet import Prophet
+from prophet import Prophet, __version__ as PROPHET_VERSION
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-from ..config.settings import PROPHET_PARAMS
+from ..config.settings import (
+    DEFAULT_PROPHET_PROFILE, INCREMENTAL_FIT_CONFIG, MODEL_CACHE_CONFIG,
+    PROPHET_PARAMS, PROPHET_PROFILES
+)
+from ..utils.dataset_cache import evict_lru
 
+_model_cache = OrderedDict()
+_model_lock = threading.Lock()
 
-def train_prophet_model(data, periods=30):
-    """Обучает модель Prophet"""
-    try:
-        model = Prophet(**PROPHET_PARAMS)
+
+def prophet_params(profile=None, params=None):
+    """
+    Параметры Prophet профиля скорости: PROPHET_PARAMS с его переопределениями
+
+    Args:
+        profile (str): Профиль из PROPHET_PROFILES (по умолчанию DEFAULT_PROPHET_PROFILE)
+        params (dict): Параметры ряда поверх профиля (например, подобранные tune_series)
+
+    Returns:
+        dict: Аргументы конструктора Prophet
+    """
+    profile = profile or DEFAULT_PROPHET_PROFILE
+    if profile not in PROPHET_PROFILES:
+        raise ValueError(f"Неизвестный профиль Prophet: {profile}")
+    return {**PROPHET_PARAMS, **PROPHET_PROFILES[profile]['params'], **(params or {})}
+
+
+def fit_prophet_forecast(data, periods=30, init=None, profile=None, params=None):
+    """
+    Обучает модель Prophet и строит прогноз (ошибки не перехватываются)
+
+    Args:
+        data (pd.DataFrame): Ряд с колонками ds и y
+        periods (int): Горизонт прогноза, дней
+        init (dict): Начальное приближение оптимизации Stan (см. warm_start_params)
+        profile (str): Профиль скорости из PROPHET_PROFILES
+        params (dict): Параметры ряда поверх профиля
+    """
+    model = Prophet(**prophet_params(profile, params))
+    if init is None:
         model.fit(data)
+    else:
+        model.fit(data, init=init)
+
+    future = model.make_future_dataframe(periods=periods)
+    forecast = model.predict(future)
+
+    if not model.uncertainty_samples:
+        forecast = _residual_intervals(model, forecast)
+
+    return model, _clip_forecast(forecast)
+
+
+def _residual_intervals(model, forecast, history_forecast=None):
+    """
+    Интервалы по разбросу ошибок подгонки на истории
+
+    Используются вместо симуляции неопределенности Prophet, когда
+    она отключена профилем (uncertainty_samples=0).
+
+    Args:
+        model (Prophet): Обученная модель
+        forecast (pd.DataFrame): Прогноз без yhat_lower и yhat_upper
+        history_forecast (pd.DataFrame): Прогноз с днями истории (по умолчанию forecast)
+    """
+    history_forecast = forecast if history_forecast is None else history_forecast
+    fitted = model.history[['ds', 'y']].merge(history_forecast[['ds', 'yhat']], on='ds')
+    sigma = (fitted['y'] - fitted['yhat']).std()
+    spread = NormalDist().inv_cdf(0.5 + model.interval_width / 2) * sigma
+
+    forecast['yhat_lower'] = forecast['yhat'] - spread
+    forecast['yhat_upper'] = forecast['yhat'] + spread
+    return forecast
+
+
+def _clip_forecast(forecast):
+    """Обрезает отрицательные продажи в прогнозе и интервалах"""
+    forecast['yhat'] = forecast['yhat'].clip(lower=0)
+    forecast['yhat_lower'] = forecast['yhat_lower'].clip(lower=0)
+    forecast['yhat_upper'] = forecast['yhat_upper'].clip(lower=0)
+    return forecast
+
+
+def extend_forecast(model, forecast, periods):
+    """
+    Прогноз обученной модели на другой горизонт без переобучения
+
+    Более короткий горизонт - срез имеющегося прогноза, более длинный -
+    predict только для недостающих дней, уже посчитанные дни не
+    пересчитываются.
+
+    Args:
+        model (Prophet): Обученная модель
+        forecast (pd.DataFrame): Прогноз модели (история + будущие дни)
+        periods (int): Нужный горизонт прогноза, дней
+
+    Returns:
+        pd.DataFrame: Прогноз на историю и periods дней вперед
+    """
+    horizon = int((forecast['ds'] > model.history['ds'].max()).sum())
+
+    if periods <= horizon:
+        return forecast.iloc[:len(forecast) - horizon + periods].copy()
+
+    future = model.make_future_dataframe(periods=periods, include_history=False)
+    extra = model.predict(future.iloc[horizon:])
+
+    if not model.uncertainty_samples:
+        extra = _residual_intervals(model, extra, forecast)
+    extra = _clip_forecast(extra)
 
-        future = model.make_future_dataframe(periods=periods)
-        forecast = model.predict(future)
+    return pd.concat([forecast, extra[forecast.columns]], ignore_index=True)
 
-        forecast['yhat'] = forecast['yhat'].clip(lower=0)
-        forecast['yhat_lower'] = forecast['yhat_lower'].clip(lower=0)
-        forecast['yhat_upper'] = forecast['yhat_upper'].clip(lower=0)
 
-        return model, forecast
+def model_cache_key(data, preprocessing=None, profile=None, params=None):
+    """
+    Ключ кэша модели: хэш подготовленного ряда, параметров Prophet профиля и предобработки
+
+    Горизонт в ключ не входит: модель от него не зависит, а прогноз
+    на другой горизонт строится через extend_forecast.
+
+    Args:
+        data (pd.DataFrame): Ряд с колонками ds и y
+        preprocessing (dict): Настройки предобработки ряда
+        profile (str): Профиль скорости из PROPHET_PROFILES
+        params (dict): Параметры ряда поверх профиля
+
+    Returns:
+        str: Ключ кэша
+    """
+    digest = hashlib.sha256()
+    digest.update(pd.to_datetime(data['ds']).to_numpy(dtype='datetime64[ns]').tobytes())
+    digest.update(data['y'].to_numpy(dtype='float64').tobytes())
+    digest.update(json.dumps(
+        {'params': prophet_params(profile, params),
+         'preprocessing': preprocessing or {}, 'prophet': PROPHET_VERSION},
+        sort_keys=True, default=str
+    ).encode('utf-8'))
+    return digest.hexdigest()[:32]
+
+
+def _model_path(cache_key, cache_dir=None):
+    """Путь к файлу модели в кэше"""
+    cache_dir = cache_dir or MODEL_CACHE_CONFIG['path']
+    return os.path.join(cache_dir, f"{cache_key}.json")
+
+
+def load_cached_model(cache_key, cache_dir=None):
+    """
+    Модель и прогноз из кэша: сначала память процесса, затем диск
+
+    Returns:
+        tuple: (model, forecast) или None при промахе кэша
+    """
+    with _model_lock:
+        cached = _model_cache.get(cache_key)
+        if cached is not None:
+            _model_cache.move_to_end(cache_key)
+            return cached
+
+    path = _model_path(cache_key, cache_dir)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        from prophet.serialize import model_from_json
+
+        with open(path, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+        model = model_from_json(payload['model'])
+        forecast = pd.read_json(StringIO(payload['forecast']), orient='split',
+                                convert_dates=['ds'], precise_float=True)
+        # JSON не хранит типы колонок: восстанавливаем сохраненные
+        forecast = forecast.astype(payload['dtypes'])
+    except Exception:
+        # Поврежденный файл кэша считается промахом
+        return None
+
+    # Отметка использования для LRU вытеснения
+    os.utime(path)
+
+    _remember_model(cache_key, (model, forecast))
+    return model, forecast
+
+
+def _remember_model(cache_key, value):
+    """Кладет модель в LRU памяти процесса"""
+    with _model_lock:
+        _model_cache[cache_key] = value
+        _model_cache.move_to_end(cache_key)
+        while len(_model_cache) > MODEL_CACHE_CONFIG['memory_entries']:
+            _model_cache.popitem(last=False)
+
+
+def store_cached_model(cache_key, model, forecast, cache_dir=None):
+    """
+    Сохраняет модель (JSON сериализация Prophet) и прогноз в память и на диск
+
+    Returns:
+        bool: True, если модель записана на диск
+    """
+    _remember_model(cache_key, (model, forecast))
+
+    cache_dir = cache_dir or MODEL_CACHE_CONFIG['path']
+    path = _model_path(cache_key, cache_dir)
+
+    try:
+        from prophet.serialize import model_to_json
+
+        payload = {
+            'model': model_to_json(model),
+            'forecast': forecast.to_json(orient='split', date_format='iso',
+                                         date_unit='ns', double_precision=15),
+            'dtypes': {column: str(dtype) for column, dtype in forecast.dtypes.items()}
+        }
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump(payload, f)
+        os.replace(f"{path}.tmp", path)
+    except Exception:
+        return False
+
+    evict_lru(cache_dir, MODEL_CACHE_CONFIG['max_size_mb'] * 1024 * 1024, suffix='.json')
+
+    return True
+
+
+def _point_params(model, name):
+    """
+    Точечная оценка параметра Stan: MAP или среднее выборки MCMC
+
+    MAP хранится строкой (1, n), выборка mcmc_samples - строками (samples, n)
+    или вектором (samples,) для скаляров.
+    """
+    values = np.asarray(model.params[name], dtype='float64')
+    return values.reshape(len(values), -1).mean(axis=0)
+
+
+def warm_start_params(model):
+    """Параметры обученной модели как init для Prophet.fit (теплый старт Stan)"""
+    return {
+        'k': _point_params(model, 'k')[0],
+        'm': _point_params(model, 'm')[0],
+        'sigma_obs': _point_params(model, 'sigma_obs')[0],
+        'delta': _point_params(model, 'delta'),
+        'beta': _point_params(model, 'beta')
+    }
+
+
+def _series_path(series_key, preprocessing, profile=None, cache_dir=None):
+    """Путь к указателю на последнюю модель ряда (отдельно для каждого профиля)"""
+    cache_dir = cache_dir or MODEL_CACHE_CONFIG['path']
+    name = hashlib.sha256(json.dumps([series_key, preprocessing or {}, profile or DEFAULT_PROPHET_PROFILE],
+                                     default=str).encode('utf-8')).hexdigest()[:32]
+    return os.path.join(cache_dir, f"{name}.series")
+
+
+def _remember_series(series_key, preprocessing, cache_key, profile=None):
+    """Запоминает ключ кэша последней модели ряда"""
+    path = _series_path(series_key, preprocessing, profile)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(cache_key)
+    except OSError:
+        pass
+
+
+def _has_drift(model, new_days):
+    """
+    Новые дни вне привычного шума модели
+
+    Средняя абсолютная ошибка прогноза прежней модели на новых днях
+    сравнивается с шумом наблюдений sigma_obs в единицах ряда.
+    """
+    # Точечный прогноз без выборки интервалов неопределенности (как в Prophet.predict)
+    days = model.setup_dataframe(new_days[['ds']].copy())
+    trend = model.predict_trend(days)
+    components = model.predict_seasonal_components(days)
+    predicted = (trend * (1 + components['multiplicative_terms'])
+                 + components['additive_terms']).to_numpy()
+    noise = _point_params(model, 'sigma_obs')[0] * model.y_scale
+    error = np.abs(new_days['y'].to_numpy() - predicted).mean()
+    return error > INCREMENTAL_FIT_CONFIG['drift_threshold'] * noise
+
+
+def incremental_init(series_key, data, preprocessing=None, profile=None):
+    """
+    Начальное приближение для дообучения ряда или None для полной подгонки
+
+    Теплый старт допустим, если прежняя модель ряда есть в кэше, новый
+    ряд продолжает ее историю не больше чем на max_new_days и на новых
+    днях нет дрейфа.
+
+    Returns:
+        dict: init для fit_prophet_forecast или None
+    """
+    path = _series_path(series_key, preprocessing, profile)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            previous = load_cached_model(f.read().strip())
+    except OSError:
+        return None
+
+    if previous is None:
+        return None
+
+    model = previous[0]
+    history_start = model.history['ds'].min()
+    history_end = model.history['ds'].max()
+    ds = pd.to_datetime(data['ds'])
+    new_days = data[ds > history_end]
+
+    if ds.min() != history_start or not 0 < len(new_days) <= INCREMENTAL_FIT_CONFIG['max_new_days']:
+        return None
+
+    if _has_drift(model, new_days):
+        return None
+
+    return warm_start_params(model)
+
+
+def forecast_series(data, periods=30, preprocessing=None, use_cache=True, series_key=None,
+                    profile=None, params=None):
+    """
+    Модель и прогноз ряда: из кэша, дообучением с теплым стартом или полной подгонкой
+
+    Ошибки не перехватываются (для пакетного прогноза и вкладки).
+
+    Args:
+        data (pd.DataFrame): Ряд с колонками ds и y
+        periods (int): Горизонт прогноза, дней
+        preprocessing (dict): Настройки предобработки (входят в ключ кэша)
+        use_cache (bool): Использовать кэш моделей
+        series_key: Идентификатор ряда (например, (магазин, сегмент)) для дообучения
+        profile (str): Профиль скорости из PROPHET_PROFILES
+        params (dict): Параметры ряда поверх профиля (см. tuned_params)
+
+    Returns:
+        tuple: (model, forecast)
+    """
+    cache_key = model_cache_key(data, preprocessing, profile, params) if use_cache else None
+
+    if cache_key:
+        cached = load_cached_model(cache_key)
+        if cached is not None:
+            model, forecast = cached
+            extended = extend_forecast(model, forecast, periods)
+            if len(extended) > len(forecast):
+                # Более длинный прогноз остается в памяти для следующих запросов
+                _remember_model(cache_key, (model, extended.copy()))
+            return model, extended
+
+    init = None
+    if use_cache and series_key is not None and INCREMENTAL_FIT_CONFIG['enabled']:
+        init = incremental_init(series_key, data, preprocessing, profile)
+
+    try:
+        model, forecast = fit_prophet_forecast(data, periods, init=init, profile=profile, params=params)
+    except Exception:
+        if init is None:
+            raise
+        # Приближение не подошло (например, изменилось число точек излома)
+        model, forecast = fit_prophet_forecast(data, periods, profile=profile, params=params)
+
+    if cache_key:
+        store_cached_model(cache_key, model, forecast.copy())
+        if series_key is not None:
+            _remember_series(series_key, preprocessing, cache_key, profile)
+
+    return model, forecast
+
+
+def train_prophet_model(data, periods=30, preprocessing=None, use_cache=True, series_key=None,
+                        profile=None, params=None):
+    """
+    Обучает модель Prophet
+
+    Повторный запрос с тем же рядом, параметрами и предобработкой
+    отдается из кэша моделей без оптимизации Stan, в том числе с другим
+    горизонтом (см. extend_forecast). Если задан series_key
+    и ряд пополнился новыми днями, модель дообучается с теплым стартом
+    от прежних параметров (см. forecast_series).
+
+    Args:
+        data (pd.DataFrame): Ряд с колонками ds и y
+        periods (int): Горизонт прогноза, дней
+        preprocessing (dict): Настройки предобработки (входят в ключ кэша)
+        use_cache (bool): Использовать кэш моделей
+        series_key: Идентификатор ряда для дообучения
+        profile (str): Профиль скорости из PROPHET_PROFILES
+        params (dict): Параметры ряда поверх профиля
+
+    Returns:
+        tuple: (model, forecast) или (None, None) при ошибке
+    """
+    try:
+        return forecast_series(data, periods, preprocessing, use_cache, series_key, profile, params)
 
     except Exception as e:
         st.error(f"❌ Ошибка при обучении модели: {str(e)}")
         return None, None
 
 
-def calculate_model_accuracy(train_data, model):
-    """Корректный расчет метрик точности"""
+def calculate_model_accuracy(train_data, model, forecast=None):
+    """
+    Метрики подгонки модели на обучающей истории (для качества прогноза см. backtest)
+
+    Если передан прогноз модели, его строки истории используются вместо
+    повторного model.predict по всей истории.
+    """
     try:
-        historical_forecast = model.predict(train_data[['ds']])
+        if forecast is not None:
+            historical_forecast = pd.DataFrame({'ds': pd.to_datetime(train_data['ds'])}).merge(
+                forecast[['ds', 'yhat']], on='ds', how='inner')
+        else:
+            historical_forecast = model.predict(train_data[['ds']])
 
         y_true = train_data['y'].values
         y_pred = historical_forecast['yhat'].values
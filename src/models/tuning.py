@@ -0,0 +1,313 @@
+"""
+Подбор параметров Prophet по рядам: successive halving на коротких бэктестах
+
+Конфигурации (переопределения PROPHET_PARAMS) сначала проверяются
+на одном последнем фолде, на следующую ступень проходит лучшая 1/eta
+часть, и ей добавляются более ранние фолды, пока не останется одна
+конфигурация или не кончится бюджет фолдов. Фолды строятся make_folds
+от конца ряда, поэтому ступень с большим числом фолдов сохраняет уже
+обученные, а модели фолдов кэшируются общим кэшем моделей.
+"""
+
+import hashlib
+import itertools
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from ..config.settings import BACKTEST_CONFIG, TUNING_CONFIG
+from .backtest import BACKTEST_METRICS, _backtest_fold, make_folds, score_predictions
+from .batch_forecast import _quiet_worker
+from .prophet_model import model_cache_key
+
+
+def parameter_grid(space=None, samples=None, seed=0):
+    """
+    Конфигурации параметров: вся сетка или случайная выборка из нее
+
+    Args:
+        space (dict): Параметр -> список значений (по умолчанию из TUNING_CONFIG)
+        samples (int): Число случайных конфигураций (None - вся сетка)
+        seed (int): Зерно выборки
+
+    Returns:
+        list: Словари переопределений PROPHET_PARAMS
+    """
+    space = space or TUNING_CONFIG['space']
+    names = sorted(space)
+    grid = [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+    if samples and samples < len(grid):
+        chosen = np.random.default_rng(seed).choice(len(grid), samples, replace=False)
+        grid = [grid[index] for index in sorted(chosen)]
+    return grid
+
+
+def halving_budgets(n_folds, min_folds=None, eta=None):
+    """
+    Фолдов на каждой ступени: min_folds, min_folds·eta, ... до n_folds
+
+    Returns:
+        list: Возрастающие числа фолдов, последнее равно n_folds
+    """
+    min_folds = min_folds or TUNING_CONFIG['min_folds']
+    eta = eta or TUNING_CONFIG['eta']
+
+    budgets = []
+    folds = min(min_folds, n_folds)
+    while folds < n_folds:
+        budgets.append(folds)
+        folds *= eta
+    return budgets + [n_folds]
+
+
+def _tuning_fold(config_id, fold, train, test, preprocessing, season, profile, params):
+    """Фолд одной конфигурации в процессе пула (см. _backtest_fold)"""
+    return (config_id,) + _backtest_fold(fold, train, test, preprocessing, season, profile, params)
+
+
+def _config_score(results, config_id, folds, metric):
+    """Средняя метрика конфигурации по фолдам ступени (inf при ошибке фолда)"""
+    parts = [results[(config_id, fold)] for fold in folds]
+    if any(error is not None for _, _, error in parts):
+        return np.inf, next(error for _, _, error in parts if error is not None)
+
+    predictions = pd.concat([frame.assign(fold=fold) for fold, (frame, _, _) in zip(folds, parts)],
+                            ignore_index=True)
+    scales = pd.Series({fold: scale for fold, (_, scale, _) in zip(folds, parts)})
+    score = score_predictions(predictions, scales)[metric].mean()
+    return (score if np.isfinite(score) else np.inf), None
+
+
+def successive_halving(data, configs, preprocessing=None, eta=None, min_folds=None, max_folds=None,
+                       horizon=None, step=None, metric=None, profile=None, workers=None,
+                       on_progress=None):
+    """
+    Отбор конфигураций Prophet successive halving на бэктесте ряда
+
+    Фолды всех конфигураций ступени обучаются параллельно в пуле
+    процессов; конфигурация с упавшим фолдом выбывает.
+
+    Args:
+        data (pd.DataFrame): Исходный дневной ряд с колонками ds и y
+        configs (list): Словари переопределений PROPHET_PARAMS
+        preprocessing (dict): Настройки предобработки обучающих дней фолдов
+        eta (int): На следующую ступень проходит 1/eta конфигураций
+        min_folds (int): Фолдов на первой ступени
+        max_folds (int): Фолдов на последней ступени
+        horizon (int): Дней прогноза в фолде
+        step (int): Сдвиг между точками прогноза, дней
+        metric (str): Метрика из BACKTEST_METRICS (меньше - лучше)
+        profile (str): Профиль скорости Prophet для фолдов
+        workers (int): Процессов (1 - последовательно в текущем процессе)
+        on_progress (callable): Вызывается с (обучено фолдов, всего фолдов по плану)
+
+    Returns:
+        pd.DataFrame: config (номер в configs), folds (фолдов на последней
+                      пройденной ступени), score, error; лучшие первыми
+    """
+    eta = eta or TUNING_CONFIG['eta']
+    max_folds = max_folds or TUNING_CONFIG['max_folds']
+    horizon = horizon or TUNING_CONFIG['horizon']
+    step = step or TUNING_CONFIG['step']
+    metric = metric or TUNING_CONFIG['metric']
+    profile = profile or TUNING_CONFIG['profile']
+    workers = workers or TUNING_CONFIG['workers']
+
+    if metric not in BACKTEST_METRICS:
+        raise ValueError(f"Неизвестная метрика: {metric}")
+
+    data = data[['ds', 'y']].assign(ds=pd.to_datetime(data['ds'])).sort_values('ds')
+    table = make_folds(data['ds'], horizon, step, max_folds)
+    if table.empty:
+        raise ValueError("Недостаточно истории для подбора параметров")
+
+    folds = {}
+    for fold in table.itertuples(index=False):
+        train = data[(data['ds'] >= fold.train_start) & (data['ds'] <= fold.cutoff)].reset_index(drop=True)
+        test = data[(data['ds'] > fold.cutoff) & (data['ds'] <= fold.test_end)].reset_index(drop=True)
+        folds[fold.fold] = (train, test)
+
+    budgets = halving_budgets(len(table), min_folds, eta)
+
+    # План обучений для прогресса: ступени добавляют фолды выжившим
+    total, alive, previous = 0, len(configs), 0
+    for budget in budgets:
+        total += alive * (budget - previous)
+        alive, previous = max(1, math.ceil(alive / eta)), budget
+
+    results = {}
+    scores = {}
+    survivors = list(range(len(configs)))
+    workers = max(1, min(workers, total))
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_quiet_worker) if workers > 1 else None
+
+    def collect(result):
+        config_id, fold, predictions, scale, error, _ = result
+        results[(config_id, fold)] = (predictions, scale, error)
+        if on_progress:
+            on_progress(len(results), total)
+
+    try:
+        if executor is None:
+            _quiet_worker()
+
+        for rung, budget in enumerate(budgets):
+            rung_folds = list(table['fold'].iloc[-budget:])
+            tasks = [
+                (config_id, fold, *folds[fold], preprocessing, BACKTEST_CONFIG['season'],
+                 profile, configs[config_id])
+                for config_id in survivors for fold in rung_folds
+                if (config_id, fold) not in results
+            ]
+
+            if executor is None:
+                for task in tasks:
+                    collect(_tuning_fold(*task))
+            else:
+                futures = {executor.submit(_tuning_fold, *task): task for task in tasks}
+                for future in as_completed(futures):
+                    try:
+                        collect(future.result())
+                    except Exception as e:
+                        # Процесс пула упал - ошибка фолда конфигурации
+                        config_id, fold = futures[future][:2]
+                        collect((config_id, fold, None, np.nan, f"{type(e).__name__}: {e}", 0))
+
+            for config_id in survivors:
+                scores[config_id] = (budget,) + _config_score(results, config_id, rung_folds, metric)
+
+            if rung < len(budgets) - 1:
+                ranked = sorted(survivors, key=lambda config_id: scores[config_id][1])
+                survivors = ranked[:max(1, math.ceil(len(survivors) / eta))]
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    ranking = pd.DataFrame(
+        [(config_id, budget, score, error) for config_id, (budget, score, error) in scores.items()],
+        columns=['config', 'folds', 'score', 'error']
+    )
+    return ranking.sort_values(['folds', 'score', 'config'], ascending=[False, True, True],
+                               ignore_index=True)
+
+
+def _space_key(space, samples):
+    """Ключ пространства поиска и настроек отбора (смена настроек - полный подбор)"""
+    settings = {name: TUNING_CONFIG[name] for name in
+                ('eta', 'min_folds', 'max_folds', 'horizon', 'step', 'metric', 'profile')}
+    source = json.dumps({'space': space, 'samples': samples, 'settings': settings},
+                        sort_keys=True, default=str)
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()[:32]
+
+
+def _tuning_path(series_key, preprocessing, tuning_dir=None):
+    """Путь к файлу подобранных параметров ряда"""
+    tuning_dir = tuning_dir or TUNING_CONFIG['path']
+    name = hashlib.sha256(json.dumps([series_key, preprocessing or {}],
+                                     default=str).encode('utf-8')).hexdigest()[:32]
+    return os.path.join(tuning_dir, f"{name}.json")
+
+
+def load_tuning(series_key, preprocessing=None, tuning_dir=None):
+    """
+    Результат последнего подбора ряда
+
+    Returns:
+        dict: params, score, metric, ranking, data_end, tuned_at и ключи
+              или None, если ряд не подбирался
+    """
+    try:
+        with open(_tuning_path(series_key, preprocessing, tuning_dir), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def tuned_params(series_key, preprocessing=None, tuning_dir=None):
+    """
+    Подобранные параметры ряда для последующих обучений
+
+    Returns:
+        dict: Переопределения PROPHET_PARAMS или None
+    """
+    tuning = load_tuning(series_key, preprocessing, tuning_dir)
+    return tuning['params'] if tuning else None
+
+
+def _save_tuning(series_key, preprocessing, tuning, tuning_dir=None):
+    """Атомарно сохраняет результат подбора ряда"""
+    path = _tuning_path(series_key, preprocessing, tuning_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(tuning, f, ensure_ascii=False, indent=2, default=str)
+    os.replace(f"{path}.tmp", path)
+
+
+def tune_series(data, series_key=None, preprocessing=None, space=None, samples=None,
+                workers=None, on_progress=None):
+    """
+    Подбирает параметры Prophet ряда и сохраняет лучшие
+
+    Повторный подбор дешевле первого: неизменный ряд возвращает
+    сохраненный результат без обучений, а пополненный новыми днями
+    перепроверяет только retune_top лучших прежних конфигураций на
+    полном числе фолдов. Полный подбор идет при смене пространства
+    поиска или настроек отбора.
+
+    Args:
+        data (pd.DataFrame): Исходный дневной ряд с колонками ds и y
+                             (предобработка применяется внутри фолдов)
+        series_key: Идентификатор ряда (как в forecast_series); None - без сохранения
+        preprocessing (dict): Настройки предобработки ряда
+        space (dict): Пространство поиска (по умолчанию из TUNING_CONFIG)
+        samples (int): Случайных конфигураций из сетки (по умолчанию из TUNING_CONFIG)
+        workers (int): Процессов обучения фолдов
+        on_progress (callable): Вызывается с (обучено фолдов, всего фолдов)
+
+    Returns:
+        dict: params (лучшие переопределения), score, metric, ranking
+              (конфигурации с числом фолдов и оценкой), data_end, tuned_at
+    """
+    space = space or TUNING_CONFIG['space']
+    samples = samples if samples is not None else TUNING_CONFIG['samples']
+    space_key = _space_key(space, samples)
+    data_key = model_cache_key(data, preprocessing)
+
+    saved = load_tuning(series_key, preprocessing) if series_key is not None else None
+    min_folds = None
+
+    if saved is not None and saved['space_key'] == space_key:
+        if saved['data_key'] == data_key:
+            return saved
+        configs = [row['params'] for row in saved['ranking'][:TUNING_CONFIG['retune_top']]]
+        min_folds = TUNING_CONFIG['max_folds']
+    else:
+        configs = parameter_grid(space, samples)
+
+    ranking = successive_halving(data, configs, preprocessing, min_folds=min_folds,
+                                 workers=workers, on_progress=on_progress)
+    best = ranking.iloc[0]
+    if not np.isfinite(best['score']):
+        raise ValueError(f"Ни одна конфигурация не обучилась: {best['error']}")
+
+    tuning = {
+        'params': configs[best['config']],
+        'score': float(best['score']),
+        'metric': TUNING_CONFIG['metric'],
+        'ranking': [
+            {'params': configs[row.config], 'folds': int(row.folds),
+             'score': float(row.score) if np.isfinite(row.score) else None, 'error': row.error}
+            for row in ranking.itertuples(index=False)
+        ],
+        'data_end': pd.to_datetime(data['ds']).max().isoformat(),
+        'tuned_at': pd.Timestamp.now().isoformat(),
+        'space_key': space_key,
+        'data_key': data_key
+    }
+
+    if series_key is not None:
+        _save_tuning(series_key, preprocessing, tuning)
+    return tuning
@@ -1,12 +1,16 @@
 """UI компоненты и виджеты"""
 
 import streamlit as st
+from ..config.settings import DEFAULT_PROPHET_PROFILE, PROPHET_PROFILES
+from ..utils.sales_cube import get_sales_cube
 
 
 def show_data_statistics(df):
     """Отображает статистику данных"""
     st.markdown("## 📊 Статистика данных")
 
+    cube = get_sales_cube(df)
+
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
@@ -31,7 +35,7 @@ def show_data_statistics(df):
         st.markdown(
             f"""<div class="metric-container">
                 <h3>🏪 Магазинов</h3>
-                <h2>{df['Magazin'].nunique()}</h2>
+                <h2>{cube.nunique('Magazin')}</h2>
             </div>""",
             unsafe_allow_html=True
         )
@@ -40,7 +44,7 @@ def show_data_statistics(df):
         st.markdown(
             f"""<div class="metric-container">
                 <h3>📂 Сегментов</h3>
-                <h2>{df['Segment'].nunique()}</h2>
+                <h2>{cube.nunique('Segment')}</h2>
             </div>""",
             unsafe_allow_html=True
         )
@@ -48,11 +52,22 @@ def show_data_statistics(df):
     col1, col2, col3 = st.columns(3)
 
     with col1:
-        st.info(f"📅 **Период данных**: {df['Datasales'].min().date()} - {df['Datasales'].max().date()}")
+        first_day, last_day = cube.period
+        st.info(f"📅 **Период данных**: {first_day.date()} - {last_day.date()}")
     with col2:
-        st.info(f"💰 **Общая выручка**: {df['Sum'].sum():.0f} ГРН")
+        st.info(f"💰 **Общая выручка**: {cube.total('Sum'):.0f} ГРН")
     with col3:
-        st.info(f"📈 **Средние продажи/день**: {df.groupby('Datasales')['Qty'].sum().mean():.1f} шт.")
+        st.info(f"📈 **Средние продажи/день**: {cube.rollup(['Datasales'])['Qty'].mean():.1f} шт.")
+
+    if 'memory_after_mb' in df.attrs:
+        memory_before = df.attrs['memory_before_mb']
+        memory_after = df.attrs['memory_after_mb']
+        ratio = memory_before / memory_after if memory_after > 0 else 1
+        st.caption(
+            f"💾 Память набора данных: {memory_after:.1f} МБ "
+            f"(было {memory_before:.1f} МБ, сэкономлено "
+            f"{memory_before - memory_after:.1f} МБ, в {ratio:.1f} раза меньше)"
+        )
 
 
 def show_accuracy_table(metrics):
@@ -74,6 +89,30 @@ def show_accuracy_table(metrics):
     st.markdown('</div>', unsafe_allow_html=True)
 
 
+def show_backtest_table(scores):
+    """Отображает метрики бэктеста: средние по фолдам и таблицу фолдов"""
+    st.markdown("### 🧪 Бэктест: точность прогноза вне обучения")
+
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric("MAE", f"{scores['MAE'].mean():.2f}")
+    with col2:
+        st.metric("RMSE", f"{scores['RMSE'].mean():.2f}")
+    with col3:
+        st.metric("WAPE", f"{scores['WAPE'].mean():.1f}%")
+    with col4:
+        st.metric("MASE", f"{scores['MASE'].mean():.2f}")
+
+    display = scores.copy()
+    for column in ['train_start', 'cutoff', 'test_end']:
+        display[column] = display[column].dt.strftime('%d.%m.%Y')
+    display.columns = ['Фолд', 'Начало обучения', 'Точка прогноза', 'Конец проверки',
+                       'MAE', 'RMSE', 'WAPE %', 'MASE', 'Ошибка']
+
+    st.dataframe(display.round(2), use_container_width=True, hide_index=True)
+
+
 def show_forecast_statistics(filtered_df, forecast, forecast_days, magazin, segment):
     """Показывает статистику прогноза"""
     st.markdown("## 📊 Статистика прогноза")
@@ -141,6 +180,15 @@ def render_sidebar(df=None):
             step=1
         )
 
+        profile = st.selectbox(
+            "⏱️ Профиль Prophet",
+            options=list(PROPHET_PROFILES),
+            index=list(PROPHET_PROFILES).index(DEFAULT_PROPHET_PROFILE),
+            format_func=lambda x: PROPHET_PROFILES[x]['label'],
+            help="Быстрый - обучение за доли секунды без симуляции интервалов, "
+                 "точный - полная симуляция неопределенности"
+        )
+
         st.markdown("### 🧹 Предобработка данных")
 
         remove_outliers = st.checkbox(
@@ -171,7 +219,7 @@ def render_sidebar(df=None):
         else:
             smooth_window = 7
 
-    return forecast_days, remove_outliers, smooth_method, smooth_window
+    return forecast_days, remove_outliers, smooth_method, smooth_window, profile
 
 
 def show_welcome_screen(data_source="📁 Excel файл"):
@@ -5,23 +5,15 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
+from ...utils.sales_cube import get_sales_cube
 
 
 def calculate_abc_analysis(df, magazin='Все магазины', segment='Все сегменты'):
     """Рассчитывает ABC анализ товаров"""
-    filtered = df.copy()
+    cube = get_sales_cube(df).subset(magazin, segment)
 
-    if magazin != 'Все магазины':
-        filtered = filtered[filtered['Magazin'] == magazin]
-
-    if segment != 'Все сегменты':
-        filtered = filtered[filtered['Segment'] == segment]
-
-    # Группировка по товарам
-    product_sales = filtered.groupby('Model').agg({
-        'Sum': 'sum',
-        'Qty': 'sum'
-    }).reset_index()
+    # Свертка куба по товарам
+    product_sales = cube.rollup(['Model'])[['Model', 'Sum', 'Qty']]
 
     # Сортировка по выручке
     product_sales = product_sales.sort_values('Sum', ascending=False)
@@ -47,21 +39,13 @@ def calculate_abc_analysis(df, magazin='Все магазины', segment='Вс
 
 def calculate_xyz_analysis(df, magazin='Все магазины', segment='Все сегменты'):
     """Рассчитывает XYZ анализ товаров (по стабильности спроса)"""
-    filtered = df.copy()
+    cube = get_sales_cube(df).subset(magazin, segment)
 
-    if magazin != 'Все магазины':
-        filtered = filtered[filtered['Magazin'] == magazin]
-
-    if segment != 'Все сегменты':
-        filtered = filtered[filtered['Segment'] == segment]
-
-    # Группировка по товарам и датам
-    daily_product_sales = filtered.groupby(['Model', 'Datasales']).agg({
-        'Qty': 'sum'
-    }).reset_index()
+    # Дневные продажи товаров из куба
+    daily_product_sales = cube.rollup(['Model', 'Datasales'])[['Model', 'Datasales', 'Qty']]
 
     # Расчет коэффициента вариации для каждого товара
-    product_variability = daily_product_sales.groupby('Model').agg({
+    product_variability = daily_product_sales.groupby('Model', observed=True).agg({
         'Qty': ['mean', 'std']
     }).reset_index()
 
@@ -105,16 +89,8 @@ def render_abc_xyz_tab(df, selected_magazin='Все магазины', selected_
     - **Z** - нестабильный спрос (CV > 25%)
     """)
 
-    # Фильтрация данных
-    filtered_df = df.copy()
-
-    if selected_magazin != 'Все магазины':
-        filtered_df = filtered_df[filtered_df['Magazin'] == selected_magazin]
-
-    if selected_segment != 'Все сегменты':
-        filtered_df = filtered_df[filtered_df['Segment'] == selected_segment]
-
-    if len(filtered_df) == 0:
+    # Ячейки куба для выбранных фильтров
+    if get_sales_cube(df).subset(selected_magazin, selected_segment).n_cells == 0:
         st.warning("⚠️ Нет данных для выбранных фильтров")
         return
 
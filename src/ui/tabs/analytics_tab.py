@@ -3,7 +3,8 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-from ...config.settings import WEEKDAY_TRANSLATION
+from ...config.settings import WEEKDAY_LABELS
+from ...utils.sales_cube import get_sales_cube
 
 
 def render_analytics_tab(df, selected_magazin='Все магазины', selected_segment='Все сегменты'):
@@ -11,31 +12,18 @@ def render_analytics_tab(df, selected_magazin='Все магазины', selecte
 
     st.markdown("## 📊 Расширенная аналитика продаж")
 
-    # Фильтрация данных
-    filtered_df = df.copy()
+    # Ячейки куба продаж для выбранных фильтров
+    cube = get_sales_cube(df).subset(selected_magazin, selected_segment)
 
-    if selected_magazin != 'Все магазины':
-        filtered_df = filtered_df[filtered_df['Magazin'] == selected_magazin]
-
-    if selected_segment != 'Все сегменты':
-        filtered_df = filtered_df[filtered_df['Segment'] == selected_segment]
-
-    if len(filtered_df) == 0:
+    if cube.n_cells == 0:
         st.warning("⚠️ Нет данных для выбранных фильтров")
         return
 
     # Анализ по дням недели
     st.markdown("### 📅 Анализ продаж по дням недели")
 
-    filtered_df_weekday = filtered_df.copy()
-    filtered_df_weekday['Weekday'] = filtered_df_weekday['Datasales'].dt.dayofweek
-    filtered_df_weekday['Weekday_Name'] = filtered_df_weekday['Datasales'].dt.day_name()
-    filtered_df_weekday['Weekday_Name_RU'] = filtered_df_weekday['Weekday_Name'].map(WEEKDAY_TRANSLATION)
-
-    weekday_stats = filtered_df_weekday.groupby(['Weekday', 'Weekday_Name_RU']).agg({
-        'Qty': 'sum',
-        'Sum': 'sum'
-    }).reset_index().sort_values('Weekday')
+    weekday_stats = cube.rollup(['weekday'])
+    weekday_stats['Weekday_Name_RU'] = [WEEKDAY_LABELS[code] for code in weekday_stats['weekday']]
 
     col1, col2 = st.columns(2)
 
@@ -76,10 +64,7 @@ def render_analytics_tab(df, selected_magazin='Все магазины', selecte
     # Топ товаров
     st.markdown("### 🏆 Топ товаров по продажам")
 
-    top_products = filtered_df.groupby('Model').agg({
-        'Qty': 'sum',
-        'Sum': 'sum'
-    }).reset_index().sort_values('Sum', ascending=False).head(10)
+    top_products = cube.rollup(['Model']).sort_values('Sum', ascending=False).head(10)
 
     col1, col2 = st.columns(2)
 
@@ -117,16 +102,7 @@ def render_analytics_tab(df, selected_magazin='Все магазины', selecte
     # Анализ по месяцам
     st.markdown("### 📆 Анализ по месяцам")
 
-    filtered_df_monthly = filtered_df.copy()
-    filtered_df_monthly['Month'] = filtered_df_monthly['Datasales'].dt.to_period('M')
-
-    monthly_stats = filtered_df_monthly.groupby('Month').agg({
-        'Qty': 'sum',
-        'Sum': 'sum',
-        'Art': 'nunique'
-    }).reset_index()
-
-    monthly_stats['Month'] = monthly_stats['Month'].dt.to_timestamp()
+    monthly_stats = cube.rollup(['month']).rename(columns={'month': 'Month'})
 
     fig_monthly = go.Figure()
 
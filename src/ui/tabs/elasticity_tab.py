@@ -5,18 +5,13 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
+from ...utils.sales_index import filter_sales
 
 
 def calculate_price_elasticity(df, magazin='Все магазины', segment='Все сегменты'):
     """Рассчитывает ценовую эластичность спроса для товаров"""
 
-    filtered = df.copy()
-
-    if magazin != 'Все магазины':
-        filtered = filtered[filtered['Magazin'] == magazin]
-
-    if segment != 'Все сегменты':
-        filtered = filtered[filtered['Segment'] == segment]
+    filtered = filter_sales(df, magazin, segment)
 
     # Получаем уникальные модели
     all_models = filtered['Model'].unique()
@@ -126,13 +121,7 @@ def render_elasticity_tab(df, selected_magazin='Все магазины', select
     """)
 
     # Фильтрация данных
-    filtered_df = df.copy()
-
-    if selected_magazin != 'Все магазины':
-        filtered_df = filtered_df[filtered_df['Magazin'] == selected_magazin]
-
-    if selected_segment != 'Все сегменты':
-        filtered_df = filtered_df[filtered_df['Segment'] == selected_segment]
+    filtered_df = filter_sales(df, selected_magazin, selected_segment)
 
     if len(filtered_df) == 0:
         st.warning("⚠️ Нет данных для выбранных фильтров")
@@ -1,288 +1,540 @@
 """Вкладка прогнозирования"""
 
-import streamlit as st
 import pandas as pd
-from ...models.prophet_model import train_prophet_model, calculate_model_accuracy
+import streamlit as st
+from ...config.settings import JOB_QUEUE_CONFIG, MODEL_CACHE_CONFIG, WEEKDAY_LABELS
+from ...models.backtest import backtest
+from ...models.hierarchy import RECONCILIATION_METHODS, get_hierarchical_forecast
+from ...models.prophet_model import forecast_series, calculate_model_accuracy, extend_forecast, prophet_params
+from ...models.tuning import load_tuning, parameter_grid, tune_series, tuned_params
 from ...utils.data_processing import prepare_prophet_data
+from ...utils.forecast_store import get_forecast_store, series_id
+from ...utils.job_queue import DONE, FAILED, JOB_STATUS_LABELS, get_job_queue
+from ...utils.sales_cube import get_sales_cube
+from ...utils.sales_index import filter_sales, get_sales_index
 from ...visualization.plots import (
     plot_data_preprocessing, plot_forecast, plot_prophet_components,
     plot_sales_by_weekday, plot_top_products, plot_monthly_revenue_trend,
     plot_sales_heatmap, plot_daily_sales_distribution, plot_sales_trend_comparison
 )
-from ..components import show_accuracy_table, show_forecast_statistics
+from ..components import show_accuracy_table, show_backtest_table, show_forecast_statistics
 
 
 def render_forecast_tab(df, selected_magazin, selected_segment, forecast_days,
-                        remove_outliers, smooth_method, smooth_window):
+                        remove_outliers, smooth_method, smooth_window, profile=None):
     """Отрисовывает вкладку прогнозирования"""
 
     st.markdown("## 🎯 Выбор параметров анализа")
 
+    sales_index = get_sales_index(df)
+
     col1, col2 = st.columns(2)
 
     with col1:
-        available_magazins = ['Все магазины'] + sorted(df['Magazin'].unique().tolist())
+        available_magazins = ['Все магазины'] + sales_index.magazins
         magazin = st.selectbox("🏪 Выберите магазин", available_magazins,
                               index=available_magazins.index(selected_magazin) if selected_magazin in available_magazins else 0)
 
     with col2:
-        if magazin == 'Все магазины':
-            available_segments = ['Все сегменты'] + sorted(df['Segment'].unique().tolist())
-        else:
-            magazin_df = df[df['Magazin'] == magazin]
-            available_segments = ['Все сегменты'] + sorted(magazin_df['Segment'].unique().tolist())
+        available_segments = ['Все сегменты'] + sales_index.segments(magazin)
 
         segment = st.selectbox("📂 Выберите сегмент", available_segments,
                               index=available_segments.index(selected_segment) if selected_segment in available_segments else 0)
 
-    if st.button("🚀 Создать прогноз", type="primary", use_container_width=True):
-        with st.spinner("🔄 Обучение модели..."):
-            filtered_df = df.copy()
+    selection = (df.attrs.get('dataset_id'), magazin, segment,
+                 remove_outliers, smooth_method, smooth_window, profile)
+    handles = st.session_state.setdefault('forecast_handles', {})
 
-            if magazin != 'Все магазины':
-                filtered_df = filtered_df[filtered_df['Magazin'] == magazin]
+    jobs = st.session_state.setdefault('forecast_jobs', {})
+    queue = get_job_queue()
 
-            if segment != 'Все сегменты':
-                filtered_df = filtered_df[filtered_df['Segment'] == segment]
+    if st.button("🚀 Создать прогноз", type="primary", use_container_width=True):
+        if len(filter_sales(df, magazin, segment)) < 10:
+            st.error("❌ Недостаточно данных для прогнозирования (минимум 10 записей)")
+            return magazin, segment
+
+        # Обучение идет в фоне: перерисовки не ждут Stan, а повторный
+        # запрос того же выбора присоединяется к уже идущей задаче
+        jobs[selection] = queue.submit(
+            ('forecast', selection), _fit_selection, df, magazin, segment, forecast_days,
+            remove_outliers, smooth_method, smooth_window, profile
+        )
+
+    job = queue.get(jobs.get(selection))
+    if job is not None and not job.finished:
+        _watch_job(job.id)
+        return magazin, segment
+
+    if job is not None:
+        # Результат забирается один раз, дальше выбор живет в handles
+        del jobs[selection]
+        if job.status == DONE:
+            handles.pop(selection, None)
+            handles[selection] = job.result
+            while len(handles) > MODEL_CACHE_CONFIG['memory_entries']:
+                handles.pop(next(iter(handles)))
+            st.success(f"✅ Модель успешно обучена за {job.elapsed:.1f} с!")
+            _store_forecast(job.result, magazin, segment)
+        elif job.status == FAILED:
+            st.error(f"❌ Ошибка при обучении модели: {job.error}")
+        else:
+            st.info("⛔ Обучение модели отменено")
 
-            if len(filtered_df) < 10:
-                st.error("❌ Недостаточно данных для прогнозирования (минимум 10 записей)")
-                return magazin, segment
+    # Обученная модель выбора переживает перерисовки: смена горизонта
+    # только продлевает или обрезает прогноз, без переобучения
+    handle = handles.get(selection)
+    if handle is not None:
+        _render_forecast(df, handle, forecast_days, magazin, segment)
+
+    return magazin, segment
 
-            prophet_data, original_data = prepare_prophet_data(
-                filtered_df,
-                remove_outliers=remove_outliers,
-                smooth_method=smooth_method if smooth_method != 'none' else None,
-                smooth_window=smooth_window
-            )
 
-            # Предобработка данных
-            if remove_outliers or (smooth_method and smooth_method != 'none'):
-                st.markdown("## 🧹 Предварительная обработка данных")
-
-                col1, col2 = st.columns(2)
-
-                with col1:
-                    st.markdown("### 📊 Статистика до обработки")
-                    st.metric("Среднее", f"{original_data['y'].mean():.2f}")
-                    st.metric("Std. отклонение", f"{original_data['y'].std():.2f}")
-                    volatility_before = (original_data['y'].std()/original_data['y'].mean()*100) if original_data['y'].mean() > 0 else 0
-                    st.metric("Волатильность", f"{volatility_before:.1f}%")
-
-                with col2:
-                    st.markdown("### ✨ Статистика после обработки")
-                    st.metric("Среднее", f"{prophet_data['y'].mean():.2f}",
-                             delta=f"{prophet_data['y'].mean() - original_data['y'].mean():.2f}")
-                    st.metric("Std. отклонение", f"{prophet_data['y'].std():.2f}",
-                             delta=f"{prophet_data['y'].std() - original_data['y'].std():.2f}")
-                    volatility_after = (prophet_data['y'].std()/prophet_data['y'].mean()*100) if prophet_data['y'].mean() > 0 else 0
-                    st.metric("Волатильность", f"{volatility_after:.1f}%",
-                             delta=f"{volatility_after - volatility_before:.1f}%")
-
-                fig_preprocessing = plot_data_preprocessing(
-                    original_data, prophet_data,
-                    "🔄 Сравнение: Оригинальные vs Обработанные данные"
+def _store_key(magazin, segment):
+    """Ключ ряда выбора в хранилище прогнозов (агрегаты - None)"""
+    return {
+        'Magazin': None if magazin == 'Все магазины' else magazin,
+        'Segment': None if segment == 'Все сегменты' else segment
+    }
+
+
+def _store_forecast(handle, magazin, segment):
+    """Сохраняет дни прогноза обученной модели новой версией в хранилище прогнозов"""
+    forecast = handle['forecast']
+    future = forecast[forecast['ds'] > handle['prophet_data']['ds'].max()]
+
+    try:
+        handle['run_id'] = get_forecast_store().save(
+            future,
+            _store_key(magazin, segment),
+            profile=handle['profile'],
+            params={'prophet': prophet_params(handle['profile'], handle['params']),
+                    'preprocessing': handle['preprocessing']}
+        )
+    except Exception as e:
+        st.warning(f"⚠️ Не удалось сохранить прогноз в хранилище: {str(e)}")
+
+
+def _watch_job(job_id):
+    """
+    Показывает состояние фоновой задачи обучения с кнопкой отмены
+
+    Если версия Streamlit поддерживает фрагменты, состояние обновляется
+    само каждые poll_interval секунд, а по завершении задачи скрипт
+    перезапускается для отрисовки результата.
+    """
+    fragment = getattr(st, 'fragment', None)
+
+    def show_status():
+        job = get_job_queue().get(job_id)
+        if job is None or job.finished:
+            st.rerun()
+
+        st.progress(job.progress, text=f"{JOB_STATUS_LABELS[job.status]}: "
+                                       f"{job.message or 'ожидание'} ({job.elapsed:.0f} с)")
+        if st.button("⛔ Отменить обучение", key=f"cancel_{job_id}"):
+            get_job_queue().cancel(job_id)
+            st.rerun()
+
+    if fragment is not None:
+        fragment(run_every=JOB_QUEUE_CONFIG['poll_interval'])(show_status)()
+    else:
+        show_status()
+        st.button("🔄 Обновить состояние")
+
+
+def _tune_selection(job, original_data, series_key, preprocessing):
+    """Подбор параметров ряда (задача очереди), прогресс - обученные фолды"""
+    job.report(0, 1, "Фолды бэктеста")
+    return tune_series(original_data, series_key, preprocessing, on_progress=job.report)
+
+
+def _render_tuning(df, handle, magazin, segment):
+    """Запуск подбора параметров ряда и таблица его результатов"""
+    series_key = series_id(_store_key(magazin, segment))
+    preprocessing = handle['preprocessing']
+    key = ('tuning', df.attrs.get('dataset_id'), series_key, tuple(sorted(preprocessing.items())))
+    jobs = st.session_state.setdefault('tuning_jobs', {})
+    queue = get_job_queue()
+
+    if st.button("Подобрать параметры", key="run_tuning"):
+        jobs[key] = queue.submit(key, _tune_selection, handle['original_data'], series_key, preprocessing)
+
+    job = queue.get(jobs.get(key))
+    if job is not None and not job.finished:
+        _watch_job(job.id)
+        return
+
+    if job is not None:
+        del jobs[key]
+        if job.status == DONE:
+            st.success("✅ Параметры подобраны: нажмите «Создать прогноз», чтобы обучить модель с ними")
+        elif job.status == FAILED:
+            st.error(f"❌ Ошибка подбора параметров: {job.error}")
+        else:
+            st.info("⛔ Подбор параметров отменен")
+
+    tuning = load_tuning(series_key, preprocessing)
+    if tuning is None:
+        st.caption(f"{len(parameter_grid())} конфигураций сравниваются на коротких бэктестах: "
+                   "после каждой ступени остается лучшая часть, ей добавляются фолды")
+        return
+
+    if handle['params'] == tuning['params']:
+        st.caption("Модель обучена с подобранными параметрами")
+    st.markdown(f"**Лучшие параметры** ({tuning['metric']} {tuning['score']:.2f}%, "
+                f"данные по {tuning['data_end'][:10]}):")
+    st.json(tuning['params'])
+
+    ranking = pd.DataFrame([{**row['params'], 'Фолдов': row['folds'], tuning['metric']: row['score']}
+                            for row in tuning['ranking']])
+    st.dataframe(ranking, use_container_width=True, hide_index=True)
+
+
+def _fit_selection(job, df, magazin, segment, forecast_days,
+                   remove_outliers, smooth_method, smooth_window, profile=None):
+    """
+    Обучает модель для выбора магазина и сегмента (задача очереди)
+
+    Выполняется в потоке пула, поэтому не обращается к элементам
+    Streamlit: ошибки выбрасываются и попадают в состояние задачи.
+
+    Args:
+        job (Job): Задача очереди для прогресса и отмены
+
+    Returns:
+        dict: Обученная модель, прогноз, ряды и метрики точности
+    """
+    job.report(0, 4, "Подготовка ряда")
+    filtered_df = filter_sales(df, magazin, segment)
+
+    prophet_data, original_data = prepare_prophet_data(
+        filtered_df,
+        remove_outliers=remove_outliers,
+        smooth_method=smooth_method if smooth_method != 'none' else None,
+        smooth_window=smooth_window
+    )
+
+    preprocessing = {
+        'remove_outliers': remove_outliers,
+        'smooth_method': smooth_method,
+        'smooth_window': smooth_window
+    }
+
+    job.report(1, 4, "Обучение модели")
+    # Тот же ключ ряда, что в пакетном прогнозе: общие дообучение и подобранные параметры
+    series_key = series_id(_store_key(magazin, segment))
+    params = tuned_params(series_key, preprocessing)
+    model, forecast = forecast_series(
+        prophet_data,
+        periods=forecast_days,
+        preprocessing=preprocessing,
+        series_key=series_key,
+        profile=profile,
+        params=params
+    )
+
+    job.report(3, 4, "Метрики точности")
+    return {
+        'model': model,
+        'forecast': forecast,
+        'prophet_data': prophet_data,
+        'original_data': original_data,
+        'preprocessing': preprocessing,
+        'profile': profile,
+        'params': params,
+        'preprocessed': remove_outliers or (smooth_method and smooth_method != 'none'),
+        'accuracy_metrics': calculate_model_accuracy(prophet_data, model, forecast),
+        'backtests': {}
+    }
+
+
+def _render_forecast(df, handle, forecast_days, magazin, segment):
+    """Отрисовывает прогноз обученной модели на текущий горизонт и аналитику выбора"""
+    model = handle['model']
+    prophet_data = handle['prophet_data']
+    original_data = handle['original_data']
+    accuracy_metrics = handle['accuracy_metrics']
+
+    forecast = extend_forecast(model, handle['forecast'], forecast_days)
+    if len(forecast) > len(handle['forecast']):
+        handle['forecast'] = forecast
+
+    filtered_df = filter_sales(df, magazin, segment)
+
+    # Предобработка данных
+    if handle['preprocessed']:
+        st.markdown("## 🧹 Предварительная обработка данных")
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown("### 📊 Статистика до обработки")
+            st.metric("Среднее", f"{original_data['y'].mean():.2f}")
+            st.metric("Std. отклонение", f"{original_data['y'].std():.2f}")
+            volatility_before = (original_data['y'].std()/original_data['y'].mean()*100) if original_data['y'].mean() > 0 else 0
+            st.metric("Волатильность", f"{volatility_before:.1f}%")
+
+        with col2:
+            st.markdown("### ✨ Статистика после обработки")
+            st.metric("Среднее", f"{prophet_data['y'].mean():.2f}",
+                     delta=f"{prophet_data['y'].mean() - original_data['y'].mean():.2f}")
+            st.metric("Std. отклонение", f"{prophet_data['y'].std():.2f}",
+                     delta=f"{prophet_data['y'].std() - original_data['y'].std():.2f}")
+            volatility_after = (prophet_data['y'].std()/prophet_data['y'].mean()*100) if prophet_data['y'].mean() > 0 else 0
+            st.metric("Волатильность", f"{volatility_after:.1f}%",
+                     delta=f"{volatility_after - volatility_before:.1f}%")
+
+        fig_preprocessing = plot_data_preprocessing(
+            original_data, prophet_data,
+            "🔄 Сравнение: Оригинальные vs Обработанные данные"
+        )
+        st.plotly_chart(fig_preprocessing, use_container_width=True, key="preprocessing")
+
+    # Метрики точности
+    if accuracy_metrics:
+        show_accuracy_table(accuracy_metrics)
+
+    # Бэктест на горизонте прогноза (фолды кэшируются вместе с моделями);
+    # предобработка повторяется на обучении каждого фолда, оценка - по исходным продажам
+    with st.expander("🧪 Бэктест модели на истории"):
+        if st.button("Запустить бэктест", key="run_backtest"):
+            with st.spinner("🔄 Обучение фолдов..."):
+                scores, _ = backtest(original_data, horizon=forecast_days,
+                                     preprocessing=handle['preprocessing'],
+                                     profile=handle['profile'],
+                                     params=handle['params'])
+            handle['backtests'][forecast_days] = scores
+
+        scores = handle['backtests'].get(forecast_days)
+        if scores is None:
+            st.caption("Модель обучается на истории до нескольких точек прогноза "
+                       f"и проверяется на следующих {forecast_days} днях")
+        elif len(scores) == 0:
+            st.warning("⚠️ Недостаточно истории для бэктеста на этом горизонте")
+        else:
+            show_backtest_table(scores)
+
+    # Подбор параметров Prophet ряда в фоне (применяется при следующем обучении)
+    with st.expander("🎛️ Подбор параметров Prophet для ряда"):
+        _render_tuning(df, handle, magazin, segment)
+
+    # Сохраненные версии прогноза выбора (читаются из индекса без пересчета)
+    with st.expander("🗂️ Сохраненные прогнозы выбора"):
+        try:
+            runs = get_forecast_store().runs(**_store_key(magazin, segment), Model=None)
+        except Exception as e:
+            st.warning(f"⚠️ Не удалось прочитать хранилище прогнозов: {str(e)}")
+        else:
+            if runs.empty:
+                st.caption("Прогнозы выбора еще не сохранялись")
+            else:
+                st.dataframe(
+                    runs[['created_at', 'method', 'profile', 'horizon', 'ds_start', 'ds_end']].rename(columns={
+                        'created_at': 'Создан', 'method': 'Модель', 'profile': 'Профиль',
+                        'horizon': 'Дней', 'ds_start': 'С', 'ds_end': 'По'
+                    }),
+                    use_container_width=True, hide_index=True
                 )
-                st.plotly_chart(fig_preprocessing, use_container_width=True, key="preprocessing")
 
-            # Обучение модели
-            model, forecast = train_prophet_model(prophet_data, periods=forecast_days)
+    # Статистика прогноза
+    show_forecast_statistics(filtered_df, forecast, forecast_days, magazin, segment)
 
-            if model is None or forecast is None:
-                return magazin, segment
+    # График прогноза
+    st.markdown("## 📈 Прогноз продаж")
+    fig_main = plot_forecast(
+        prophet_data,
+        forecast,
+        f"Прогноз продаж - {magazin} / {segment}"
+    )
+    st.plotly_chart(fig_main, use_container_width=True, key="main_forecast")
 
-            st.success("✅ Модель успешно обучена!")
+    # Согласованный прогноз: выбор читается из прогноза всей иерархии набора
+    with st.expander("🧩 Согласованный прогноз иерархии магазин → сегмент → модель"):
+        method = st.selectbox("Метод согласования", list(RECONCILIATION_METHODS),
+                              format_func=RECONCILIATION_METHODS.get, key="reconciliation_method")
 
-            # Метрики точности
-            accuracy_metrics = calculate_model_accuracy(prophet_data, model)
-            if accuracy_metrics:
-                show_accuracy_table(accuracy_metrics)
+        if st.checkbox("Показать согласованный прогноз", key="show_hierarchy"):
+            with st.spinner("🔄 Прогноз и согласование всех рядов..."):
+                hierarchy = get_hierarchical_forecast(df, periods=forecast_days, method=method)
 
-            # Статистика прогноза
-            show_forecast_statistics(filtered_df, forecast, forecast_days, magazin, segment)
+            selection = {}
+            if magazin != 'Все магазины':
+                selection['Magazin'] = magazin
+            if segment != 'Все сегменты':
+                selection['Segment'] = segment
 
-            # График прогноза
-            st.markdown("## 📈 Прогноз продаж")
-            fig_main = plot_forecast(
-                prophet_data,
-                forecast,
-                f"Прогноз продаж - {magazin} / {segment}"
+            fig_hierarchy = plot_forecast(
+                original_data,
+                hierarchy.view(**selection),
+                f"Согласованный прогноз - {magazin} / {segment}"
             )
-            st.plotly_chart(fig_main, use_container_width=True, key="main_forecast")
-
-            # Компоненты модели
-            st.markdown("## 🔍 Детальный анализ")
-            fig_components = plot_prophet_components(model, forecast)
-            st.plotly_chart(fig_components, use_container_width=True, key="prophet_components")
-
-            # Расширенная аналитика продаж
-            st.markdown("---")
-            st.markdown("## 📊 Расширенная аналитика продаж")
-
-            # Анализ продаж по дням недели
-            filtered_df_copy = filtered_df.copy()
-            filtered_df_copy['weekday'] = pd.to_datetime(filtered_df_copy['Datasales']).dt.day_name()
-            filtered_df_copy['date'] = pd.to_datetime(filtered_df_copy['Datasales']).dt.date
-
-            # Агрегация по дням недели для статистики
-            weekday_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-            weekday_ru = ['Понедельник', 'Вторник', 'Среда', 'Четверг', 'Пятница', 'Суббота', 'Воскресенье']
-
-            weekday_stats = filtered_df_copy.groupby('weekday').agg({
-                'Sum': 'sum',
-                'Qty': 'sum'
-            }).reindex(weekday_order)
-
-            best_day_idx = weekday_stats['Sum'].idxmax()
-            worst_day_idx = weekday_stats['Sum'].idxmin()
-            best_day_name = weekday_ru[weekday_order.index(best_day_idx)]
-            worst_day_name = weekday_ru[weekday_order.index(worst_day_idx)]
-
-            # Топ товары
-            top_products = filtered_df.groupby('Art').agg({
-                'Describe': 'first',
-                'Sum': 'sum',
-                'Qty': 'sum',
-                'Price': 'mean'
-            }).sort_values('Sum', ascending=False).head(10)
-
-            # Месячная динамика
-            filtered_df_copy['month'] = pd.to_datetime(filtered_df_copy['Datasales']).dt.to_period('M')
-            monthly_data = filtered_df_copy.groupby('month')['Sum'].sum()
-
-            # Расчет тренда роста
-            if len(monthly_data) >= 2:
-                import numpy as np
-                trend_pct = ((monthly_data.iloc[-1] - monthly_data.iloc[0]) / monthly_data.iloc[0] * 100) if monthly_data.iloc[0] > 0 else 0
-            else:
-                trend_pct = 0
+            st.plotly_chart(fig_hierarchy, use_container_width=True, key="hierarchy_forecast")
+            st.caption(f"Рядов нижнего уровня: {len(hierarchy.keys)}, узлов иерархии: "
+                       f"{len(hierarchy.nodes)}. Сумма прогнозов магазинов и сегментов "
+                       "совпадает с прогнозом итога.")
+
+    # Компоненты модели
+    st.markdown("## 🔍 Детальный анализ")
+    fig_components = plot_prophet_components(model, forecast)
+    st.plotly_chart(fig_components, use_container_width=True, key="prophet_components")
+
+    # Расширенная аналитика продаж
+    st.markdown("---")
+    st.markdown("## 📊 Расширенная аналитика продаж")
+
+    # Календарные свертки из куба продаж выбора
+    cube = get_sales_cube(df).subset(magazin, segment)
+
+    # Агрегация по кодам дней недели для статистики (0 - понедельник)
+    weekday_stats = cube.rollup(['weekday']).set_index('weekday').reindex(range(7))
+
+    best_day_idx = weekday_stats['Sum'].idxmax()
+    worst_day_idx = weekday_stats['Sum'].idxmin()
+    best_day_name = WEEKDAY_LABELS[best_day_idx]
+    worst_day_name = WEEKDAY_LABELS[worst_day_idx]
+
+    # Топ товары
+    top_products = filtered_df.groupby('Art', observed=True).agg({
+        'Describe': 'first',
+        'Sum': 'sum',
+        'Qty': 'sum',
+        'Price': 'mean'
+    }).sort_values('Sum', ascending=False).head(10)
+
+    # Месячная динамика
+    monthly_data = cube.rollup(['month']).set_index('month')['Sum']
+
+    # Расчет тренда роста
+    if len(monthly_data) >= 2:
+        import numpy as np
+        trend_pct = ((monthly_data.iloc[-1] - monthly_data.iloc[0]) / monthly_data.iloc[0] * 100) if monthly_data.iloc[0] > 0 else 0
+    else:
+        trend_pct = 0
+
+    # Статистика в карточках
+    st.markdown("### 📈 Ключевые показатели")
+
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric(
+            "🏆 Лучший день недели",
+            best_day_name,
+            f"{weekday_stats.loc[best_day_idx, 'Sum']:.0f} ГРН"
+        )
 
-            # Статистика в карточках
-            st.markdown("### 📈 Ключевые показатели")
+    with col2:
+        st.metric(
+            "⚠️ Худший день недели",
+            worst_day_name,
+            f"{weekday_stats.loc[worst_day_idx, 'Sum']:.0f} ГРН"
+        )
+
+    with col3:
+        st.metric(
+            "🎯 ТОП товар",
+            top_products.index[0] if len(top_products) > 0 else "N/A",
+            f"{top_products.iloc[0]['Sum']:.0f} ГРН" if len(top_products) > 0 else "0 ГРН"
+        )
+
+    with col4:
+        st.metric(
+            "📊 Тренд",
+            "Рост" if trend_pct > 0 else "Падение",
+            f"{abs(trend_pct):.1f}%"
+        )
+
+    # Графики
+    st.markdown("### 📅 Анализ продаж по дням недели")
 
-            col1, col2, col3, col4 = st.columns(4)
+    col1, col2 = st.columns(2)
 
-            with col1:
-                st.metric(
-                    "🏆 Лучший день недели",
-                    best_day_name,
-                    f"{weekday_stats.loc[best_day_idx, 'Sum']:.0f} ГРН"
-                )
+    with col1:
+        fig_weekday = plot_sales_by_weekday(cube)
+        st.plotly_chart(fig_weekday, use_container_width=True, key="sales_weekday")
 
-            with col2:
-                st.metric(
-                    "⚠️ Худший день недели",
-                    worst_day_name,
-                    f"{weekday_stats.loc[worst_day_idx, 'Sum']:.0f} ГРН"
-                )
+    with col2:
+        fig_distribution = plot_daily_sales_distribution(cube)
+        st.plotly_chart(fig_distribution, use_container_width=True, key="daily_distribution")
 
-            with col3:
-                st.metric(
-                    "🎯 ТОП товар",
-                    top_products.index[0] if len(top_products) > 0 else "N/A",
-                    f"{top_products.iloc[0]['Sum']:.0f} ГРН" if len(top_products) > 0 else "0 ГРН"
-                )
+    # Тепловая карта
+    if len(monthly_data) > 1:
+        st.markdown("### 🔥 Тепловая карта продаж")
+        fig_heatmap = plot_sales_heatmap(cube)
+        st.plotly_chart(fig_heatmap, use_container_width=True, key="sales_heatmap")
 
-            with col4:
-                st.metric(
-                    "📊 Тренд",
-                    "Рост" if trend_pct > 0 else "Падение",
-                    f"{abs(trend_pct):.1f}%"
-                )
+    # Топ товары и месячная динамика
+    st.markdown("### 🏆 Топ товары и динамика выручки")
 
-            # Графики
-            st.markdown("### 📅 Анализ продаж по дням недели")
-
-            col1, col2 = st.columns(2)
-
-            with col1:
-                fig_weekday = plot_sales_by_weekday(filtered_df)
-                st.plotly_chart(fig_weekday, use_container_width=True, key="sales_weekday")
-
-            with col2:
-                fig_distribution = plot_daily_sales_distribution(filtered_df)
-                st.plotly_chart(fig_distribution, use_container_width=True, key="daily_distribution")
-
-            # Тепловая карта
-            if len(filtered_df_copy['month'].unique()) > 1:
-                st.markdown("### 🔥 Тепловая карта продаж")
-                fig_heatmap = plot_sales_heatmap(filtered_df)
-                st.plotly_chart(fig_heatmap, use_container_width=True, key="sales_heatmap")
-
-            # Топ товары и месячная динамика
-            st.markdown("### 🏆 Топ товары и динамика выручки")
-
-            col1, col2 = st.columns(2)
-
-            with col1:
-                fig_top_products = plot_top_products(filtered_df, top_n=10)
-                st.plotly_chart(fig_top_products, use_container_width=True, key="top_products")
-
-            with col2:
-                fig_monthly = plot_monthly_revenue_trend(filtered_df)
-                st.plotly_chart(fig_monthly, use_container_width=True, key="monthly_revenue")
-
-            # Сравнение периодов
-            if len(filtered_df_copy['date'].unique()) >= 14:
-                st.markdown("### 📊 Сравнение периодов")
-                fig_comparison = plot_sales_trend_comparison(filtered_df)
-                st.plotly_chart(fig_comparison, use_container_width=True, key="period_comparison")
-
-            # Детальная таблица топ товаров
-            st.markdown("### 📋 Детальная информация: ТОП-10 товаров")
-
-            # Форматируем таблицу
-            top_products_display = top_products.reset_index()
-            top_products_display.columns = ['Артикул', 'Описание', 'Выручка', 'Количество', 'Средняя цена']
-            top_products_display['Выручка'] = top_products_display['Выручка'].round(2)
-            top_products_display['Средняя цена'] = top_products_display['Средняя цена'].round(2)
-            top_products_display['Доля в выручке %'] = (
-                top_products_display['Выручка'] / filtered_df['Sum'].sum() * 100
-            ).round(2)
-
-            st.dataframe(
-                top_products_display,
-                use_container_width=True,
-                height=400,
-                hide_index=True
-            )
+    col1, col2 = st.columns(2)
 
-            # Дополнительная аналитика
-            st.markdown("### 💡 Инсайты")
-
-            col1, col2 = st.columns(2)
-
-            with col1:
-                st.info(f"""
-                **📊 Анализ дней недели:**
-                - Лучший день: **{best_day_name}** ({weekday_stats.loc[best_day_idx, 'Sum']:.0f} ГРН)
-                - Худший день: **{worst_day_name}** ({weekday_stats.loc[worst_day_idx, 'Sum']:.0f} ГРН)
-                - Разница: **{(weekday_stats.loc[best_day_idx, 'Sum'] - weekday_stats.loc[worst_day_idx, 'Sum']):.0f} ГРН**
-                - Рекомендация: Усилить маркетинг в {worst_day_name.lower()}
-                """)
-
-            with col2:
-                top_10_revenue = top_products['Sum'].sum()
-                total_revenue = filtered_df['Sum'].sum()
-                top_10_share = (top_10_revenue / total_revenue * 100) if total_revenue > 0 else 0
-
-                st.success(f"""
-                **🎯 Анализ товаров:**
-                - ТОП-10 товаров: **{top_10_share:.1f}%** от выручки
-                - Всего товаров: **{filtered_df['Art'].nunique()}** шт.
-                - Средний чек: **{filtered_df['Price'].mean():.2f} ГРН**
-                - Концентрация: {'Высокая' if top_10_share > 50 else 'Средняя' if top_10_share > 30 else 'Низкая'}
-                """)
-
-            # Сохраняем результаты в session_state для использования в других вкладках
-            st.session_state['last_forecast'] = {
-                'model': model,
-                'forecast': forecast,
-                'prophet_data': prophet_data,
-                'filtered_df': filtered_df,
-                'magazin': magazin,
-                'segment': segment,
-                'accuracy_metrics': accuracy_metrics
-            }
+    with col1:
+        fig_top_products = plot_top_products(filtered_df, top_n=10)
+        st.plotly_chart(fig_top_products, use_container_width=True, key="top_products")
 
-    return magazin, segment
+    with col2:
+        fig_monthly = plot_monthly_revenue_trend(cube)
+        st.plotly_chart(fig_monthly, use_container_width=True, key="monthly_revenue")
+
+    # Сравнение периодов
+    if cube.nunique('Datasales') >= 14:
+        st.markdown("### 📊 Сравнение периодов")
+        fig_comparison = plot_sales_trend_comparison(cube)
+        st.plotly_chart(fig_comparison, use_container_width=True, key="period_comparison")
+
+    # Детальная таблица топ товаров
+    st.markdown("### 📋 Детальная информация: ТОП-10 товаров")
+
+    # Форматируем таблицу
+    top_products_display = top_products.reset_index()
+    top_products_display.columns = ['Артикул', 'Описание', 'Выручка', 'Количество', 'Средняя цена']
+    top_products_display['Выручка'] = top_products_display['Выручка'].round(2)
+    top_products_display['Средняя цена'] = top_products_display['Средняя цена'].round(2)
+    top_products_display['Доля в выручке %'] = (
+        top_products_display['Выручка'] / filtered_df['Sum'].sum() * 100
+    ).round(2)
+
+    st.dataframe(
+        top_products_display,
+        use_container_width=True,
+        height=400,
+        hide_index=True
+    )
+
+    # Дополнительная аналитика
+    st.markdown("### 💡 Инсайты")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.info(f"""
+        **📊 Анализ дней недели:**
+        - Лучший день: **{best_day_name}** ({weekday_stats.loc[best_day_idx, 'Sum']:.0f} ГРН)
+        - Худший день: **{worst_day_name}** ({weekday_stats.loc[worst_day_idx, 'Sum']:.0f} ГРН)
+        - Разница: **{(weekday_stats.loc[best_day_idx, 'Sum'] - weekday_stats.loc[worst_day_idx, 'Sum']):.0f} ГРН**
+        - Рекомендация: Усилить маркетинг в {worst_day_name.lower()}
+        """)
+
+    with col2:
+        top_10_revenue = top_products['Sum'].sum()
+        total_revenue = filtered_df['Sum'].sum()
+        top_10_share = (top_10_revenue / total_revenue * 100) if total_revenue > 0 else 0
+
+        st.success(f"""
+        **🎯 Анализ товаров:**
+        - ТОП-10 товаров: **{top_10_share:.1f}%** от выручки
+        - Всего товаров: **{filtered_df['Art'].nunique()}** шт.
+        - Средний чек: **{filtered_df['Price'].mean():.2f} ГРН**
+        - Концентрация: {'Высокая' if top_10_share > 50 else 'Средняя' if top_10_share > 30 else 'Низкая'}
+        """)
+
+    # Сохраняем результаты в session_state для использования в других вкладках
+    st.session_state['last_forecast'] = {
+        'model': model,
+        'forecast': forecast,
+        'prophet_data': prophet_data,
+        'filtered_df': filtered_df,
+        'magazin': magazin,
+        'segment': segment,
+        'accuracy_metrics': accuracy_metrics
+    }
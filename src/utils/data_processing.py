@@ -3,7 +3,9 @@
 import pandas as pd
 import numpy as np
 import streamlit as st
-from scipy.signal import savgol_filter
+from scipy.ndimage import convolve1d
+from scipy.signal import savgol_coeffs, savgol_filter
+from ..config.settings import DIMENSION_COLUMNS, MEASURE_COLUMNS, MEASURE_MIN_INT_DTYPE, MONEY_COLUMNS
 
 
 def remove_outliers_iqr(data, multiplier=1.5):
@@ -41,6 +43,233 @@ def smooth_data(data, method='ma', window=7):
         return data
 
 
+def remove_outliers_iqr_matrix(values, multiplier=1.5):
+    """
+    remove_outliers_iqr для всех рядов матрицы одним проходом
+
+    Args:
+        values (np.ndarray): Матрица рядов × дней (NaN - пропуск, как в pandas)
+        multiplier (float): Множитель IQR
+
+    Returns:
+        np.ndarray: Матрица с рядами, ограниченными своими границами IQR
+    """
+    values = np.asarray(values, dtype='float64')
+    if values.shape[1] < 4:
+        return values.copy()
+
+    quantile = np.nanquantile if np.isnan(values).any() else np.quantile
+    q1, q3 = quantile(values, [0.25, 0.75], axis=1, keepdims=True)
+    iqr = q3 - q1
+
+    return np.clip(values, q1 - multiplier * iqr, q3 + multiplier * iqr)
+
+
+def _centered_mean_matrix(values, window):
+    """
+    Центрированное скользящее среднее рядов (как rolling(window, min_periods=1, center=True))
+
+    Окно сдвигается по дням сразу для всех рядов, а сумма ведется так же,
+    как в pandas: с компенсацией Кэхэна при добавлении и удалении дня,
+    подстановкой значения для окна из одинаковых значений и обнулением
+    среднего противоположного знака.
+    """
+    n_series, n_days = values.shape
+    ends = np.arange(n_days) + 1 + (window - 1) // 2
+    starts = np.clip(ends - window, 0, n_days)
+    ends = np.clip(ends, 0, n_days)
+    result = np.empty_like(values)
+
+    def add(day):
+        nonlocal total, compensation_add, count, negative, same_run, previous
+        value = values[:, day]
+        observed = ~np.isnan(value)
+        y = value - compensation_add
+        t = total + y
+        compensation_add = np.where(observed, t - total - y, compensation_add)
+        total = np.where(observed, t, total)
+        count += observed
+        negative += observed & np.signbit(value)
+        same_run = np.where(observed, np.where(value == previous, same_run + 1, 1), same_run)
+        previous = np.where(observed, value, previous)
+
+    def remove(day):
+        nonlocal total, compensation_remove, count, negative
+        value = values[:, day]
+        observed = ~np.isnan(value)
+        y = -value - compensation_remove
+        t = total + y
+        compensation_remove = np.where(observed, t - total - y, compensation_remove)
+        total = np.where(observed, t, total)
+        count -= observed
+        negative -= observed & np.signbit(value)
+
+    for day in range(n_days):
+        start, end = starts[day], ends[day]
+        if day == 0 or start >= ends[day - 1]:
+            total = np.zeros(n_series)
+            compensation_add = np.zeros(n_series)
+            compensation_remove = np.zeros(n_series)
+            count = np.zeros(n_series, dtype='int64')
+            negative = np.zeros(n_series, dtype='int64')
+            same_run = np.zeros(n_series, dtype='int64')
+            previous = values[:, start].copy()
+            for position in range(start, end):
+                add(position)
+        else:
+            for position in range(starts[day - 1], start):
+                remove(position)
+            for position in range(ends[day - 1], end):
+                add(position)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = total / count
+        mean = np.where(same_run >= count, previous,
+                        np.where((negative == 0) & (mean < 0), 0,
+                                 np.where((negative == count) & (mean > 0), 0, mean)))
+        result[:, day] = np.where(count > 0, mean, np.nan)
+
+    return result
+
+
+def _ema_matrix(values, window):
+    """
+    Экспоненциальное среднее рядов (как ewm(span=window, adjust=False).mean())
+
+    Рекурсия повторяет вычисление pandas шаг за шагом, включая
+    нормировку весов, затухание веса на пропусках и особый вес новых
+    наблюдений при com == 1, поэтому цикл идет только по дням, а не по рядам.
+    """
+    com = (window - 1) / 2
+    alpha = 1 / (1 + com)
+    old_factor = 1 - alpha
+
+    result = np.empty_like(values)
+    weighted = values[:, 0].copy()
+    old_weight = np.ones(len(values))
+    new_weight = np.full(len(values), alpha)
+    result[:, 0] = weighted
+
+    for day in range(1, values.shape[1]):
+        current = values[:, day]
+        observed = ~np.isnan(current)
+        started = ~np.isnan(weighted)
+
+        old_weight = np.where(started, old_weight * old_factor, old_weight)
+        if com == 1:
+            new_weight = np.where(started, 1 - old_weight, new_weight)
+
+        update = started & observed & (weighted != current)
+        blended = (old_weight * weighted + new_weight * current) / (old_weight + new_weight)
+
+        weighted = np.where(update, blended, weighted)
+        old_weight = np.where(started & observed, 1.0, old_weight)
+        weighted = np.where(~started & observed, current, weighted)
+        result[:, day] = weighted
+
+    return result
+
+
+def _savgol_matrix(values, window):
+    """
+    Фильтр Савицкого-Голея рядов (как savgol_filter каждого ряда с mode='interp')
+
+    Внутренние дни считаются одной сверткой по всей матрице. Края
+    savgol_filter аппроксимирует полиномом по первым и последним window
+    дням; совместная подгонка всех рядов расходится с поштучной в
+    последних разрядах, поэтому края подгоняются по рядам (это 2 малых
+    polyfit на ряд). Ряды с пропусками в краевых окнах, на которых
+    savgol_filter падает (как и слишком короткие после нечетного окна
+    ряды), сглаживаются скользящим средним, как в smooth_data.
+    """
+    if window > values.shape[1]:
+        return _centered_mean_matrix(values, window)
+
+    polyorder = min(3, window-1)
+    half = window // 2
+    result = convolve1d(values, savgol_coeffs(window, polyorder), axis=1, mode='constant')
+
+    positions = np.arange(window, dtype='float64')
+    broken = (~np.isfinite(values[:, :window])).any(axis=1) | (~np.isfinite(values[:, -window:])).any(axis=1)
+    if half:
+        for row in np.flatnonzero(~broken):
+            head = np.polyfit(positions, values[row, :window], polyorder)
+            tail = np.polyfit(positions, values[row, -window:], polyorder)
+            result[row, :half] = np.polyval(head, positions[:half])
+            result[row, -half:] = np.polyval(tail, positions[window - half:])
+
+    if broken.any():
+        result[broken] = _centered_mean_matrix(values[broken], window)
+
+    return result
+
+
+def smooth_matrix(values, method='ma', window=7):
+    """
+    smooth_data для всех рядов матрицы одним проходом
+
+    Args:
+        values (np.ndarray): Матрица рядов × дней
+        method (str): 'ma', 'ema' или 'savgol' (иначе без сглаживания)
+        window (int): Окно сглаживания
+
+    Returns:
+        np.ndarray: Сглаженная матрица
+    """
+    values = np.asarray(values, dtype='float64')
+
+    if method == 'ma':
+        return _centered_mean_matrix(values, window)
+    elif method == 'ema':
+        return _ema_matrix(values, window)
+    elif method == 'savgol' and values.shape[1] >= window:
+        if window % 2 == 0:
+            window += 1
+        return _savgol_matrix(values, window)
+    else:
+        return values.copy()
+
+
+def preprocess_matrix(values, remove_outliers=False, smooth_method=None, smooth_window=7):
+    """
+    Предобработка prepare_prophet_data для всех рядов матрицы
+
+    Args:
+        values (np.ndarray): Матрица рядов × дней
+
+    Returns:
+        np.ndarray: Ряды без выбросов, сглаженные и неотрицательные
+    """
+    values = np.asarray(values, dtype='float64')
+
+    if remove_outliers:
+        values = remove_outliers_iqr_matrix(values)
+
+    if smooth_method:
+        values = smooth_matrix(values, method=smooth_method, window=smooth_window)
+
+    return np.maximum(values, 0)
+
+
+def preprocess_series(data, remove_outliers=False, smooth_method=None, smooth_window=7):
+    """
+    Предобработка ряда: выбросы, сглаживание и обрезка отрицательных значений
+
+    Args:
+        data (pd.Series): Дневные значения ряда
+
+    Returns:
+        pd.Series: Обработанный ряд
+    """
+    if remove_outliers:
+        data = remove_outliers_iqr(data)
+
+    if smooth_method:
+        data = smooth_data(data, method=smooth_method, window=smooth_window)
+
+    return data.clip(lower=0)
+
+
 def prepare_prophet_data(df, remove_outliers=False, smooth_method=None, smooth_window=7):
     """Подготавливает данные для Prophet с корректной агрегацией"""
     daily_sales = df.groupby('Datasales')['Qty'].sum().reset_index()
@@ -48,13 +277,7 @@ def prepare_prophet_data(df, remove_outliers=False, smooth_method=None, smooth_w
 
     original_data = daily_sales.copy()
 
-    if remove_outliers:
-        daily_sales['y'] = remove_outliers_iqr(daily_sales['y'])
-
-    if smooth_method:
-        daily_sales['y'] = smooth_data(daily_sales['y'], method=smooth_method, window=smooth_window)
-
-    daily_sales['y'] = daily_sales['y'].clip(lower=0)
+    daily_sales['y'] = preprocess_series(daily_sales['y'], remove_outliers, smooth_method, smooth_window)
 
     return daily_sales, original_data
 
@@ -74,3 +297,52 @@ def calculate_segment_volatility(df, magazin, segment):
     volatility = daily_sales.std() / daily_sales.mean()
 
     return min(max(volatility, 0), 1)
+
+
+def _narrow_measure(series):
+    """
+    Приводит целочисленную меру к узкому целому типу, остальные - к float64
+
+    Целый тип не уже MEASURE_MIN_INT_DTYPE: арифметика над колонкой
+    (Qty * k, diff) остается в ее типе и в int8/int16 молча переполняется.
+    """
+    values = pd.to_numeric(series, errors='coerce')
+
+    if values.isna().any():
+        return values.astype('float64')
+
+    if pd.api.types.is_integer_dtype(values) or (values == np.floor(values)).all():
+        narrowed = pd.to_numeric(values.astype('int64'), downcast='integer')
+        return narrowed.astype(np.promote_types(narrowed.dtype, MEASURE_MIN_INT_DTYPE))
+
+    return values.astype('float64')
+
+
+def optimize_sales_dtypes(df):
+    """
+    Нормализует типы набора продаж после загрузки
+
+    Измерения (DIMENSION_COLUMNS) становятся категориями, целочисленные
+    меры (например, Qty) - узким целым типом не уже int32. Денежные меры
+    (MONEY_COLUMNS) остаются float64: float32 дает ошибку до полкопейки
+    на значение, которая накапливается в итогах выручки.
+    Объем памяти до и после сохраняется в df.attrs.
+    """
+    memory_before = df.memory_usage(deep=True).sum()
+
+    df = df.copy()
+
+    for col in DIMENSION_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+
+    for col in MEASURE_COLUMNS:
+        if col in MONEY_COLUMNS and col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+        elif col in df.columns:
+            df[col] = _narrow_measure(df[col])
+
+    df.attrs['memory_before_mb'] = float(memory_before) / 1024 ** 2
+    df.attrs['memory_after_mb'] = float(df.memory_usage(deep=True).sum()) / 1024 ** 2
+
+    return df
@@ -1,27 +1,59 @@
 """Модуль для подключения к SQL Server базе данных"""
 
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import partial
+import os
+import threading
+import time
+import numpy as np
 import pandas as pd
 import streamlit as st
-import time
+from ..config.settings import DATABASE_CONFIG, LOCAL_STORE_CONFIG, DB_POOL_CONFIG
+from .db_pool import get_pool, make_pool_key
+from .sql_backends import (
+    BACKENDS,
+    get_dialect,
+    import_error_message,
+    local_connect_factory
+)
+from .data_processing import optimize_sales_dtypes
+from .sales_index import register_sales_dataset
+from .sales_store import (
+    make_store_key,
+    load_local_sales,
+    save_local_sales,
+    merge_incremental
+)
 
 
 def load_from_database(db_config):
     """
-    Загрузка данных из SQL Server
+    Загрузка данных из SQL Server или локального движка
 
     Args:
         db_config (dict): Конфигурация подключения к БД
+            - backend: Движок ('sqlserver', 'sqlite', 'duckdb')
+            - path: Файл SQLite или Parquet для локального движка
             - host: IP адрес сервера
             - port: Порт (обычно 1433)
             - database: Название базы данных
             - user: Имя пользователя
             - password: Пароль
             - table: Название таблицы
+            - incremental: Инкрементальная синхронизация с локальной копией
+            - aggregated: Загрузка дневных сумм вместо исходных строк
 
     Returns:
         tuple: (DataFrame, success_flag)
     """
-    if not db_config or not all([
+    backend = (db_config or {}).get('backend', 'sqlserver')
+
+    if backend != 'sqlserver':
+        if not db_config.get('path') or not os.path.exists(db_config['path']):
+            st.info("👆 Укажите путь к существующему файлу локальной базы")
+            return None, False
+
+    elif not db_config or not all([
         db_config['host'],
         db_config['database'],
         db_config['user'],
@@ -31,16 +63,31 @@ def load_from_database(db_config):
         return None, False
 
     try:
-        df = _fetch_database_data(
+        fetch = _sync_database_data if db_config.get('incremental') else _fetch_database_data
+        dimensions = None
+        if db_config.get('aggregated'):
+            dimensions = tuple(DATABASE_CONFIG['aggregate_dimensions'])
+
+        df = fetch(
             host=db_config['host'],
             port=db_config['port'],
             database=db_config['database'],
             user=db_config['user'],
             password=db_config['password'],
-            table=db_config['table']
+            table=db_config['table'],
+            dimensions=dimensions,
+            backend=backend,
+            path=db_config.get('path')
         )
 
-        st.success(f"✅ Загружено {len(df):,} записей из SQL Server")
+        # Признак дневных сумм для вкладки данных
+        df.attrs['aggregated'] = dimensions is not None
+
+        label = BACKENDS[backend][0]
+        if dimensions is not None:
+            st.success(f"✅ Загружено {len(df):,} дневных сумм из {label}")
+        else:
+            st.success(f"✅ Загружено {len(df):,} записей из {label}")
 
         # DEBUG: Первые 10 строк для проверки
         with st.expander("🔍 Просмотр загруженных данных из БД", expanded=False):
@@ -58,8 +105,506 @@ def load_from_database(db_config):
         return None, False
 
 
+# Колонки выгрузки: (SQL выражение, имя в DataFrame, тип numpy)
+SALES_QUERY_COLUMNS = [
+    ('shop', 'Magazin', 'object'),
+    ('Datasales', 'Datasales', 'datetime64[ns]'),
+    ('Art', 'Art', 'object'),
+    ('Name_Product', 'Describe', 'object'),
+    ('Model', 'Model', 'object'),
+    ('Gender', 'Segment', 'object'),
+    ('Cost_price', 'Purchaiseprice', 'float64'),
+    ('Price', 'Price', 'float64'),
+    ('Qty', 'Qty', 'int64'),
+    ('[Sum]', 'Sum', 'float64')
+]
+
+
+def _sales_filter_sql(history_months, since=None, until=None, shop=None,
+                      null_shop=False, dialect=None):
+    """
+    Условие отбора продаж за окно истории
+
+    Args:
+        history_months (int): Глубина истории в месяцах
+        since (datetime): Нижняя граница Datasales (включительно)
+        until (datetime): Верхняя граница Datasales (не включительно)
+        shop (str): Отбор одного магазина
+        null_shop (bool): Отбор строк без магазина
+        dialect: Диалект движка (по умолчанию SQL Server)
+
+    Returns:
+        tuple: (sql, params)
+    """
+    dialect = get_dialect(None) if dialect is None else dialect
+    where = f"Datasales >= {dialect.history_start(history_months)} AND Qty > 0"
+    params = ()
+
+    if since is not None:
+        where += " AND Datasales >= %s"
+        params += (since,)
+
+    if until is not None:
+        where += " AND Datasales < %s"
+        params += (until,)
+
+    if shop is not None:
+        where += " AND shop = %s"
+        params += (shop,)
+
+    if null_shop:
+        where += " AND shop IS NULL"
+
+    return where, params
+
+
+def _build_count_query(table, history_months, dialect=None, **bounds):
+    """
+    SQL запрос количества строк в окне выгрузки
+
+    Returns:
+        tuple: (query, params)
+    """
+    dialect = get_dialect(None) if dialect is None else dialect
+    where, params = _sales_filter_sql(history_months, dialect=dialect, **bounds)
+    query = f"SELECT COUNT(*) FROM {dialect.table(table)} WHERE {where}"
+    return dialect.render(query), dialect.bind(params)
+
+
+def _build_shops_query(table, history_months, dialect=None):
+    """
+    SQL запрос списка магазинов в окне выгрузки
+
+    Returns:
+        tuple: (query, params)
+    """
+    dialect = get_dialect(None) if dialect is None else dialect
+    where, params = _sales_filter_sql(history_months, dialect=dialect)
+    query = f"SELECT DISTINCT shop FROM {dialect.table(table)} WHERE {where}"
+    return dialect.render(query), dialect.bind(params)
+
+
+def _build_page_query(table, history_months, page_size, after=None, dialect=None,
+                      **bounds):
+    """
+    SQL запрос одной страницы keyset-пагинации по Datasales
+
+    Страница включает все строки с последним значением Datasales
+    (TOP ... WITH TIES или его эквивалент в диалекте), поэтому следующая
+    страница начинается строго после него без пропусков и дублей.
+
+    Returns:
+        tuple: (query, params)
+    """
+    dialect = get_dialect(None) if dialect is None else dialect
+    select_list = ",\n                ".join(
+        expr if expr.strip('[]') == alias else f"{expr} as {alias}"
+        for expr, alias, _ in SALES_QUERY_COLUMNS
+    )
+    where, where_params = _sales_filter_sql(history_months, dialect=dialect, **bounds)
+
+    if after is not None:
+        where += " AND Datasales > %s"
+        where_params += (after,)
+
+    query, params = dialect.page_query(
+        select_list, dialect.table(table), where, where_params, page_size
+    )
+
+    return dialect.render(query), dialect.bind(params)
+
+
+def _aggregate_columns(dimensions, dialect=None):
+    """
+    Колонки агрегированной выгрузки: день, измерения и дневные суммы
+
+    Цена и себестоимость считаются средневзвешенными по количеству.
+
+    Args:
+        dimensions (list): Измерения группировки (псевдонимы SALES_QUERY_COLUMNS)
+        dialect: Диалект движка (по умолчанию SQL Server)
+
+    Returns:
+        list: [(sql выражение, псевдоним, dtype)]
+    """
+    dialect = get_dialect(None) if dialect is None else dialect
+    columns = {alias: (expr, alias, dtype) for expr, alias, dtype in SALES_QUERY_COLUMNS}
+
+    return (
+        [(dialect.day('Datasales'), 'Datasales', 'datetime64[ns]')]
+        + [columns[dim] for dim in dimensions]
+        + [
+            ('SUM(Qty)', 'Qty', 'int64'),
+            ('SUM([Sum])', 'Sum', 'float64'),
+            ('CAST(SUM([Sum]) AS float) / NULLIF(SUM(Qty), 0)', 'Price', 'float64'),
+            ('CAST(SUM(Cost_price * Qty) AS float) / NULLIF(SUM(Qty), 0)',
+             'Purchaiseprice', 'float64')
+        ]
+    )
+
+
+def _build_aggregate_query(table, history_months, dimensions, dialect=None, **bounds):
+    """
+    SQL запрос дневных сумм с группировкой на стороне сервера
+
+    Returns:
+        tuple: (query, params)
+    """
+    dialect = get_dialect(None) if dialect is None else dialect
+    columns = _aggregate_columns(dimensions, dialect)
+    select_list = ",\n                ".join(
+        f"{expr} as {alias}" for expr, alias, _ in columns
+    )
+    group_list = ", ".join(expr for expr, _, _ in columns[:len(dimensions) + 1])
+    where, params = _sales_filter_sql(history_months, dialect=dialect, **bounds)
+
+    query = f"""
+            SELECT
+                {select_list}
+            FROM {dialect.table(table)}
+            WHERE {where}
+            GROUP BY {group_list}
+            ORDER BY Datasales
+        """
+
+    return dialect.render(query), dialect.bind(params)
+
+
+def _to_column_array(values, dtype):
+    """Преобразует значения одной колонки пачки в типизированный массив"""
+    if dtype == 'int64':
+        try:
+            return np.array(values, dtype='int64')
+        except (TypeError, ValueError):
+            # NULL в целочисленной колонке
+            return np.array(values, dtype='float64')
+
+    if dtype.startswith('datetime64'):
+        # Драйверы отдают datetime (SQL Server, DuckDB) или текст ISO (SQLite)
+        return pd.to_datetime(pd.Series(values, dtype=object)).to_numpy(dtype=dtype)
+
+    return np.array(values, dtype=dtype)
+
+
+def _fetch_batches(cursor, columns, chunks, fetch_size):
+    """
+    Читает результат запроса пачками fetchmany и раскладывает их по колонкам
+
+    Транспонированные пачки дописываются в chunks, сами пачки строк
+    отдаются вызывающему коду для учета прогресса.
+    """
+    while True:
+        rows = cursor.fetchmany(fetch_size)
+        if not rows:
+            break
+
+        # Транспонирование пачки: кортежи строк -> колонки
+        for (_, alias, dtype), values in zip(columns, zip(*rows)):
+            chunks[alias].append(_to_column_array(values, dtype))
+
+        yield rows
+
+
+def _stream_sales_columns(conn, table, history_months=12, page_size=200000,
+                          fetch_size=20000, on_batch=None, dialect=None, **bounds):
+    """
+    Постраничное чтение продаж в типизированные пачки колонок
+
+    Args:
+        conn: DB-API соединение
+        table (str): Таблица
+        history_months (int): Глубина истории в месяцах
+        page_size (int): Строк на страницу
+        fetch_size (int): Строк на один fetchmany
+        on_batch (callable): Колбэк с числом строк очередной пачки
+        dialect: Диалект движка (по умолчанию SQL Server)
+        **bounds: Границы отбора (since, until, shop)
+
+    Returns:
+        dict: {колонка: [массивы пачек]} в порядке Datasales
+    """
+    date_pos = [alias for _, alias, _ in SALES_QUERY_COLUMNS].index('Datasales')
+    chunks = {alias: [] for _, alias, _ in SALES_QUERY_COLUMNS}
+
+    cursor = conn.cursor()
+
+    try:
+        after = None
+
+        while True:
+            query, params = _build_page_query(
+                table, history_months, page_size, after=after, dialect=dialect, **bounds
+            )
+            cursor.execute(query, params)
+
+            page_rows = 0
+
+            for rows in _fetch_batches(cursor, SALES_QUERY_COLUMNS, chunks, fetch_size):
+                after = rows[-1][date_pos]
+                page_rows += len(rows)
+
+                if on_batch:
+                    on_batch(len(rows))
+
+            if page_rows < page_size:
+                break
+
+    finally:
+        cursor.close()
+
+    return chunks
+
+
+def _stream_aggregate_columns(conn, table, history_months, dimensions,
+                              fetch_size=20000, on_batch=None, dialect=None, **bounds):
+    """
+    Чтение дневных сумм в типизированные пачки колонок
+
+    Результат группировки на порядки меньше исходных строк, поэтому
+    читается одним запросом без постраничной разбивки.
+
+    Returns:
+        dict: {колонка: [массивы пачек]} в порядке Datasales
+    """
+    columns = _aggregate_columns(dimensions)
+    chunks = {alias: [] for _, alias, _ in columns}
+
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(*_build_aggregate_query(
+            table, history_months, dimensions, dialect=dialect, **bounds
+        ))
+
+        for rows in _fetch_batches(cursor, columns, chunks, fetch_size):
+            if on_batch:
+                on_batch(len(rows))
+
+    finally:
+        cursor.close()
+
+    return chunks
+
+
+def _assemble_sales_frame(chunk_sets, columns=None):
+    """Собирает DataFrame из пачек колонок одной конкатенацией на колонку"""
+    frame = {}
+
+    for _, alias, dtype in columns or SALES_QUERY_COLUMNS:
+        arrays = [array for chunks in chunk_sets for array in chunks[alias]]
+        frame[alias] = np.concatenate(arrays) if arrays else np.array([], dtype=dtype)
+
+    return pd.DataFrame(frame)
+
+
+def _count_sales_rows(conn, table, history_months, **bounds):
+    """Количество строк в окне выгрузки"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(*_build_count_query(table, history_months, **bounds))
+        return cursor.fetchone()[0]
+    finally:
+        cursor.close()
+
+
+def _stream_sales_rows(conn, table, history_months=12, page_size=200000,
+                       fetch_size=20000, on_progress=None, since=None, dialect=None):
+    """
+    Потоковая выгрузка продаж постранично через cursor.fetchmany
+
+    Каждая пачка строк сразу раскладывается по колонкам в типизированные
+    массивы numpy, итоговый DataFrame собирается одной конкатенацией.
+    Пиковая память ограничена размером пачки сверх самих данных.
+
+    Args:
+        conn: DB-API соединение
+        table (str): Таблица
+        history_months (int): Глубина истории в месяцах
+        page_size (int): Строк на страницу
+        fetch_size (int): Строк на один fetchmany
+        on_progress (callable): Колбэк (loaded, total)
+        since (datetime): Нижняя граница Datasales (включительно)
+        dialect: Диалект движка (по умолчанию SQL Server)
+
+    Returns:
+        pd.DataFrame: Загруженные данные, отсортированные по Datasales
+    """
+    total = _count_sales_rows(conn, table, history_months, since=since, dialect=dialect)
+    loaded = [0]
+
+    def on_batch(rows):
+        loaded[0] += rows
+        if on_progress:
+            on_progress(loaded[0], max(total, loaded[0]))
+
+    chunks = _stream_sales_columns(
+        conn, table, history_months, page_size, fetch_size,
+        on_batch=on_batch, since=since, dialect=dialect
+    )
+
+    return _assemble_sales_frame([chunks])
+
+
+def _month_partitions(history_months, since=None, now=None):
+    """
+    Разбивает окно выгрузки на календарные месяцы
+
+    Первая партиция не имеет нижней границы (ее задает окно истории
+    или since), последняя - верхней, поэтому объединение партиций
+    в точности совпадает с исходным окном.
+
+    Returns:
+        list: [{'since': ..., 'until': ...}] в порядке Datasales
+    """
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    start = now - pd.DateOffset(months=int(history_months))
+
+    if since is not None:
+        start = max(start, pd.Timestamp(since))
+
+    boundaries = pd.date_range(start.normalize() + pd.offsets.MonthBegin(1), now, freq='MS')
+    edges = [since] + [b.to_pydatetime() for b in boundaries] + [None]
+
+    return [{'since': lo, 'until': hi} for lo, hi in zip(edges[:-1], edges[1:])]
+
+
+def _shop_partitions(conn, table, history_months, since=None, dialect=None):
+    """Партиции по магазинам окна выгрузки"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(*_build_shops_query(table, history_months, dialect))
+        shops = [row[0] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+    partitions = [{'since': since, 'shop': shop}
+                  for shop in sorted(shop for shop in shops if shop is not None)]
+
+    # Строки без магазина не попадают ни в одно условие shop = %s
+    if any(shop is None for shop in shops):
+        partitions.append({'since': since, 'null_shop': True})
+
+    return partitions
+
+
+def _fetch_partition(pool, table, history_months, bounds, retries, on_batch=None,
+                     dimensions=None, dialect=None):
+    """
+    Выгрузка одной партиции с повторами на свежем соединении пула
+
+    Если попытка падает, частично прочитанные строки отбрасываются,
+    сломанное соединение закрывается пулом, партиция читается заново.
+    При заданных dimensions читаются дневные суммы вместо строк.
+    """
+    attempt = 0
+
+    while True:
+        loaded = [0]
+
+        def count_batch(rows):
+            loaded[0] += rows
+            if on_batch:
+                on_batch(rows)
+
+        try:
+            with pool.connection(timeout=DB_POOL_CONFIG['acquire_timeout']) as conn:
+                if dimensions is not None:
+                    return _stream_aggregate_columns(
+                        conn, table, history_months, dimensions,
+                        DATABASE_CONFIG['fetch_size'], on_batch=count_batch,
+                        dialect=dialect, **bounds
+                    )
+                return _stream_sales_columns(
+                    conn, table, history_months,
+                    DATABASE_CONFIG['page_size'], DATABASE_CONFIG['fetch_size'],
+                    on_batch=count_batch, dialect=dialect, **bounds
+                )
+        except Exception:
+            if on_batch and loaded[0]:
+                on_batch(-loaded[0])
+            attempt += 1
+            if attempt > retries:
+                raise
+            time.sleep(min(0.5 * 2 ** (attempt - 1), 5))
+
+
+def _extract_partitioned(pool, table, history_months, since=None,
+                         partition_by='month', workers=4, retries=2,
+                         on_progress=None, dimensions=None, dialect=None):
+    """
+    Параллельная выгрузка партиций (месяцы или магазины) на пуле потоков
+
+    Число потоков ограничено размером пула соединений. Колбэк прогресса
+    вызывается только из вызывающего потока: для строк - (строк, всего строк),
+    для дневных сумм (dimensions) - (партиций, всего партиций).
+
+    Returns:
+        pd.DataFrame: Загруженные данные
+    """
+    with pool.connection(timeout=DB_POOL_CONFIG['acquire_timeout']) as conn:
+        if dimensions is None:
+            total = _count_sales_rows(conn, table, history_months, since=since,
+                                      dialect=dialect)
+        if partition_by == 'shop':
+            partitions = _shop_partitions(conn, table, history_months, since, dialect)
+        else:
+            partitions = _month_partitions(history_months, since)
+
+    loaded = [0]
+    lock = threading.Lock()
+
+    def on_batch(rows):
+        with lock:
+            loaded[0] += rows
+
+    if dimensions is not None:
+        total = len(partitions)
+
+    results = [None] * len(partitions)
+    workers = max(1, min(workers, pool.max_size, len(partitions)))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_fetch_partition, pool, table, history_months,
+                            bounds, retries,
+                            on_batch if dimensions is None else None,
+                            dimensions, dialect): i
+            for i, bounds in enumerate(partitions)
+        }
+        pending = set(futures)
+
+        while pending:
+            done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                try:
+                    results[futures[future]] = future.result()
+                except Exception:
+                    # Партиция исчерпала повторы: остальные не запускаем
+                    for other in pending:
+                        other.cancel()
+                    raise
+
+            if on_progress:
+                if dimensions is not None:
+                    current = len(partitions) - len(pending)
+                else:
+                    with lock:
+                        current = loaded[0]
+                on_progress(current, max(total, current))
+
+    columns = _aggregate_columns(dimensions) if dimensions is not None else None
+    df = _assemble_sales_frame(results, columns)
+
+    if partition_by == 'shop':
+        return df.sort_values('Datasales', kind='stable').reset_index(drop=True)
+
+    return df
+
+
 @st.cache_data(show_spinner=False)
-def _fetch_database_data(host, port, database, user, password, table):
+def _fetch_database_data(host, port, database, user, password, table, dimensions=None,
+                         backend='sqlserver', path=None):
     """
     Кешированная загрузка данных из SQL Server через pymssql
 
@@ -70,6 +615,9 @@ def _fetch_database_data(host, port, database, user, password, table):
         user (str): Пользователь
         password (str): Пароль
         table (str): Таблица
+        dimensions (tuple): Измерения дневных сумм (None - исходные строки)
+        backend (str): Движок источника
+        path (str): Файл локального движка
 
     Returns:
         pd.DataFrame: Загруженные данные
@@ -77,57 +625,192 @@ def _fetch_database_data(host, port, database, user, password, table):
     Raises:
         Exception: При ошибках подключения или загрузки
     """
-    progress_bar = st.progress(0, text="🔌 Подключение к SQL Server...")
-    time.sleep(0.2)
+    return _extract_sales(host, port, database, user, password, table,
+                          dimensions=dimensions, backend=backend, path=path)
 
-    try:
-        import pymssql
-
-        # Подключение через pymssql (без ODBC)
-        conn = pymssql.connect(
-            server=host,
-            port=int(port),
-            database=database,
-            user=user,
-            password=password,
-            timeout=15,
-            login_timeout=15
+
+def _sync_database_data(host, port, database, user, password, table, dimensions=None,
+                        backend='sqlserver', path=None):
+    """
+    Инкрементальная синхронизация с локальной копией таблицы продаж
+
+    Из SQL Server загружаются только строки начиная с водяного знака
+    (максимальной Datasales локальной копии) минус окно перекрытия,
+    после чего они заменяют соответствующий хвост локальной копии.
+    При отсутствии локальной копии выполняется полная выгрузка.
+    Дневные суммы (dimensions) хранятся в отдельной копии.
+
+    Returns:
+        pd.DataFrame: Актуальные данные за окно истории
+
+    Raises:
+        Exception: При ошибках подключения, загрузки или записи копии
+    """
+    store_table = table if dimensions is None else f"{table}__daily_{'_'.join(dimensions)}"
+    store_key = make_store_key(host or path, database, store_table)
+    local_df, meta = load_local_sales(store_key)
+
+    since = None
+    if local_df is not None and meta and meta.get('watermark'):
+        since = (
+            pd.Timestamp(meta['watermark'])
+            - pd.Timedelta(days=LOCAL_STORE_CONFIG['overlap_days'])
+        ).to_pydatetime()
+
+    fresh_df = _extract_sales(host, port, database, user, password, table,
+                              since=since, dimensions=dimensions,
+                              backend=backend, path=path)
+
+    if since is None:
+        df = fresh_df
+    else:
+        df = merge_incremental(local_df, fresh_df, since)
+
+    window_start = pd.Timestamp.now().normalize() - pd.DateOffset(
+        months=DATABASE_CONFIG['history_months']
+    )
+    df = df[df['Datasales'] >= window_start].reset_index(drop=True)
+
+    save_local_sales(df, store_key)
+
+    if since is None:
+        st.info("💾 Создана локальная копия таблицы продаж")
+    else:
+        st.info(
+            f"🔄 Синхронизировано {len(fresh_df):,} записей начиная с "
+            f"{since:%Y-%m-%d}"
         )
 
-        st.success(f"✅ Подключено через pymssql к {host}")
-
-        progress_bar.progress(30, text="📊 Загрузка данных...")
-
-        # SQL запрос
-        query = f"""
-            SELECT TOP 100000
-                shop as Magazin,
-                Datasales,
-                Art,
-                Name_Product as Describe,
-                Model,
-                Gender as Segment,
-                Cost_price as Purchaiseprice,
-                Price,
-                Qty,
-                [Sum]
-            FROM [dbo].[{table}]
-            WHERE Datasales >= DATEADD(MONTH, -12, GETDATE())
-                AND Qty > 0
-            ORDER BY Datasales DESC
-        """
+    return df
 
-        df = pd.read_sql(query, conn)
-        conn.close()
 
-        progress_bar.progress(90, text="✅ Обработка данных...")
-        time.sleep(0.2)
+def get_sales_pool(host, port, database, user, password):
+    """
+    Пул соединений pymssql, общий для всех сессий Streamlit в процессе
+
+    Returns:
+        ConnectionPool: Пул для пары сервер/пользователь
+
+    Raises:
+        ImportError: Если pymssql не установлен
+    """
+    import pymssql
 
-        if len(df) == 100000:
-            st.warning("⚠️ Результат обрезан до 100,000 строк")
+    # Подключение через pymssql (без ODBC)
+    connect = partial(
+        pymssql.connect,
+        server=host,
+        port=int(port),
+        database=database,
+        user=user,
+        password=password,
+        timeout=DB_POOL_CONFIG['query_timeout'],
+        login_timeout=DB_POOL_CONFIG['login_timeout']
+    )
+
+    return get_pool(make_pool_key(host, port, database, user, password), connect)
+
+
+def get_source_pool(backend, host, port, database, user, password, table, path):
+    """
+    Пул соединений и диалект источника продаж
+
+    Returns:
+        tuple: (ConnectionPool, диалект)
+
+    Raises:
+        ImportError: Если драйвер движка не установлен
+    """
+    if backend == 'sqlserver':
+        return get_sales_pool(host, port, database, user, password), get_dialect(backend)
+
+    connect = local_connect_factory(backend, path, table)
+    pool = get_pool((backend, os.path.abspath(path), table), connect)
+
+    return pool, get_dialect(backend)
+
+
+def _extract_sales(host, port, database, user, password, table, since=None,
+                   dimensions=None, backend='sqlserver', path=None):
+    """
+    Выгрузка продаж из SQL Server через пул соединений с индикатором прогресса
+
+    Args:
+        host (str): IP адрес сервера
+        port (str): Порт
+        database (str): База данных
+        user (str): Пользователь
+        password (str): Пароль
+        table (str): Таблица
+        since (datetime): Нижняя граница Datasales (включительно)
+        dimensions (tuple): Измерения дневных сумм (None - исходные строки)
+        backend (str): Движок источника
+        path (str): Файл локального движка
+
+    Returns:
+        pd.DataFrame: Загруженные данные
+
+    Raises:
+        Exception: При ошибках подключения или загрузки
+    """
+    progress_bar = st.progress(0, text=f"🔌 Подключение к {BACKENDS[backend][0]}...")
+
+    try:
+        pool, dialect = get_source_pool(backend, host, port, database, user,
+                                        password, table, path)
+
+        progress_bar.progress(10, text="📊 Загрузка данных...")
+
+        def report_progress(loaded, total):
+            percent = 10 + int(80 * loaded / total) if total else 90
+            unit = "партиций" if dimensions is not None else "записей"
+            progress_bar.progress(
+                percent,
+                text=f"📊 Загружено {loaded:,} из {total:,} {unit}..."
+            )
+
+        if DATABASE_CONFIG['extract_mode'] == 'parallel':
+            df = _extract_partitioned(
+                pool,
+                table,
+                DATABASE_CONFIG['history_months'],
+                since=since,
+                partition_by=DATABASE_CONFIG['partition_by'],
+                workers=DATABASE_CONFIG['workers'],
+                retries=DATABASE_CONFIG['partition_retries'],
+                on_progress=report_progress,
+                dimensions=dimensions,
+                dialect=dialect
+            )
+        elif dimensions is not None:
+            with pool.connection(timeout=DB_POOL_CONFIG['acquire_timeout']) as conn:
+                chunks = _stream_aggregate_columns(
+                    conn,
+                    table,
+                    DATABASE_CONFIG['history_months'],
+                    dimensions,
+                    fetch_size=DATABASE_CONFIG['fetch_size'],
+                    since=since,
+                    dialect=dialect
+                )
+            df = _assemble_sales_frame([chunks], _aggregate_columns(dimensions))
+        else:
+            with pool.connection(timeout=DB_POOL_CONFIG['acquire_timeout']) as conn:
+                df = _stream_sales_rows(
+                    conn,
+                    table,
+                    history_months=DATABASE_CONFIG['history_months'],
+                    page_size=DATABASE_CONFIG['page_size'],
+                    fetch_size=DATABASE_CONFIG['fetch_size'],
+                    on_progress=report_progress,
+                    since=since,
+                    dialect=dialect
+                )
+
+        if dimensions is not None:
+            df = complete_aggregate_frame(df)
 
         progress_bar.progress(100, text="✅ Данные загружены!")
-        time.sleep(0.3)
         progress_bar.empty()
 
         return df
@@ -135,25 +818,113 @@ def _fetch_database_data(host, port, database, user, password, table):
     except ImportError:
         if progress_bar:
             progress_bar.empty()
-        raise Exception(
-            "Модуль pymssql не установлен. Установите: pip install pymssql"
-        )
+        raise Exception(import_error_message(backend))
 
     except Exception as e:
         if progress_bar:
             progress_bar.empty()
+        raise _database_error(e, host, backend)
 
-        error_msg = str(e)
 
-        # Обработка различных типов ошибок
-        if "Login failed" in error_msg or "18456" in error_msg:
-            raise Exception("Ошибка авторизации: неверный логин/пароль")
-        elif "Unable to connect" in error_msg or "20009" in error_msg:
-            raise Exception(f"Сервер {host} не найден. Проверьте IP и порт.")
-        elif "timeout" in error_msg.lower():
-            raise Exception("Превышено время ожидания подключения")
-        else:
-            raise Exception(f"Ошибка SQL Server: {error_msg}")
+def _database_error(error, host, backend='sqlserver'):
+    """Понятное сообщение об ошибке источника"""
+    error_msg = str(error)
+
+    if backend != 'sqlserver':
+        return Exception(f"Ошибка {BACKENDS[backend][0]}: {error_msg}")
+
+    # Обработка различных типов ошибок
+    if "Login failed" in error_msg or "18456" in error_msg:
+        return Exception("Ошибка авторизации: неверный логин/пароль")
+    elif "Unable to connect" in error_msg or "20009" in error_msg:
+        return Exception(f"Сервер {host} не найден. Проверьте IP и порт.")
+    elif "timeout" in error_msg.lower():
+        return Exception("Превышено время ожидания подключения")
+    else:
+        return Exception(f"Ошибка SQL Server: {error_msg}")
+
+
+def complete_aggregate_frame(df):
+    """
+    Дополняет дневные суммы колонками, по которым не было группировки
+
+    Товарные колонки (Art, Describe, Model) заполняются моделью,
+    остальные измерения - пометкой "Все".
+    """
+    for col in ('Model', 'Art', 'Describe'):
+        if col not in df.columns:
+            df[col] = df['Model'] if 'Model' in df.columns else 'Все'
+
+    for col in ('Magazin', 'Segment'):
+        if col not in df.columns:
+            df[col] = 'Все'
+
+    return df
+
+
+def load_raw_rows(db_config, shops):
+    """
+    Загрузка исходных строк продаж выбранных магазинов по запросу
+
+    Используется вкладкой данных, когда основной набор загружен
+    дневными суммами.
+
+    Args:
+        db_config (dict): Конфигурация подключения к БД
+        shops (list): Магазины
+
+    Returns:
+        pd.DataFrame: Валидированные строки или None при ошибке
+    """
+    try:
+        df = _fetch_raw_rows(
+            host=db_config['host'],
+            port=db_config['port'],
+            database=db_config['database'],
+            user=db_config['user'],
+            password=db_config['password'],
+            table=db_config['table'],
+            shops=tuple(sorted(shops)),
+            backend=db_config.get('backend', 'sqlserver'),
+            path=db_config.get('path')
+        )
+    except Exception as e:
+        st.error(f"❌ Ошибка загрузки строк из БД: {str(e)}")
+        return None
+
+    return validate_database_data(df)
+
+
+@st.cache_data(show_spinner="📊 Загрузка исходных строк...")
+def _fetch_raw_rows(host, port, database, user, password, table, shops,
+                   backend='sqlserver', path=None):
+    """Кешированная выгрузка исходных строк по списку магазинов"""
+    try:
+        pool, dialect = get_source_pool(backend, host, port, database, user,
+                                        password, table, path)
+
+        with pool.connection(timeout=DB_POOL_CONFIG['acquire_timeout']) as conn:
+            chunk_sets = [
+                _stream_sales_columns(
+                    conn,
+                    table,
+                    DATABASE_CONFIG['history_months'],
+                    DATABASE_CONFIG['page_size'],
+                    DATABASE_CONFIG['fetch_size'],
+                    dialect=dialect,
+                    shop=shop
+                )
+                for shop in shops
+            ]
+
+    except ImportError:
+        raise Exception(import_error_message(backend))
+
+    except Exception as e:
+        raise _database_error(e, host, backend)
+
+    df = _assemble_sales_frame(chunk_sets)
+    return df.sort_values('Datasales', kind='stable').reset_index(drop=True)
 
 
 def validate_database_data(df):
@@ -180,9 +951,9 @@ def validate_database_data(df):
         # Преобразование типов
         df['Datasales'] = pd.to_datetime(df['Datasales'], errors='coerce', dayfirst=True)
         df = df.dropna(subset=['Datasales']).sort_values('Datasales')
-        df = df[(df['Qty'] >= 0) & (df['Price'] > 0)]
+        df = df[(df['Qty'] >= 0) & (df['Price'] > 0)].reset_index(drop=True)
 
-        return df
+        return register_sales_dataset(optimize_sales_dtypes(df))
 
     except Exception as e:
         st.error(f"❌ Ошибка при валидации данных: {str(e)}")
@@ -196,39 +967,71 @@ def render_database_connection_ui():
     Returns:
         dict: Конфигурация подключения к БД
     """
-    st.markdown("### 🔐 Настройка подключения к SQL Server")
+    st.markdown("### 🔐 Настройка подключения к базе данных")
 
-    col1, col2 = st.columns(2)
+    db_backend = st.selectbox(
+        "Движок:",
+        options=list(BACKENDS),
+        index=list(BACKENDS).index(DATABASE_CONFIG['backend']),
+        format_func=lambda x: BACKENDS[x][0],
+        key="db_backend",
+        help="SQL Server или локальная база для разработки и бенчмарков"
+    )
 
-    with col1:
-        db_host = st.text_input(
-            "Server (IP):",
-            value="",
-            key="db_host",
-            placeholder="Введите IP адрес",
-            help="IP адрес SQL Server"
-        )
-        db_name = st.text_input(
-            "Database:",
-            value="bdop",
-            key="db_name",
-            help="Название базы данных"
-        )
-        db_user = st.text_input(
-            "User:",
-            value="sales",
-            key="db_user",
-            help="Имя пользователя"
-        )
+    db_path = None
+
+    if db_backend == 'sqlserver':
+        col1, col2 = st.columns(2)
 
-    with col2:
-        db_password = st.text_input(
-            "Password:",
+        with col1:
+            db_host = st.text_input(
+                "Server (IP):",
+                value="",
+                key="db_host",
+                placeholder="Введите IP адрес",
+                help="IP адрес SQL Server"
+            )
+            db_name = st.text_input(
+                "Database:",
+                value="bdop",
+                key="db_name",
+                help="Название базы данных"
+            )
+            db_user = st.text_input(
+                "User:",
+                value="sales",
+                key="db_user",
+                help="Имя пользователя"
+            )
+
+        with col2:
+            db_password = st.text_input(
+                "Password:",
+                value="",
+                type="password",
+                key="db_password",
+                placeholder="Введите пароль",
+                help="Пароль для подключения"
+            )
+            db_table = st.text_input(
+                "Table:",
+                value="Sales_table",
+                key="db_table",
+                help="Название таблицы"
+            )
+            db_port = st.text_input(
+                "Port:",
+                value="1433",
+                key="db_port",
+                help="Порт SQL Server (обычно 1433)"
+            )
+    else:
+        db_path = st.text_input(
+            "Файл базы:",
             value="",
-            type="password",
-            key="db_password",
-            placeholder="Введите пароль",
-            help="Пароль для подключения"
+            key="db_path",
+            placeholder="sales.db или sales.parquet",
+            help="Файл SQLite или Parquet (см. benchmarks/synthetic_sales.py)"
         )
         db_table = st.text_input(
             "Table:",
@@ -236,20 +1039,34 @@ def render_database_connection_ui():
             key="db_table",
             help="Название таблицы"
         )
-        db_port = st.text_input(
-            "Port:",
-            value="1433",
-            key="db_port",
-            help="Порт SQL Server (обычно 1433)"
-        )
+        db_host = db_name = db_user = db_password = db_port = ''
+
+    db_incremental = st.checkbox(
+        "🔄 Инкрементальная синхронизация",
+        value=False,
+        key="db_incremental",
+        help="Хранить локальную копию таблицы и загружать только новые записи"
+    )
+
+    db_aggregated = st.checkbox(
+        "📉 Загружать дневные суммы",
+        value=DATABASE_CONFIG['load_mode'] == 'aggregated',
+        key="db_aggregated",
+        help="Группировка по дням, магазинам, сегментам и моделям на стороне "
+             "SQL Server. Исходные строки загружаются по запросу на вкладке данных"
+    )
 
     db_config = {
+        'backend': db_backend,
+        'path': db_path,
         'host': db_host,
         'port': db_port,
         'database': db_name,
         'user': db_user,
         'password': db_password,
-        'table': db_table
+        'table': db_table,
+        'incremental': db_incremental,
+        'aggregated': db_aggregated
     }
 
     return db_config
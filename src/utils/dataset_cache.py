@@ -0,0 +1,162 @@
+"""Персистентный кэш валидированных наборов данных на диске"""
+
+import hashlib
+import os
+from ..config.settings import DATASET_CACHE_CONFIG
+
+# Размер блока, читаемого с начала и с конца файла для отпечатка
+_FINGERPRINT_CHUNK = 1 << 16
+
+
+def _read_head_tail(f, size):
+    """Читает начало и конец файлового объекта, сохраняя позицию"""
+    position = f.tell()
+    try:
+        f.seek(0)
+        head = f.read(_FINGERPRINT_CHUNK)
+        f.seek(max(size - _FINGERPRINT_CHUNK, 0))
+        tail = f.read(_FINGERPRINT_CHUNK)
+    finally:
+        f.seek(position)
+    return head, tail
+
+
+def file_fingerprint(source, version):
+    """
+    Дешевый отпечаток файла: размер, имя, первые и последние 64 КБ и версия загрузчика
+
+    Для xlsx конец файла содержит центральный каталог zip-архива с CRC
+    всех частей книги, поэтому изменение содержимого меняет отпечаток.
+
+    Args:
+        source: Путь к файлу или файловый объект (например, UploadedFile)
+        version: Версия логики загрузки и валидации
+
+    Returns:
+        str: Ключ кэша
+    """
+    if isinstance(source, (str, os.PathLike)):
+        name = os.path.basename(source)
+        size = os.path.getsize(source)
+        with open(source, 'rb') as f:
+            head, tail = _read_head_tail(f, size)
+    else:
+        name = getattr(source, 'name', '')
+        size = getattr(source, 'size', None)
+        if size is None:
+            position = source.tell()
+            size = source.seek(0, os.SEEK_END)
+            source.seek(position)
+        head, tail = _read_head_tail(source, size)
+
+    digest = hashlib.sha256()
+    digest.update(f"{version}|{name}|{size}|".encode('utf-8'))
+    digest.update(head)
+    digest.update(tail)
+
+    return digest.hexdigest()[:32]
+
+
+def _cache_path(cache_key, cache_dir=None):
+    """Путь к файлу набора данных в кэше"""
+    cache_dir = cache_dir or DATASET_CACHE_CONFIG['path']
+    return os.path.join(cache_dir, f"{cache_key}.feather")
+
+
+def evict_lru(cache_dir, max_bytes, suffix=''):
+    """
+    Удаляет наименее давно использованные файлы, пока каталог не уложится в лимит
+
+    Время последнего использования берется из mtime, который обновляется
+    при каждом чтении из кэша.
+
+    Returns:
+        int: Количество удаленных файлов
+    """
+    if not os.path.isdir(cache_dir):
+        return 0
+
+    entries = []
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if name.endswith(suffix) and os.path.isfile(path):
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+
+    return removed
+
+
+def load_cached_dataset(cache_key, cache_dir=None):
+    """
+    Загружает набор данных из кэша
+
+    Колонки копируются в обычные колонки pandas (категории, числа),
+    поэтому файл читается целиком, без отображения в память.
+
+    Returns:
+        pd.DataFrame: Набор данных или None при промахе кэша
+    """
+    path = _cache_path(cache_key, cache_dir)
+
+    if not os.path.exists(path):
+        return None
+
+    try:
+        import pyarrow.feather as feather
+    except ImportError:
+        return None
+
+    try:
+        table = feather.read_table(path)
+        df = table.to_pandas()
+    except Exception:
+        # Поврежденный файл кэша считается промахом
+        return None
+
+    # Отметка использования для LRU вытеснения
+    os.utime(path)
+
+    return df
+
+
+def store_cached_dataset(cache_key, df, cache_dir=None):
+    """
+    Сохраняет набор данных в кэш (Feather без сжатия) и вытесняет старые записи
+
+    Returns:
+        bool: True, если набор сохранен
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.feather as feather
+    except ImportError:
+        return False
+
+    cache_dir = cache_dir or DATASET_CACHE_CONFIG['path']
+    path = _cache_path(cache_key, cache_dir)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        # Без сжатия, чтобы чтение не тратило время на распаковку
+        feather.write_feather(table, f"{path}.tmp", compression='uncompressed')
+        os.replace(f"{path}.tmp", path)
+    except Exception:
+        return False
+
+    evict_lru(cache_dir, DATASET_CACHE_CONFIG['max_size_mb'] * 1024 * 1024, suffix='.feather')
+
+    return True
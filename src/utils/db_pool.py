@@ -0,0 +1,218 @@
+"""Пул соединений с базой данных, общий для всех сессий процесса"""
+
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from ..config.settings import DB_POOL_CONFIG
+
+
+class PoolTimeoutError(Exception):
+    """Не удалось получить соединение из пула за отведенное время"""
+
+
+class ConnectionPool:
+    """
+    Пул DB-API соединений с проверкой здоровья и вытеснением простаивающих
+
+    Args:
+        connect (callable): Фабрика новых соединений без аргументов
+        max_size (int): Максимальное число открытых соединений
+        idle_timeout (float): Через сколько секунд простоя соединение закрывается
+        health_check_after (float): Простой, после которого соединение
+            проверяется запросом health_query перед выдачей
+        health_query (str): Запрос проверки соединения
+        clock (callable): Источник времени (для тестов)
+    """
+
+    def __init__(self, connect, max_size=4, idle_timeout=300.0,
+                 health_check_after=30.0, health_query='SELECT 1',
+                 clock=time.monotonic):
+        self._connect = connect
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_after = health_check_after
+        self.health_query = health_query
+        self._clock = clock
+
+        self._idle = []          # [(conn, released_at)], последние - самые теплые
+        self._in_use = 0
+        self._condition = threading.Condition()
+
+    @property
+    def size(self):
+        """Число открытых соединений (простаивающих и выданных)"""
+        with self._condition:
+            return len(self._idle) + self._in_use
+
+    @property
+    def idle_count(self):
+        """Число простаивающих соединений"""
+        with self._condition:
+            return len(self._idle)
+
+    def acquire(self, timeout=None):
+        """
+        Выдает соединение: теплое из пула или новое, если лимит не достигнут
+
+        Raises:
+            PoolTimeoutError: Если все соединения заняты дольше timeout
+        """
+        deadline = None if timeout is None else self._clock() + timeout
+
+        with self._condition:
+            while True:
+                self._evict_idle_locked()
+
+                if self._idle:
+                    conn, released_at = self._idle.pop()
+                    self._in_use += 1
+                    break
+
+                if self._in_use < self.max_size:
+                    self._in_use += 1
+                    conn, released_at = None, None
+                    break
+
+                remaining = None if deadline is None else deadline - self._clock()
+                if remaining is not None and remaining <= 0:
+                    raise PoolTimeoutError(
+                        f"Все {self.max_size} соединений пула заняты"
+                    )
+                self._condition.wait(remaining)
+
+        # Сетевые операции выполняются вне блокировки
+        try:
+            if conn is not None and self._clock() - released_at >= self.health_check_after:
+                if not self._is_healthy(conn):
+                    _close_quietly(conn)
+                    conn = None
+
+            if conn is None:
+                conn = self._connect()
+        except Exception:
+            with self._condition:
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+
+        return conn
+
+    def release(self, conn, broken=False):
+        """Возвращает соединение в пул (сломанное соединение закрывается)"""
+        with self._condition:
+            self._in_use -= 1
+            if not broken:
+                self._idle.append((conn, self._clock()))
+            self._condition.notify()
+
+        if broken:
+            _close_quietly(conn)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Контекстный менеджер: соединение возвращается в пул, при ошибке закрывается"""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        except Exception:
+            self.release(conn, broken=True)
+            raise
+        else:
+            self.release(conn)
+
+    def evict_idle(self):
+        """Закрывает соединения, простаивающие дольше idle_timeout"""
+        with self._condition:
+            return self._evict_idle_locked()
+
+    def close_all(self):
+        """Закрывает все простаивающие соединения"""
+        with self._condition:
+            idle, self._idle = self._idle, []
+
+        for conn, _ in idle:
+            _close_quietly(conn)
+
+    def _evict_idle_locked(self):
+        """Вытеснение простаивающих соединений (вызывается под блокировкой)"""
+        now = self._clock()
+        expired = [conn for conn, released_at in self._idle
+                   if now - released_at >= self.idle_timeout]
+
+        if expired:
+            self._idle = [(conn, released_at) for conn, released_at in self._idle
+                          if now - released_at < self.idle_timeout]
+            for conn in expired:
+                _close_quietly(conn)
+
+        return len(expired)
+
+    def _is_healthy(self, conn):
+        """Проверяет соединение запросом health_query"""
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(self.health_query)
+                cursor.fetchall()
+            finally:
+                cursor.close()
+            return True
+        except Exception:
+            return False
+
+
+def _close_quietly(conn):
+    """Закрывает соединение, игнорируя ошибки"""
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def make_pool_key(host, port, database, user, password):
+    """Ключ пула: сервер, база и пользователь (пароль учитывается только хэшем)"""
+    secret = hashlib.sha256(str(password).encode('utf-8')).hexdigest()[:16]
+    return (str(host), str(port), str(database), str(user), secret)
+
+
+def get_pool(key, connect, **pool_kwargs):
+    """
+    Возвращает общий для процесса пул по ключу, создавая его при первом обращении
+
+    Args:
+        key (tuple): Ключ пула (см. make_pool_key)
+        connect (callable): Фабрика соединений для нового пула
+        **pool_kwargs: Параметры ConnectionPool (по умолчанию из DB_POOL_CONFIG)
+
+    Returns:
+        ConnectionPool: Пул соединений
+    """
+    with _pools_lock:
+        pool = _pools.get(key)
+
+        if pool is None:
+            params = {
+                'max_size': DB_POOL_CONFIG['max_size'],
+                'idle_timeout': DB_POOL_CONFIG['idle_timeout'],
+                'health_check_after': DB_POOL_CONFIG['health_check_after']
+            }
+            params.update(pool_kwargs)
+            pool = ConnectionPool(connect, **params)
+            _pools[key] = pool
+
+        return pool
+
+
+def close_all_pools():
+    """Закрывает простаивающие соединения всех пулов и очищает реестр"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+
+    for pool in pools:
+        pool.close_all()
@@ -1,31 +1,70 @@
 """Загрузка и валидация данных"""
 
+from operator import itemgetter
+import numpy as np
 import pandas as pd
 import streamlit as st
-from ..config.settings import REQUIRED_COLUMNS
+from ..config.settings import REQUIRED_COLUMNS, EXCEL_DTYPES, DATE_FORMATS
+from .dataset_cache import file_fingerprint, load_cached_dataset, store_cached_dataset
+from .data_processing import optimize_sales_dtypes
+from .sales_index import register_sales_dataset
+
+# Версия логики загрузки: увеличивайте при изменении парсинга или валидации,
+# чтобы наборы в дисковом кэше пересобрались
+LOADER_VERSION = 4
+
+# Строк в одной пачке при потоковом чтении Excel
+EXCEL_CHUNK_ROWS = 50000
 
 
-@st.cache_data
 def load_and_validate_data(uploaded_file):
+    """Загружает и валидирует данные из Excel файла (с дисковым кэшем)"""
+    try:
+        cache_key = file_fingerprint(uploaded_file, LOADER_VERSION)
+    except Exception as e:
+        st.error(f"❌ Ошибка при чтении файла: {str(e)}")
+        return None
+
+    return _load_dataset(cache_key, uploaded_file)
+
+
+@st.cache_data(show_spinner=False)
+def _load_dataset(cache_key, _uploaded_file):
+    """Кэш в памяти по отпечатку файла поверх дискового кэша"""
+    df = load_cached_dataset(cache_key)
+
+    if df is not None:
+        st.success(f"✅ Данные загружены из кэша! {len(df)} записей")
+        # Feather не хранит dataset_id: регистрируем набор для кэша индексов заново
+        return register_sales_dataset(df)
+
+    df = _read_and_validate_excel(_uploaded_file)
+
+    if df is not None:
+        store_cached_dataset(cache_key, df)
+
+    return df
+
+
+def _read_and_validate_excel(uploaded_file):
     """Загружает и валидирует данные из Excel файла"""
     try:
         progress_bar = st.progress(0)
         progress_bar.progress(25)
 
-        df = pd.read_excel(uploaded_file)
+        df, missing_cols = read_sales_excel(uploaded_file)
         progress_bar.progress(50)
 
-        missing_cols = [col for col in REQUIRED_COLUMNS if col not in df.columns]
-
         if missing_cols:
             st.error(f"❌ Отсутствуют обязательные колонки: {missing_cols}")
             return None
 
         progress_bar.progress(75)
 
-        df['Datasales'] = pd.to_datetime(df['Datasales'], errors='coerce', dayfirst=True)
-        df = df.dropna(subset=['Datasales']).sort_values('Datasales')
-        df = df[(df['Qty'] >= 0) & (df['Price'] > 0)]
+        df['Datasales'] = parse_sales_dates(df['Datasales'])
+        df = df.dropna(subset=['Datasales']).sort_values('Datasales', kind='stable')
+        df = df[(df['Qty'] >= 0) & (df['Price'] > 0)].reset_index(drop=True)
+        df = register_sales_dataset(optimize_sales_dtypes(df))
 
         progress_bar.progress(100)
         progress_bar.empty()
@@ -36,3 +75,174 @@ def load_and_validate_data(uploaded_file):
     except Exception as e:
         st.error(f"❌ Ошибка при загрузке файла: {str(e)}")
         return None
+
+
+def read_sales_excel(source):
+    """
+    Читает из первого листа книги только обязательные колонки с планом типов
+
+    Использует python-calamine, если он установлен, иначе потоковое чтение
+    openpyxl в режиме read_only.
+
+    Args:
+        source: Путь к файлу или файловый объект
+
+    Returns:
+        tuple: (DataFrame или None, список отсутствующих колонок)
+    """
+    try:
+        import python_calamine  # noqa: F401
+    except ImportError:
+        return _read_excel_openpyxl(source)
+
+    return _read_excel_calamine(source)
+
+
+def _read_excel_calamine(source):
+    """Чтение через pandas + python-calamine с проекцией колонок"""
+    header = pd.read_excel(source, engine='calamine', nrows=0)
+    missing_cols = [col for col in REQUIRED_COLUMNS if col not in header.columns]
+
+    if missing_cols:
+        return None, missing_cols
+
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+    df = pd.read_excel(
+        source,
+        engine='calamine',
+        usecols=REQUIRED_COLUMNS,
+        dtype={col: dtype for col, dtype in EXCEL_DTYPES.items() if dtype == 'str'}
+    )
+
+    for col, dtype in EXCEL_DTYPES.items():
+        if dtype != 'str':
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(dtype)
+
+    return df[REQUIRED_COLUMNS], []
+
+
+def _read_excel_openpyxl(source):
+    """Потоковое чтение openpyxl (read_only) с проекцией колонок пачками"""
+    from openpyxl import load_workbook
+
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+    workbook = load_workbook(source, read_only=True, data_only=True)
+
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [str(value).strip() if value is not None else '' for value in next(rows, ())]
+
+        missing_cols = [col for col in REQUIRED_COLUMNS if col not in header]
+        if missing_cols:
+            return None, missing_cols
+
+        project = itemgetter(*[header.index(col) for col in REQUIRED_COLUMNS])
+        width = len(header)
+        chunks = {col: [] for col in REQUIRED_COLUMNS}
+
+        while True:
+            batch = []
+            for row in rows:
+                # Хвостовые пустые ячейки в read_only режиме не возвращаются
+                if len(row) < width:
+                    row = row + (None,) * (width - len(row))
+                batch.append(project(row))
+                if len(batch) >= EXCEL_CHUNK_ROWS:
+                    break
+
+            if not batch:
+                break
+
+            for col, values in zip(REQUIRED_COLUMNS, zip(*batch)):
+                chunks[col].append(_typed_excel_column(values, EXCEL_DTYPES.get(col)))
+
+            if len(batch) < EXCEL_CHUNK_ROWS:
+                break
+
+    finally:
+        workbook.close()
+
+    df = pd.DataFrame({
+        col: pd.concat(chunks[col], ignore_index=True) if chunks[col]
+        else pd.Series([], dtype=EXCEL_DTYPES.get(col, 'object'))
+        for col in REQUIRED_COLUMNS
+    })
+
+    return df, []
+
+
+def _typed_excel_column(values, dtype):
+    """Применяет план типов к значениям одной колонки пачки"""
+    values = np.array(values, dtype=object)
+
+    if dtype is None:
+        return pd.Series(values, dtype=object)
+
+    if dtype == 'str':
+        series = pd.Series(values, dtype=object)
+        mask = series.notna()
+        series[mask] = series[mask].astype(str)
+        return series.astype('string')
+
+    return pd.to_numeric(pd.Series(values), errors='coerce').astype(dtype)
+
+
+def detect_date_format(values, sample_size=1000):
+    """
+    Определяет единый формат строковых дат по выборке
+
+    Returns:
+        str: Формат из DATE_FORMATS или None, если ни один не подходит
+    """
+    sample = pd.Series(values).dropna().astype(str).str.strip()
+    sample = sample[sample != ''].head(sample_size)
+
+    if len(sample) == 0:
+        return None
+
+    for fmt in DATE_FORMATS:
+        try:
+            pd.to_datetime(sample, format=fmt)
+        except (ValueError, TypeError):
+            continue
+        return fmt
+
+    return None
+
+
+def parse_sales_dates(values):
+    """
+    Разбирает колонку Datasales
+
+    Значения-даты из Excel конвертируются напрямую, строки разбираются
+    по определенному заранее фиксированному формату. Если формат не найден,
+    используется разбор с dayfirst=True.
+
+    Returns:
+        pd.Series: Даты (NaT для некорректных значений)
+    """
+    series = pd.Series(values)
+
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+
+    non_null = series.dropna()
+    if len(non_null) == 0:
+        return pd.to_datetime(series, errors='coerce')
+
+    sample = non_null.head(1000)
+    is_text = [isinstance(value, str) for value in sample]
+
+    if not any(is_text):
+        return pd.to_datetime(series, errors='coerce')
+
+    if all(is_text):
+        fmt = detect_date_format(sample)
+        if fmt is not None:
+            return pd.to_datetime(series, format=fmt, errors='coerce')
+
+    return pd.to_datetime(series, errors='coerce', dayfirst=True)
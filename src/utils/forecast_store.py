@@ -0,0 +1,362 @@
+"""Версионное хранилище результатов прогнозов: Parquet по магазинам и индекс запусков"""
+
+import hashlib
+import json
+import os
+import threading
+import uuid
+import pandas as pd
+from ..config.settings import FORECAST_STORE_CONFIG
+
+# Уровни ключа ряда; None - агрегат по уровню (все магазины, все сегменты)
+STORE_LEVELS = ['Magazin', 'Segment', 'Model']
+
+# Колонки прогноза в хранилище
+STORE_FORECAST_COLUMNS = ['ds', 'yhat', 'yhat_lower', 'yhat_upper']
+
+INDEX_COLUMNS = ['run_id', 'created_at'] + STORE_LEVELS + [
+    'series', 'method', 'profile', 'params', 'horizon', 'ds_start', 'ds_end', 'path'
+]
+
+# Запись индекса и файлов запусков из потоков одного процесса
+_write_lock = threading.Lock()
+
+
+def series_id(key):
+    """
+    Идентификатор ряда по значениям STORE_LEVELS
+
+    Общий ключ ряда хранилища, пакетного прогноза и вкладки прогноза:
+    по нему находятся дообучение с теплым стартом и подобранные параметры.
+
+    Args:
+        key (dict): Значения уровней; пропущенный уровень - агрегат (None)
+
+    Returns:
+        str: Стабильный идентификатор ряда
+    """
+    return json.dumps([key.get(level) for level in STORE_LEVELS], ensure_ascii=False)
+
+
+def _partition_name(magazin):
+    """Каталог раздела магазина (агрегат по магазинам - отдельный раздел)"""
+    if magazin is None:
+        return 'magazin=__all__'
+    safe = ''.join(ch if ch.isalnum() else '_' for ch in str(magazin))
+    digest = hashlib.sha1(str(magazin).encode('utf-8')).hexdigest()[:8]
+    return f"magazin={safe}_{digest}"
+
+
+def _as_levels(frame):
+    """Колонки уровней с None вместо пропусков"""
+    frame[STORE_LEVELS] = frame[STORE_LEVELS].astype(object).where(frame[STORE_LEVELS].notna(), None)
+    return frame
+
+
+class ForecastStore:
+    """
+    Хранилище прогнозов: каждый запуск - неизменяемая версия
+
+    Прогнозы запуска пишутся файлами Parquet по разделам магазина
+    (magazin=<имя>/<run_id>.parquet), а индекс запусков хранит по строке
+    на ряд запуска: ключ, параметры, горизонт, дату создания и диапазон
+    дат. Индекс - каталог фрагментов (index/<run_id>.parquet, по файлу
+    на запуск), поэтому сохранение не переписывает прежние строки; после
+    compact_after фрагментов они уплотняются в один (см. compact).
+    Запросы сначала отбирают строки индекса и читают только нужные
+    файлы, отфильтрованные по ряду и датам.
+
+    Args:
+        path (str): Каталог хранилища (по умолчанию из FORECAST_STORE_CONFIG)
+    """
+
+    def __init__(self, path=None):
+        self.path = path or FORECAST_STORE_CONFIG['path']
+        self._index = None
+        self._fragments = {}
+
+    @property
+    def _index_dir(self):
+        return os.path.join(self.path, 'index')
+
+    def _index_files(self):
+        """Фрагменты индекса (и единый index.parquet хранилищ прежнего формата)"""
+        files = []
+        if os.path.isdir(self._index_dir):
+            files = [os.path.join(self._index_dir, name) for name in sorted(os.listdir(self._index_dir))
+                     if name.endswith('.parquet')]
+        legacy = os.path.join(self.path, 'index.parquet')
+        return files + [legacy] if os.path.exists(legacy) else files
+
+    def index(self):
+        """
+        Индекс запусков (читаются только новые фрагменты)
+
+        Returns:
+            pd.DataFrame: INDEX_COLUMNS, по строке на ряд запуска
+        """
+        files = self._index_files()
+        if not files:
+            self._index, self._fragments = None, {}
+            return pd.DataFrame(columns=INDEX_COLUMNS)
+
+        # Фрагменты неизменяемы: достаточно сравнить набор файлов
+        if self._index is None or set(files) != set(self._fragments):
+            self._fragments = {path: self._fragments[path] if path in self._fragments
+                               else pd.read_parquet(path) for path in files}
+            index = pd.concat(list(self._fragments.values()), ignore_index=True)
+            # Уплотнение из другого потока: строки могут на миг быть и в старых фрагментах
+            self._index = _as_levels(index.drop_duplicates(['run_id', 'series'], ignore_index=True))
+        return self._index
+
+    def save(self, forecast, key=None, method='prophet', profile=None, params=None, created_at=None):
+        """
+        Сохраняет прогноз одного ряда новой версией
+
+        Args:
+            forecast (pd.DataFrame): ds, yhat, yhat_lower, yhat_upper (дни прогноза)
+            key (dict): Значения STORE_LEVELS ряда; пропущенный уровень - агрегат
+            method (str): Модель прогноза
+            profile (str): Профиль скорости Prophet
+            params (dict): Параметры модели и предобработки
+            created_at (pd.Timestamp): Время запуска (по умолчанию текущее)
+
+        Returns:
+            str: Идентификатор запуска
+        """
+        key = key or {}
+        unknown = set(key) - set(STORE_LEVELS)
+        if unknown:
+            raise ValueError(f"Неизвестные уровни ключа: {sorted(unknown)}")
+
+        table = forecast[STORE_FORECAST_COLUMNS].assign(**{level: key.get(level) for level in STORE_LEVELS})
+        return self._write(table, method, profile, params, created_at)
+
+    def save_batch(self, forecasts, levels, method='prophet', profile=None, params=None, created_at=None):
+        """
+        Сохраняет прогнозы многих рядов одним запуском (например, из batch_forecast)
+
+        Args:
+            forecasts (pd.DataFrame): Длинная таблица: уровни + ds, yhat, yhat_lower, yhat_upper
+            levels (list): Уровни рядов из STORE_LEVELS
+
+        Returns:
+            str: Идентификатор запуска
+        """
+        unknown = set(levels) - set(STORE_LEVELS)
+        if unknown:
+            raise ValueError(f"Неизвестные уровни ключа: {sorted(unknown)}")
+
+        table = forecasts[list(levels) + STORE_FORECAST_COLUMNS].copy()
+        for level in STORE_LEVELS:
+            if level not in levels:
+                table[level] = None
+        return self._write(table, method, profile, params, created_at)
+
+    def _write(self, table, method, profile, params, created_at):
+        """Пишет файлы разделов запуска и добавляет его ряды в индекс"""
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise Exception(
+                "Модуль pyarrow не установлен. Установите: pip install pyarrow"
+            )
+
+        created_at = pd.Timestamp(created_at) if created_at is not None else pd.Timestamp.now()
+        run_id = f"{created_at:%Y%m%d%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+
+        table = _as_levels(table.assign(ds=pd.to_datetime(table['ds'])))
+        keys = table[STORE_LEVELS].drop_duplicates()
+        keys['series'] = [series_id(dict(zip(STORE_LEVELS, values)))
+                          for values in keys.itertuples(index=False)]
+        table = table.merge(keys, on=STORE_LEVELS, how='left')
+        table.insert(0, 'run_id', run_id)
+
+        entries = []
+        for magazin, part in table.groupby('Magazin', dropna=False, sort=False):
+            magazin = None if pd.isna(magazin) else magazin
+            relative = os.path.join(_partition_name(magazin), f"{run_id}.parquet")
+            target = os.path.join(self.path, relative)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            part.to_parquet(f"{target}.tmp", index=False)
+            os.replace(f"{target}.tmp", target)
+
+            summary = part.groupby('series', sort=False).agg(
+                horizon=('ds', 'size'), ds_start=('ds', 'min'), ds_end=('ds', 'max')
+            ).reset_index()
+            summary = summary.merge(part[['series'] + STORE_LEVELS].drop_duplicates('series'), on='series')
+            summary['path'] = relative
+            entries.append(summary)
+
+        entries = pd.concat(entries, ignore_index=True).assign(
+            run_id=run_id,
+            created_at=created_at,
+            method=method,
+            profile=profile,
+            params=json.dumps(params or {}, ensure_ascii=False, sort_keys=True, default=str)
+        )[INDEX_COLUMNS]
+
+        with _write_lock:
+            self._write_fragment(entries, f"{run_id}.parquet")
+            if len(self._index_files()) > FORECAST_STORE_CONFIG['compact_after']:
+                self._compact(FORECAST_STORE_CONFIG['keep_runs'])
+
+        return run_id
+
+    def _write_fragment(self, entries, name):
+        """Атомарно пишет фрагмент индекса"""
+        os.makedirs(self._index_dir, exist_ok=True)
+        target = os.path.join(self._index_dir, name)
+        entries.to_parquet(f"{target}.tmp", index=False)
+        os.replace(f"{target}.tmp", target)
+
+    def compact(self, keep_runs=None):
+        """
+        Уплотняет фрагменты индекса в один и удаляет версии сверх лимита
+
+        Args:
+            keep_runs (int): Последних запусков каждого ряда
+                             (по умолчанию из FORECAST_STORE_CONFIG; None - все)
+
+        Returns:
+            int: Удалено строк индекса
+        """
+        keep_runs = keep_runs if keep_runs is not None else FORECAST_STORE_CONFIG['keep_runs']
+        with _write_lock:
+            return self._compact(keep_runs)
+
+    def _compact(self, keep_runs):
+        """Уплотнение под _write_lock: новый фрагмент пишется до удаления прежних"""
+        files = self._index_files()
+        if not files:
+            return 0
+
+        index = self.index()
+        kept = index
+        if keep_runs:
+            newest = index.sort_values('created_at', ascending=False, kind='stable')
+            kept = newest[newest.groupby('series', dropna=False).cumcount() < keep_runs].sort_index()
+
+        if len(kept):
+            self._write_fragment(kept, f"compacted-{uuid.uuid4().hex}.parquet")
+        for path in files:
+            os.remove(path)
+
+        # Файлы запусков, на которые не осталось ссылок в индексе
+        for relative in set(index['path']) - set(kept['path']):
+            try:
+                os.remove(os.path.join(self.path, relative))
+            except FileNotFoundError:
+                pass
+
+        return len(index) - len(kept)
+
+    def runs(self, **levels):
+        """
+        Запуски рядов, подходящих под отбор, от новых к старым
+
+        Args:
+            **levels: Значения уровней (None - агрегат); пропущенный уровень - любой
+
+        Returns:
+            pd.DataFrame: Строки индекса
+        """
+        index = self.index()
+        mask = pd.Series(True, index=index.index)
+        for level, value in levels.items():
+            if level not in STORE_LEVELS:
+                raise ValueError(f"Неизвестный уровень ключа: {level}")
+            mask &= index[level].isna() if value is None else index[level] == value
+
+        return index[mask].sort_values('created_at', ascending=False, kind='stable')
+
+    def latest(self, **key):
+        """
+        Последний прогноз ряда
+
+        Args:
+            **key: Значения STORE_LEVELS ряда; пропущенный уровень - агрегат
+
+        Returns:
+            pd.DataFrame: ds, yhat, yhat_lower, yhat_upper (строка индекса запуска
+                          в attrs['run']) или None, если прогноза нет
+        """
+        runs = self.runs(**{level: key.get(level) for level in STORE_LEVELS})
+        if runs.empty:
+            return None
+
+        run = runs.iloc[0]
+        forecast = pd.read_parquet(
+            os.path.join(self.path, run['path']),
+            columns=STORE_FORECAST_COLUMNS,
+            filters=[('series', '==', run['series'])]
+        ).sort_values('ds', ignore_index=True)
+        forecast.attrs['run'] = run.to_dict()
+        return forecast
+
+    def query(self, start=None, end=None, latest_only=True, **levels):
+        """
+        Прогнозы рядов за диапазон дат
+
+        По индексу отбираются только запуски, чей диапазон дат пересекается
+        с запрошенным, и читаются только их файлы.
+
+        Args:
+            start: Первый день диапазона (None - без ограничения)
+            end: Последний день диапазона (None - без ограничения)
+            latest_only (bool): Только последний запуск каждого ряда
+            **levels: Отбор рядов, как в runs
+
+        Returns:
+            pd.DataFrame: run_id, created_at, STORE_LEVELS, ds, yhat, yhat_lower, yhat_upper
+        """
+        runs = self.runs(**levels)
+        if latest_only:
+            runs = runs.drop_duplicates('series')
+
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+        if start is not None:
+            runs = runs[runs['ds_end'] >= start]
+        if end is not None:
+            runs = runs[runs['ds_start'] <= end]
+
+        columns = ['run_id', 'created_at'] + STORE_LEVELS + STORE_FORECAST_COLUMNS
+        if runs.empty:
+            return pd.DataFrame(columns=columns)
+
+        date_filters = []
+        if start is not None:
+            date_filters.append(('ds', '>=', start))
+        if end is not None:
+            date_filters.append(('ds', '<=', end))
+
+        frames = [
+            pd.read_parquet(
+                os.path.join(self.path, path),
+                filters=[('series', 'in', list(group['series']))] + date_filters
+            )
+            for path, group in runs.groupby('path', sort=False)
+        ]
+        result = pd.concat(frames, ignore_index=True).merge(
+            runs[['run_id', 'created_at']].drop_duplicates(), on='run_id'
+        )
+        return _as_levels(result[columns]).sort_values(
+            ['created_at', 'ds'], ascending=[False, True], kind='stable', ignore_index=True
+        )
+
+
+_stores = {}
+
+
+def get_forecast_store(path=None):
+    """
+    Хранилище прогнозов каталога (один объект на процесс, индекс кэшируется)
+
+    Returns:
+        ForecastStore: Хранилище
+    """
+    path = path or FORECAST_STORE_CONFIG['path']
+    if path not in _stores:
+        _stores[path] = ForecastStore(path)
+    return _stores[path]
@@ -0,0 +1,236 @@
+"""Очередь фоновых задач (обучение моделей), общая для всех сессий процесса"""
+
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from ..config.settings import JOB_QUEUE_CONFIG
+
+# Состояния задачи
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+FINISHED_STATUSES = (DONE, FAILED, CANCELLED)
+
+JOB_STATUS_LABELS = {
+    QUEUED: '⏳ В очереди',
+    RUNNING: '🔄 Выполняется',
+    DONE: '✅ Готово',
+    FAILED: '❌ Ошибка',
+    CANCELLED: '⛔ Отменено'
+}
+
+
+class JobCancelled(Exception):
+    """Задача отменена во время выполнения"""
+
+
+class Job:
+    """
+    Фоновая задача: состояние, прогресс и результат
+
+    Функция задачи получает Job первым аргументом и сообщает прогресс
+    через report(done, total) - сигнатура совпадает с on_progress
+    пакетного прогноза. Отмена кооперативная: report выбрасывает
+    JobCancelled, если отмена запрошена.
+    """
+
+    def __init__(self, job_id, key, clock=time.monotonic):
+        self.id = job_id
+        self.key = key
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = ''
+        self.result = None
+        self.error = None
+        self._clock = clock
+        self.submitted_at = clock()
+        self.started_at = None
+        self.finished_at = None
+        self._cancel = threading.Event()
+        self._future = None
+
+    @property
+    def finished(self):
+        """Задача завершена (успешно, с ошибкой или отменена)"""
+        return self.status in FINISHED_STATUSES
+
+    @property
+    def cancel_requested(self):
+        """Запрошена отмена задачи"""
+        return self._cancel.is_set()
+
+    @property
+    def elapsed(self):
+        """Секунд с начала выполнения (0 для задачи в очереди)"""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or self._clock()) - self.started_at
+
+    def report(self, done, total=1, message=None):
+        """
+        Сообщает прогресс задачи
+
+        Raises:
+            JobCancelled: Если запрошена отмена
+        """
+        if self._cancel.is_set():
+            raise JobCancelled(self.id)
+
+        self.progress = min(max(done / total, 0.0), 1.0) if total else 0.0
+        if message is not None:
+            self.message = message
+
+
+class JobQueue:
+    """
+    Пул потоков для фоновых задач с дедупликацией и отменой
+
+    Потоки (а не процессы) выбраны потому, что результат - обученная
+    модель - нужен сессиям Streamlit этого же процесса, а оптимизация
+    Stan идет во внешнем процессе cmdstan и не держит GIL.
+
+    Args:
+        workers (int): Потоков выполнения
+        keep_finished (int): Сколько завершенных задач хранить для выдачи
+        clock (callable): Источник времени (для тестов)
+    """
+
+    def __init__(self, workers=2, keep_finished=64, clock=time.monotonic):
+        self.workers = workers
+        self.keep_finished = keep_finished
+        self._clock = clock
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='forecast-job')
+        self._jobs = OrderedDict()  # id -> Job в порядке постановки
+        self._active = {}           # ключ -> id задачи в очереди или выполнении
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, key, func, *args, **kwargs):
+        """
+        Ставит задачу в очередь; одинаковая задача в работе не дублируется
+
+        Args:
+            key (hashable): Ключ задачи (например, выбор и настройки прогноза)
+            func (callable): Функция func(job, *args, **kwargs)
+
+        Returns:
+            str: Идентификатор задачи (существующей, если такая уже в работе)
+        """
+        with self._lock:
+            active_id = self._active.get(key)
+            if active_id is not None:
+                return active_id
+
+            job = Job(f"job-{next(self._ids)}", key, self._clock)
+            self._jobs[job.id] = job
+            self._active[key] = job.id
+            job._future = self._executor.submit(self._run, job, func, args, kwargs)
+            return job.id
+
+    def get(self, job_id):
+        """Задача по идентификатору или None (неизвестная или вытесненная)"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def find(self, key):
+        """Последняя задача с ключом (в работе или завершенная) или None"""
+        with self._lock:
+            for job in reversed(self._jobs.values()):
+                if job.key == key:
+                    return job
+        return None
+
+    def jobs(self):
+        """Все хранимые задачи в порядке постановки"""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id):
+        """
+        Отменяет задачу: из очереди - сразу, выполняемую - на следующем report
+
+        Результат выполняемой задачи, которая не проверяет отмену, будет
+        отброшен после завершения.
+
+        Returns:
+            bool: True, если отмена принята
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return False
+
+            job._cancel.set()
+            if job._future.cancel():
+                self._finish_locked(job, CANCELLED)
+            return True
+
+    def shutdown(self, wait=True):
+        """Отменяет задачи в очереди и останавливает потоки"""
+        for job in self.jobs():
+            if job.status == QUEUED:
+                self.cancel(job.id)
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job, func, args, kwargs):
+        """Выполнение задачи в потоке пула"""
+        with self._lock:
+            if job.cancel_requested:
+                self._finish_locked(job, CANCELLED)
+                return
+            job.status = RUNNING
+            job.started_at = self._clock()
+
+        try:
+            result = func(job, *args, **kwargs)
+        except JobCancelled:
+            status, result, error = CANCELLED, None, None
+        except Exception as e:
+            status, result, error = FAILED, None, f"{type(e).__name__}: {e}"
+        else:
+            status, error = (CANCELLED, None) if job.cancel_requested else (DONE, None)
+
+        with self._lock:
+            job.result = result if status == DONE else None
+            job.error = error
+            if status == DONE:
+                job.progress = 1.0
+            self._finish_locked(job, status)
+
+    def _finish_locked(self, job, status):
+        """Завершает задачу и вытесняет старые завершенные (под блокировкой)"""
+        job.status = status
+        job.finished_at = self._clock()
+        if self._active.get(job.key) == job.id:
+            del self._active[job.key]
+
+        finished = [job_id for job_id, item in self._jobs.items() if item.finished]
+        for job_id in finished[:max(len(finished) - self.keep_finished, 0)]:
+            del self._jobs[job_id]
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """
+    Возвращает общую для процесса очередь задач, создавая ее при первом обращении
+
+    Returns:
+        JobQueue: Очередь с параметрами JOB_QUEUE_CONFIG
+    """
+    global _queue
+
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue(
+                workers=JOB_QUEUE_CONFIG['workers'],
+                keep_finished=JOB_QUEUE_CONFIG['keep_finished']
+            )
+        return _queue
@@ -0,0 +1,291 @@
+"""Дневной куб продаж (дата × магазин × сегмент × модель) для аналитики"""
+
+import numpy as np
+import pandas as pd
+from .sales_index import ALL_MAGAZINS, ALL_SEGMENTS, _codes, dataset_cached
+
+# Измерения куба в порядке ключа ячейки
+CUBE_DIMENSIONS = ['Datasales', 'Magazin', 'Segment', 'Model']
+
+# Меры куба; Rows - число исходных строк в ячейке
+CUBE_MEASURES = ['Qty', 'Sum']
+
+# Измерения календаря: индекс дня, день недели (0 - пн), ISO неделя, месяц
+CALENDAR_DIMENSIONS = ['day', 'weekday', 'week', 'month']
+
+# 1970-01-01 - четверг: день недели (пн = 0) дня с номером d равен (d + 3) % 7
+_EPOCH_WEEKDAY = 3
+
+
+def _day_codes(series):
+    """
+    Коды дней от первого дня набора и сам первый день
+
+    Пропуски получают код числа дней, как пропуски категорий в _codes.
+    """
+    days = pd.to_datetime(series).to_numpy().astype('datetime64[D]')
+    missing = np.isnat(days)
+    numbers = days.view('int64')
+
+    if missing.all():
+        return np.zeros(len(days), dtype='int64'), np.datetime64('1970-01-01', 'D'), 0
+
+    first = numbers[~missing].min()
+    span = int(numbers[~missing].max() - first) + 1
+    codes = numbers - first
+    codes[missing] = span
+    return codes, np.datetime64(int(first), 'D'), span
+
+
+class SalesCalendar:
+    """
+    Календарь дней набора, рассчитанный один раз при построении куба
+
+    По индексу дня (0 - первый день набора) хранит компактные целые коды
+    дня недели, ISO недели и месяца. Последний элемент каждого массива -
+    код пропуска для строк без даты. Названия дней и месяцев вычисляются
+    только при отрисовке.
+
+    Args:
+        first_day (np.datetime64): Первый день набора
+        n_days (int): Число дней от первого до последнего
+    """
+
+    def __init__(self, first_day, n_days):
+        self.first_day = np.datetime64(first_day, 'D')
+        self.n_days = n_days
+
+        numbers = self.first_day.astype('int64') + np.arange(n_days, dtype='int64')
+        weekday = (numbers + _EPOCH_WEEKDAY) % 7
+        months = numbers.astype('datetime64[D]').astype('datetime64[M]').view('int64')
+        mondays = numbers - weekday
+
+        self.first_month = months[0] if n_days else 0
+        self.first_monday = mondays[0] if n_days else 0
+        self.n_months = int(months[-1] - self.first_month) + 1 if n_days else 0
+        self.n_weeks = int(mondays[-1] - self.first_monday) // 7 + 1 if n_days else 0
+
+        self.codes = {
+            'day': np.append(np.arange(n_days), n_days).astype('int32'),
+            'weekday': np.append(weekday, 7).astype('int8'),
+            'week': np.append((mondays - self.first_monday) // 7, self.n_weeks).astype('int16'),
+            'month': np.append(months - self.first_month, self.n_months).astype('int16')
+        }
+        self.sizes = {'day': n_days, 'weekday': 7, 'week': self.n_weeks, 'month': self.n_months}
+
+    def lookup(self, dimension, day_codes):
+        """Коды измерения календаря для кодов дней и число значений"""
+        return self.codes[dimension][day_codes], self.sizes[dimension]
+
+    def decode(self, dimension, codes):
+        """
+        Значения измерения календаря по кодам
+
+        'day' и 'weekday' остаются целыми, 'week' - понедельник ISO недели,
+        'month' - первый день месяца.
+        """
+        if dimension in ('day', 'weekday'):
+            return codes
+        if dimension == 'week':
+            days = np.datetime64(int(self.first_monday), 'D') + codes.astype('int64') * 7
+            return days.astype('datetime64[ns]')
+        months = np.datetime64(int(self.first_month), 'M') + codes.astype('int64')
+        return months.astype('datetime64[ns]')
+
+    def dates(self, codes):
+        """Даты по индексам дней"""
+        return (self.first_day + np.asarray(codes, dtype='int64')).astype('datetime64[ns]')
+
+
+class SalesCube:
+    """
+    Материализованный дневной куб продаж
+
+    Строится за один проход по набору: строки сворачиваются в непустые
+    ячейки (день, магазин, сегмент, модель) с суммами Qty, Sum и числом
+    строк. Ячейки хранятся колонками кодов (COO), поэтому отбор магазина
+    и сегмента и любые свертки работают по ячейкам, а не по строкам.
+
+    Измерения и меры, которых нет в наборе, в куб не входят.
+
+    Args:
+        df (pd.DataFrame): Набор продаж (сырые строки или дневные суммы)
+    """
+
+    def __init__(self, df=None):
+        self.dimensions = []
+        self.measures = []
+        self.codes = {}
+        self.labels = {}
+        self.values = {}
+        self.calendar = SalesCalendar('1970-01-01', 0)
+        self.n_cells = 0
+
+        if df is not None:
+            self._build(df)
+
+    def _build(self, df):
+        """Свертка строк набора в ячейки"""
+        self.dimensions = [d for d in CUBE_DIMENSIONS if d in df.columns]
+        self.measures = [m for m in CUBE_MEASURES if m in df.columns]
+
+        key = np.zeros(len(df), dtype='int64')
+        sizes = []
+
+        for dimension in self.dimensions:
+            if dimension == 'Datasales':
+                codes, first_day, n_labels = _day_codes(df[dimension])
+                self.calendar = SalesCalendar(first_day, n_labels)
+            else:
+                codes, categories = _codes(df[dimension])
+                n_labels = len(categories)
+                self.labels[dimension] = pd.Index(categories)
+
+            # Код n_labels - пропуск, поэтому основание n_labels + 1
+            key = key * (n_labels + 1) + codes
+            sizes.append(n_labels + 1)
+
+        cell_keys, cells = np.unique(key, return_inverse=True)
+        self.n_cells = len(cell_keys)
+
+        for dimension, size in zip(reversed(self.dimensions), reversed(sizes)):
+            cell_keys, codes = np.divmod(cell_keys, size)
+            self.codes[dimension] = codes
+
+        for measure in self.measures:
+            weights = pd.to_numeric(df[measure]).to_numpy(dtype='float64', na_value=0.0)
+            totals = np.bincount(cells, weights=np.nan_to_num(weights), minlength=self.n_cells)
+            if pd.api.types.is_integer_dtype(df[measure].dtype):
+                totals = totals.astype('int64')
+            self.values[measure] = totals
+
+        self.values['Rows'] = np.bincount(cells, minlength=self.n_cells)
+
+    def _n_labels(self, dimension):
+        """Число значений измерения (код пропуска)"""
+        if dimension == 'Datasales':
+            return self.calendar.n_days
+        return len(self.labels[dimension])
+
+    def subset(self, magazin=ALL_MAGAZINS, segment=ALL_SEGMENTS):
+        """
+        Ячейки выбора из селекторов вкладок ('Все ...' - без отбора)
+
+        Returns:
+            SalesCube: Куб с теми же справочниками и частью ячеек
+        """
+        mask = np.ones(self.n_cells, dtype=bool)
+
+        for dimension, value, everything in [('Magazin', magazin, ALL_MAGAZINS),
+                                             ('Segment', segment, ALL_SEGMENTS)]:
+            if value == everything:
+                continue
+            if dimension not in self.codes or value not in self.labels[dimension]:
+                mask[:] = False
+                break
+            mask &= self.codes[dimension] == self.labels[dimension].get_loc(value)
+
+        if mask.all():
+            return self
+
+        cube = SalesCube()
+        cube.dimensions = self.dimensions
+        cube.measures = self.measures
+        cube.labels = self.labels
+        cube.calendar = self.calendar
+        cube.codes = {d: codes[mask] for d, codes in self.codes.items()}
+        cube.values = {m: values[mask] for m, values in self.values.items()}
+        cube.n_cells = int(mask.sum())
+        return cube
+
+    def _dimension_codes(self, dimension):
+        """Коды ячеек по измерению (включая календарные) и число значений"""
+        if dimension in CALENDAR_DIMENSIONS:
+            if 'Datasales' not in self.codes:
+                raise KeyError(dimension)
+            return self.calendar.lookup(dimension, self.codes['Datasales'])
+
+        return self.codes[dimension], self._n_labels(dimension)
+
+    def _decode(self, dimension, codes):
+        """Значения измерения по кодам"""
+        if dimension in CALENDAR_DIMENSIONS:
+            return self.calendar.decode(dimension, codes)
+        if dimension == 'Datasales':
+            return self.calendar.dates(codes)
+        return pd.Categorical.from_codes(codes, categories=self.labels[dimension])
+
+    def rollup(self, dimensions=()):
+        """
+        Свертка куба по подмножеству измерений
+
+        Как и groupby, отбрасывает ячейки с пропуском в любом из измерений
+        свертки и возвращает группы в порядке значений измерений.
+
+        Args:
+            dimensions (list): Измерения из CUBE_DIMENSIONS и CALENDAR_DIMENSIONS
+                ('day' - индекс дня от первого дня набора, 'weekday' - день
+                недели 0..6 с понедельника, 'week' - понедельник ISO недели,
+                'month' - первый день месяца)
+
+        Returns:
+            pd.DataFrame: Колонки измерений, мер и Rows
+        """
+        dimensions = list(dimensions)
+        key = np.zeros(self.n_cells, dtype='int64')
+        present = np.ones(self.n_cells, dtype=bool)
+        sizes = []
+
+        for dimension in dimensions:
+            codes, n_labels = self._dimension_codes(dimension)
+            codes = codes.astype('int64')
+            present &= codes < n_labels
+            key = key * max(n_labels, 1) + np.minimum(codes, max(n_labels - 1, 0))
+            sizes.append(max(n_labels, 1))
+
+        key = key[present]
+        group_keys, groups = np.unique(key, return_inverse=True)
+        n_groups = len(group_keys)
+
+        result = {}
+        group_codes = {}
+        for dimension, size in zip(reversed(dimensions), reversed(sizes)):
+            group_keys, group_codes[dimension] = np.divmod(group_keys, size)
+
+        for dimension in dimensions:
+            result[dimension] = self._decode(dimension, group_codes[dimension])
+
+        for measure, values in self.values.items():
+            totals = np.bincount(groups, weights=values[present], minlength=n_groups)
+            result[measure] = totals.astype(values.dtype)
+
+        return pd.DataFrame(result)
+
+    @property
+    def period(self):
+        """Первый и последний день с продажами"""
+        days = self.rollup(['Datasales'])['Datasales']
+        return days.iloc[0], days.iloc[-1]
+
+    def nunique(self, dimension):
+        """Число значений измерения в ячейках куба (без пропусков)"""
+        return len(self.rollup([dimension]))
+
+    def total(self, measure):
+        """Сумма меры по всем ячейкам"""
+        return self.values[measure].sum()
+
+
+def get_sales_cube(df):
+    """
+    Куб набора из кэша процесса или новый
+
+    Returns:
+        SalesCube: Дневной куб продаж набора
+    """
+    return dataset_cached('cube', df, SalesCube)
+
+
+def sales_cube(data):
+    """Куб для данных вкладки: готовый SalesCube или куб набора продаж"""
+    return data if isinstance(data, SalesCube) else get_sales_cube(data)
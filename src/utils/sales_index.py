@@ -0,0 +1,269 @@
+"""Индекс строк продаж по магазину и сегменту, общий для всех вкладок"""
+
+import threading
+import uuid
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+ALL_MAGAZINS = 'Все магазины'
+ALL_SEGMENTS = 'Все сегменты'
+
+# Производных структур (индексов, кубов) в памяти процесса
+_DATASET_CACHE_SIZE = 16
+
+_dataset_cache = OrderedDict()
+_dataset_lock = threading.Lock()
+
+
+class DatasetId(str):
+    """
+    Идентификатор набора в df.attrs['dataset_id']
+
+    pandas переносит attrs в производные наборы (sort_values, copy,
+    срезы, преобразования той же длины) глубоким копированием, поэтому
+    при копировании идентификатор заменяется новым: переупорядоченный
+    или измененный набор не получит чужой индекс или куб из кэша.
+    Копии через pickle (st.cache_data между перезапусками) сохраняют
+    идентификатор и общий кэш.
+    """
+
+    def __deepcopy__(self, memo):
+        return DatasetId(uuid.uuid4().hex)
+
+
+def register_sales_dataset(df):
+    """
+    Присваивает набору dataset_id для кэша производных структур
+
+    Порядок строк (по Datasales) не меняется: позиции магазинов и пар
+    магазин/сегмент SalesIndex берет из устойчивой сортировки ключей.
+    """
+    df = df.reset_index(drop=True)
+    df.attrs['dataset_id'] = DatasetId(uuid.uuid4().hex)
+    return df
+
+
+def _codes(series):
+    """
+    Коды категорий и их значения
+
+    Пропуски получают код len(categories): как и sort_values, они идут последними.
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype('category')
+    categories = list(series.cat.categories)
+    codes = series.cat.codes.to_numpy(dtype='int64')
+    codes[codes < 0] = len(categories)
+    return codes, categories
+
+
+class SalesIndex:
+    """
+    Позиции строк по магазину, сегменту и паре магазин/сегмент
+
+    Строится один раз: позиции строк упорядочиваются устойчивой
+    сортировкой ключа (Magazin, Segment), сам набор остается в порядке
+    дат. Позиции магазина или пары - непрерывный отрезок этой сортировки
+    в порядке дат. Если строки уже сгруппированы по ключу, выборы
+    отдаются срезами без копирования.
+
+    Args:
+        df (pd.DataFrame): Набор с колонками Magazin и Segment
+    """
+
+    def __init__(self, df):
+        self.n_rows = len(df)
+
+        magazin_codes, magazins = _codes(df['Magazin'])
+        segment_codes, segments = _codes(df['Segment'])
+
+        width = len(segments) + 1
+        key = magazin_codes * width + segment_codes
+        self.contiguous = bool(np.all(key[1:] >= key[:-1]))
+        self._order = None if self.contiguous else np.argsort(key, kind='stable')
+
+        sorted_key = key if self.contiguous else key[self._order]
+        starts = np.flatnonzero(np.diff(sorted_key)) + 1
+        starts = np.concatenate([[0], starts]) if self.n_rows else starts
+        ends = np.concatenate([starts[1:], [self.n_rows]]) if self.n_rows else starts
+
+        self._pairs = {}
+        self._magazins = {}
+        segment_ranges = {}
+
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            pair_key = int(sorted_key[start])
+            magazin_code, segment_code = divmod(pair_key, width)
+            has_magazin = magazin_code < len(magazins)
+            has_segment = segment_code < len(segments)
+
+            # Пропуски не попадают ни в одну пару, но входят
+            # в строки своего магазина или сегмента
+            if has_magazin:
+                magazin = magazins[magazin_code]
+                first, _ = self._magazins.get(magazin, (start, end))
+                self._magazins[magazin] = (first, end)
+
+            if has_segment:
+                segment = segments[segment_code]
+                segment_ranges.setdefault(segment, []).append((start, end))
+
+            if has_magazin and has_segment:
+                self._pairs[(magazin, segment)] = (start, end)
+
+        self._segments = segment_ranges
+
+    @property
+    def magazins(self):
+        """Магазины набора в порядке сортировки"""
+        return sorted(self._magazins)
+
+    def segments(self, magazin=ALL_MAGAZINS):
+        """Сегменты набора или одного магазина"""
+        if magazin == ALL_MAGAZINS:
+            return sorted(self._segments)
+        return sorted(segment for shop, segment in self._pairs if shop == magazin)
+
+    def _ranges(self, magazins, segments):
+        """Диапазоны отсортированных позиций для списков магазинов и сегментов"""
+        if magazins and segments:
+            ranges = [self._pairs.get((m, s)) for m in magazins for s in segments]
+        elif magazins:
+            ranges = [self._magazins.get(m) for m in magazins]
+        else:
+            ranges = [r for s in segments for r in self._segments.get(s, [])]
+
+        return sorted(r for r in ranges if r)
+
+    def select(self, magazins=None, segments=None):
+        """
+        Позиции строк нескольких магазинов и сегментов в исходном порядке
+
+        Args:
+            magazins (list): Магазины (пусто - все)
+            segments (list): Сегменты (пусто - все)
+
+        Returns:
+            slice или np.ndarray: Срез для непрерывного диапазона, иначе массив позиций
+        """
+        if not magazins and not segments:
+            return slice(0, self.n_rows)
+
+        ranges = self._ranges(magazins, segments)
+
+        if self.contiguous and len(ranges) == 1:
+            return slice(*ranges[0])
+
+        if not ranges:
+            return np.array([], dtype='int64')
+
+        if self.contiguous:
+            return np.concatenate([np.arange(start, end) for start, end in ranges])
+
+        return np.sort(np.concatenate([self._order[start:end] for start, end in ranges]))
+
+    def positions(self, magazin=ALL_MAGAZINS, segment=ALL_SEGMENTS):
+        """Позиции строк выбора из селекторов вкладок ('Все ...' - без отбора)"""
+        return self.select(
+            [] if magazin == ALL_MAGAZINS else [magazin],
+            [] if segment == ALL_SEGMENTS else [segment]
+        )
+
+    def take(self, df, positions):
+        """Строки по позициям: срез без копирования данных или выборка"""
+        if isinstance(positions, slice):
+            if positions == slice(0, self.n_rows):
+                return df
+            subset = df.iloc[positions]
+        else:
+            subset = df.take(positions)
+
+        # Подмножество - другой набор: индекс исходного к нему не применим
+        subset.attrs.pop('dataset_id', None)
+        return subset
+
+    def view(self, df, magazin=ALL_MAGAZINS, segment=ALL_SEGMENTS):
+        """
+        Строки выбора: срез без копирования данных или выборка по позициям
+
+        Returns:
+            pd.DataFrame: Отфильтрованные строки
+        """
+        return self.take(df, self.positions(magazin, segment))
+
+
+def dataset_cached(kind, df, build):
+    """
+    Производная структура набора из кэша процесса или новая
+
+    Кэш ключуется по виду структуры, dataset_id из df.attrs и числу строк,
+    поэтому копии набора между перезапусками Streamlit используют одну
+    структуру. Производные наборы получают новый DatasetId и строят
+    структуру заново. Наборы без DatasetId (подмножества, наборы не из
+    register_sales_dataset) не кэшируются.
+
+    Args:
+        kind (str): Вид структуры ('index', 'cube', ...)
+        df (pd.DataFrame): Набор продаж
+        build (callable): Построение структуры по набору
+
+    Returns:
+        object: Результат build(df)
+    """
+    dataset_id = df.attrs.get('dataset_id')
+    if not isinstance(dataset_id, DatasetId):
+        return build(df)
+
+    key = (kind, dataset_id, len(df))
+
+    with _dataset_lock:
+        value = _dataset_cache.get(key)
+        if value is not None:
+            _dataset_cache.move_to_end(key)
+            return value
+
+    value = build(df)
+
+    with _dataset_lock:
+        _dataset_cache[key] = value
+        while len(_dataset_cache) > _DATASET_CACHE_SIZE:
+            _dataset_cache.popitem(last=False)
+
+    return value
+
+
+def get_sales_index(df):
+    """
+    Индекс набора из кэша процесса или новый
+
+    Returns:
+        SalesIndex: Индекс строк набора
+    """
+    return dataset_cached('index', df, SalesIndex)
+
+
+def filter_sales(df, magazin=ALL_MAGAZINS, segment=ALL_SEGMENTS):
+    """
+    Строки набора для выбранного магазина и сегмента
+
+    Args:
+        df (pd.DataFrame): Набор продаж
+        magazin (str): Магазин или 'Все магазины'
+        segment (str): Сегмент или 'Все сегменты'
+
+    Returns:
+        pd.DataFrame: Отфильтрованные строки (без копирования, если возможно)
+    """
+    return get_sales_index(df).view(df, magazin, segment)
+
+
+def select_sales(df, magazins=None, segments=None):
+    """
+    Строки набора для нескольких магазинов и сегментов (фильтры вкладки данных)
+
+    Returns:
+        pd.DataFrame: Отфильтрованные строки (без копирования, если возможно)
+    """
+    index = get_sales_index(df)
+    return index.take(df, index.select(magazins, segments))
@@ -0,0 +1,104 @@
+"""Локальная колоночная копия таблицы продаж для инкрементальной синхронизации"""
+
+import hashlib
+import json
+import os
+import pandas as pd
+from ..config.settings import LOCAL_STORE_CONFIG
+
+
+def make_store_key(host, database, table):
+    """Ключ локальной копии для пары сервер/таблица"""
+    source = f"{host}|{database}|{table}".lower()
+    digest = hashlib.sha1(source.encode('utf-8')).hexdigest()[:12]
+    safe_table = ''.join(ch if ch.isalnum() else '_' for ch in table)
+    return f"{safe_table}_{digest}"
+
+
+def _store_paths(store_key, store_dir=None):
+    """Пути к файлу данных и метаданных локальной копии"""
+    store_dir = store_dir or LOCAL_STORE_CONFIG['path']
+    base = os.path.join(store_dir, store_key)
+    return f"{base}.parquet", f"{base}.json"
+
+
+def load_local_sales(store_key, store_dir=None):
+    """
+    Читает локальную копию продаж
+
+    Args:
+        store_key (str): Ключ копии (см. make_store_key)
+        store_dir (str): Каталог хранилища
+
+    Returns:
+        tuple: (DataFrame, meta) или (None, None), если копии нет
+    """
+    data_path, meta_path = _store_paths(store_key, store_dir)
+
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return None, None
+
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+
+    return pd.read_parquet(data_path), meta
+
+
+def save_local_sales(df, store_key, store_dir=None):
+    """
+    Атомарно сохраняет локальную копию и водяной знак (максимальную Datasales)
+
+    Returns:
+        dict: Записанные метаданные
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise Exception(
+            "Модуль pyarrow не установлен. Установите: pip install pyarrow"
+        )
+
+    data_path, meta_path = _store_paths(store_key, store_dir)
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+
+    watermark = df['Datasales'].max() if len(df) > 0 else None
+
+    meta = {
+        'watermark': watermark.isoformat() if watermark is not None else None,
+        'rows': int(len(df)),
+        'synced_at': pd.Timestamp.now().isoformat()
+    }
+
+    df.to_parquet(f"{data_path}.tmp", index=False)
+    os.replace(f"{data_path}.tmp", data_path)
+
+    with open(f"{meta_path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(f"{meta_path}.tmp", meta_path)
+
+    return meta
+
+
+def merge_incremental(local_df, fresh_df, since):
+    """
+    Объединяет локальную копию со свежей выгрузкой
+
+    Все локальные строки начиная с since заменяются строками выгрузки,
+    так что поздние корректировки и удаления в окне перекрытия
+    отражаются в копии.
+
+    Args:
+        local_df (pd.DataFrame): Локальная копия
+        fresh_df (pd.DataFrame): Строки из БД с Datasales >= since
+        since (datetime): Начало окна перекрытия
+
+    Returns:
+        pd.DataFrame: Объединенные данные, отсортированные по Datasales
+    """
+    kept = local_df[local_df['Datasales'] < pd.Timestamp(since)]
+
+    if len(fresh_df) == 0:
+        return kept.reset_index(drop=True)
+
+    merged = pd.concat([kept, fresh_df[kept.columns]], ignore_index=True)
+    return merged.sort_values('Datasales', kind='stable').reset_index(drop=True)
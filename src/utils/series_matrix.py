@@ -0,0 +1,230 @@
+"""Плотные матрицы дневных рядов (ряды × все дни набора) по уровням ключа"""
+
+import json
+import os
+import numpy as np
+import pandas as pd
+from ..config.settings import SERIES_MATRIX_CONFIG
+from .sales_cube import get_sales_cube
+from .sales_index import dataset_cached
+
+
+class SeriesMatrix:
+    """
+    Ряды одного уровня ключа одной непрерывной матрицей
+
+    Строка - ряд (сочетание значений измерений уровня), столбец - день
+    календаря набора от первого до последнего дня продаж; дни без продаж -
+    нули. Все уровни одного набора выровнены по одному календарю, поэтому
+    столбец j - один и тот же день в матрицах магазинов, сегментов и моделей.
+    Базовые модели и иерархический прогноз читают матрицу уровня целиком,
+    а предобработка (preprocess_matrix) и прогноз ряда - ее строки без
+    повторной группировки набора.
+
+    Args:
+        keys (pd.DataFrame): Значения измерений уровня, по строке на ряд
+        dates (pd.DatetimeIndex): Дни столбцов
+        values (np.ndarray): Матрица рядов × дней (C-порядок)
+        measure (str): Мера в ячейках
+    """
+
+    def __init__(self, keys, dates, values, measure='Qty'):
+        self.keys = keys.reset_index(drop=True)
+        self.dates = pd.DatetimeIndex(dates)
+        self.values = values
+        self.measure = measure
+        self.levels = list(keys.columns)
+        self._positions = None
+
+    @classmethod
+    def from_cube(cls, cube, levels, measure=None, dtype=None):
+        """
+        Матрица уровня по ячейкам куба продаж
+
+        Ячейки с пропуском в измерениях уровня или в дате отбрасываются,
+        как в SalesCube.rollup.
+
+        Args:
+            cube (SalesCube): Дневной куб набора
+            levels (list): Измерения ключа ряда, например ['Magazin', 'Model']
+            measure (str): Мера куба (по умолчанию из SERIES_MATRIX_CONFIG)
+            dtype (str): Тип значений (по умолчанию из SERIES_MATRIX_CONFIG)
+
+        Returns:
+            SeriesMatrix: Матрица рядов уровня
+        """
+        levels = list(levels)
+        measure = measure or SERIES_MATRIX_CONFIG['measure']
+        dtype = dtype or SERIES_MATRIX_CONFIG['dtype']
+
+        missing = [d for d in levels + ['Datasales'] if d not in cube.codes]
+        if missing or measure not in cube.values:
+            raise ValueError(f"В наборе нет колонок: {missing or [measure]}")
+
+        n_days = cube.calendar.n_days
+        days = cube.codes['Datasales']
+        present = days < n_days
+        key = np.zeros(cube.n_cells, dtype='int64')
+        sizes = []
+
+        for level in levels:
+            codes = cube.codes[level].astype('int64')
+            n_labels = len(cube.labels[level])
+            present &= codes < n_labels
+            key = key * max(n_labels, 1) + np.minimum(codes, max(n_labels - 1, 0))
+            sizes.append(max(n_labels, 1))
+
+        series_keys, series = np.unique(key[present], return_inverse=True)
+        flat = series * n_days + days[present]
+        totals = np.bincount(flat, weights=cube.values[measure][present], minlength=len(series_keys) * n_days)
+        values = np.ascontiguousarray(totals.reshape(len(series_keys), n_days), dtype=dtype)
+
+        keys = {}
+        for level, size in zip(reversed(levels), reversed(sizes)):
+            series_keys, codes = np.divmod(series_keys, size)
+            keys[level] = cube.labels[level].take(codes).to_numpy()
+
+        return cls(pd.DataFrame({level: keys[level] for level in levels}),
+                   cube.calendar.dates(np.arange(n_days)), values, measure)
+
+    def __len__(self):
+        return len(self.values)
+
+    def position(self, *key):
+        """
+        Номер строки ряда
+
+        Args:
+            *key: Значения измерений в порядке levels
+
+        Returns:
+            int: Номер строки или None, если ряда нет
+        """
+        if self._positions is None:
+            self._positions = {tuple(row): i for i, row in enumerate(self.keys.itertuples(index=False))}
+        return self._positions.get(tuple(key))
+
+    def select(self, **levels):
+        """
+        Номера строк рядов, подходящих под отбор
+
+        Args:
+            **levels: Значения измерений; пропущенное измерение - любое
+
+        Returns:
+            np.ndarray: Номера строк
+        """
+        mask = np.ones(len(self.keys), dtype=bool)
+        for level, value in levels.items():
+            if level not in self.levels:
+                raise ValueError(f"Неизвестный уровень ключа: {level}")
+            mask &= (self.keys[level] == value).to_numpy()
+        return np.flatnonzero(mask)
+
+    def frame(self, *key):
+        """
+        Ряд в схеме Prophet (ds, y) за все дни календаря
+
+        Returns:
+            pd.DataFrame: ds, y (float64) или None, если ряда нет
+        """
+        row = self.position(*key)
+        if row is None:
+            return None
+        return pd.DataFrame({'ds': self.dates, 'y': self.values[row].astype('float64')})
+
+    def save(self, path):
+        """
+        Сохраняет матрицу в каталог: values.npy, keys.parquet, meta.json
+
+        Args:
+            path (str): Каталог матрицы
+        """
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise Exception(
+                "Модуль pyarrow не установлен. Установите: pip install pyarrow"
+            )
+
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'values.npy'), np.ascontiguousarray(self.values))
+        self.keys.to_parquet(os.path.join(path, 'keys.parquet'), index=False)
+        meta = {
+            'measure': self.measure,
+            'first_day': str(self.dates[0].date()) if len(self.dates) else None,
+            'n_days': len(self.dates)
+        }
+        with open(os.path.join(path, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path, mmap=None):
+        """
+        Читает матрицу, сохраненную save
+
+        Args:
+            path (str): Каталог матрицы
+            mmap (bool): Отобразить значения в память только для чтения
+                         вместо чтения целиком (по умолчанию из SERIES_MATRIX_CONFIG)
+
+        Returns:
+            SeriesMatrix: Матрица рядов уровня
+        """
+        mmap = SERIES_MATRIX_CONFIG['mmap'] if mmap is None else mmap
+
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+
+        values = np.load(os.path.join(path, 'values.npy'), mmap_mode='r' if mmap else None)
+        keys = pd.read_parquet(os.path.join(path, 'keys.parquet'))
+        days = np.arange(meta['n_days'], dtype='int64')
+        dates = (np.datetime64(meta['first_day'] or '1970-01-01', 'D') + days).astype('datetime64[ns]')
+        return cls(keys, dates, values, meta['measure'])
+
+
+def build_series_matrices(df, levels=None, measure=None, dtype=None, path=None):
+    """
+    Матрицы рядов всех уровней ключа по одному кубу набора
+
+    Строки набора сворачиваются в куб один раз, матрицы уровней
+    строятся по его ячейкам.
+
+    Args:
+        df (pd.DataFrame): Набор продаж
+        levels (dict): Имя уровня -> измерения (по умолчанию из SERIES_MATRIX_CONFIG)
+        measure (str): Мера в ячейках
+        dtype (str): Тип значений
+        path (str): Каталог для сохранения матриц (<path>/<имя уровня>) или None
+
+    Returns:
+        dict: Имя уровня -> SeriesMatrix
+    """
+    levels = levels or SERIES_MATRIX_CONFIG['levels']
+    cube = get_sales_cube(df)
+
+    matrices = {name: SeriesMatrix.from_cube(cube, dimensions, measure, dtype)
+                for name, dimensions in levels.items()}
+
+    if path:
+        for name, matrix in matrices.items():
+            matrix.save(os.path.join(path, name))
+
+    return matrices
+
+
+def get_series_matrix(df, levels, measure=None):
+    """
+    Матрица рядов уровня из кэша процесса или новая
+
+    Args:
+        df (pd.DataFrame): Набор продаж
+        levels (list): Измерения ключа ряда
+
+    Returns:
+        SeriesMatrix: Матрица рядов уровня
+    """
+    levels = list(levels)
+    measure = measure or SERIES_MATRIX_CONFIG['measure']
+    kind = f"series_matrix:{measure}:{','.join(levels)}"
+    return dataset_cached(kind, df, lambda data: SeriesMatrix.from_cube(get_sales_cube(data), levels, measure))
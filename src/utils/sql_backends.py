@@ -0,0 +1,176 @@
+"""Движки источника продаж: SQL Server и локальные SQLite / DuckDB поверх Parquet"""
+
+import re
+import sqlite3
+from datetime import datetime
+from functools import partial
+
+# Движок: (название, модуль драйвера)
+BACKENDS = {
+    'sqlserver': ('SQL Server', 'pymssql'),
+    'sqlite': ('SQLite', 'sqlite3'),
+    'duckdb': ('DuckDB (Parquet)', 'duckdb')
+}
+
+
+class SqlServerDialect:
+    """Диалект SQL Server: запросы выполняются в исходном виде"""
+
+    name = 'sqlserver'
+
+    def table(self, table):
+        """Ссылка на таблицу продаж"""
+        return f"[dbo].[{table}]"
+
+    def history_start(self, history_months):
+        """Начало окна истории относительно текущей даты"""
+        return f"DATEADD(MONTH, -{int(history_months)}, GETDATE())"
+
+    def day(self, expr):
+        """Усечение даты-времени до дня"""
+        return f"CAST({expr} AS date)"
+
+    def page_query(self, select_list, source, where, where_params, page_size):
+        """
+        Страница keyset-пагинации: все строки до page_size-й даты включительно
+
+        Returns:
+            tuple: (query, params)
+        """
+        query = f"""
+            SELECT TOP (%s) WITH TIES
+                {select_list}
+            FROM {source}
+            WHERE {where}
+            ORDER BY Datasales
+        """
+        return query, (int(page_size),) + where_params
+
+    def render(self, query):
+        """Приведение текста запроса к синтаксису движка"""
+        return query
+
+    def bind(self, params):
+        """Приведение параметров запроса к типам драйвера"""
+        return params
+
+
+class SQLiteDialect(SqlServerDialect):
+    """Диалект SQLite: параметры ?, функции дат SQLite, WITH TIES через подзапрос"""
+
+    name = 'sqlite'
+
+    def table(self, table):
+        return f'"{table}"'
+
+    def history_start(self, history_months):
+        return f"datetime('now', '-{int(history_months)} months')"
+
+    def day(self, expr):
+        return f"date({expr})"
+
+    def page_query(self, select_list, source, where, where_params, page_size):
+        # Эквивалент TOP ... WITH TIES: граница страницы - page_size-я дата
+        query = f"""
+            SELECT
+                {select_list}
+            FROM {source}
+            WHERE {where} AND Datasales <= (
+                SELECT MAX(Datasales) FROM (
+                    SELECT Datasales FROM {source}
+                    WHERE {where}
+                    ORDER BY Datasales
+                    LIMIT %s
+                )
+            )
+            ORDER BY Datasales
+        """
+        return query, where_params + where_params + (int(page_size),)
+
+    def render(self, query):
+        query = re.sub(r'\[(\w+)\]', r'"\1"', query)
+        return query.replace('%s', '?')
+
+    def bind(self, params):
+        # Даты SQLite хранит текстом ISO: передаем строки, а не полагаемся
+        # на адаптеры sqlite3, общие для всего процесса
+        return tuple(value.isoformat(' ') if isinstance(value, datetime) else value for value in params)
+
+
+class DuckDBDialect(SQLiteDialect):
+    """Диалект DuckDB: как SQLite, но с собственными функциями дат"""
+
+    name = 'duckdb'
+
+    def history_start(self, history_months):
+        return f"(now()::TIMESTAMP - INTERVAL {int(history_months)} MONTH)"
+
+    def day(self, expr):
+        return f"CAST({expr} AS DATE)"
+
+    def bind(self, params):
+        # DuckDB принимает datetime параметрами напрямую
+        return params
+
+
+DIALECTS = {
+    'sqlserver': SqlServerDialect(),
+    'sqlite': SQLiteDialect(),
+    'duckdb': DuckDBDialect()
+}
+
+
+def get_dialect(backend):
+    """Диалект движка (по умолчанию SQL Server)"""
+    return DIALECTS[backend or 'sqlserver']
+
+
+def _connect_sqlite(path):
+    """
+    Соединение SQLite с доступом из потоков пула
+
+    Даты возвращаются текстом ISO и разбираются при сборке колонок
+    (pd.to_datetime), параметры-даты передаются строками (SQLiteDialect.bind).
+    """
+    return sqlite3.connect(path, check_same_thread=False)
+
+
+def _connect_duckdb(path, table):
+    """Соединение DuckDB в памяти с представлением таблицы над Parquet"""
+    import duckdb
+
+    conn = duckdb.connect(':memory:')
+    escaped = str(path).replace("'", "''")
+    conn.execute(f'CREATE VIEW "{table}" AS SELECT * FROM read_parquet(\'{escaped}\')')
+    return conn
+
+
+def local_connect_factory(backend, path, table):
+    """
+    Фабрика соединений локального движка для пула
+
+    Args:
+        backend (str): 'sqlite' или 'duckdb'
+        path (str): Файл SQLite или Parquet
+        table (str): Имя таблицы продаж
+
+    Returns:
+        callable: Фабрика соединений без аргументов
+
+    Raises:
+        ImportError: Если драйвер движка не установлен
+    """
+    if backend == 'sqlite':
+        return partial(_connect_sqlite, path)
+
+    if backend == 'duckdb':
+        import duckdb  # noqa: F401
+        return partial(_connect_duckdb, path, table)
+
+    raise ValueError(f"Неизвестный локальный движок: {backend}")
+
+
+def import_error_message(backend):
+    """Сообщение об отсутствующем драйвере движка"""
+    module = BACKENDS[backend or 'sqlserver'][1]
+    return f"Модуль {module} не установлен. Установите: pip install {module}"
@@ -4,6 +4,8 @@ import plotly.graph_objects as go
 import plotly.express as px
 import pandas as pd
 import numpy as np
+from ..config.settings import WEEKDAY_LABELS, WEEKDAY_SHORT_LABELS
+from ..utils.sales_cube import sales_cube
 
 
 def plot_data_preprocessing(original, processed, title):
@@ -105,29 +107,18 @@ def plot_prophet_components(model, forecast):
 
 
 def plot_sales_by_weekday(df, title="📅 Продажи по дням недели"):
-    """Визуализирует продажи по дням недели"""
-    # Добавляем день недели
-    df_copy = df.copy()
-    df_copy['weekday'] = pd.to_datetime(df_copy['Datasales']).dt.day_name()
+    """Визуализирует продажи по дням недели (df - набор продаж или SalesCube)"""
+    # Свертка куба по кодам дней недели (0 - понедельник)
+    weekday_stats = sales_cube(df).rollup(['weekday']).set_index('weekday').reindex(range(7))
 
-    # Порядок дней недели
-    weekday_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    weekday_ru = ['Понедельник', 'Вторник', 'Среда', 'Четверг', 'Пятница', 'Суббота', 'Воскресенье']
-
-    # Агрегация по дням недели
-    weekday_stats = df_copy.groupby('weekday').agg({
-        'Qty': 'sum',
-        'Sum': 'sum'
-    }).reindex(weekday_order)
-
-    # Замена на русские названия
-    weekday_stats.index = weekday_ru
+    # Русские названия только для подписей
+    weekday_stats.index = WEEKDAY_LABELS
 
     fig = go.Figure()
 
     # Столбцы - количество
     fig.add_trace(go.Bar(
-        x=weekday_ru,
+        x=WEEKDAY_LABELS,
         y=weekday_stats['Qty'],
         name='Количество',
         marker_color='#667eea',
@@ -136,7 +127,7 @@ def plot_sales_by_weekday(df, title="📅 Продажи по дням неде
 
     # Линия - выручка
     fig.add_trace(go.Scatter(
-        x=weekday_ru,
+        x=WEEKDAY_LABELS,
         y=weekday_stats['Sum'],
         name='Выручка',
         line=dict(color='#ff7f0e', width=3),
@@ -159,7 +150,7 @@ def plot_sales_by_weekday(df, title="📅 Продажи по дням неде
 def plot_top_products(df, top_n=10, title="🏆 ТОП товаров по выручке"):
     """Визуализирует топ товаров по выручке"""
     # Агрегация по товарам
-    product_stats = df.groupby('Art').agg({
+    product_stats = df.groupby('Art', observed=True).agg({
         'Describe': 'first',
         'Sum': 'sum',
         'Qty': 'sum'
@@ -197,17 +188,11 @@ def plot_top_products(df, top_n=10, title="🏆 ТОП товаров по вы
 
 
 def plot_monthly_revenue_trend(df, title="📈 Динамика выручки по месяцам"):
-    """Визуализирует динамику выручки по месяцам с трендом"""
-    df_copy = df.copy()
-    df_copy['month'] = pd.to_datetime(df_copy['Datasales']).dt.to_period('M')
-
-    # Агрегация по месяцам
-    monthly_stats = df_copy.groupby('month').agg({
-        'Sum': 'sum',
-        'Qty': 'sum'
-    }).reset_index()
+    """Визуализирует динамику выручки по месяцам с трендом (df - набор продаж или SalesCube)"""
+    # Свертка куба по месяцам
+    monthly_stats = sales_cube(df).rollup(['month'])
 
-    monthly_stats['month_str'] = monthly_stats['month'].astype(str)
+    monthly_stats['month_str'] = monthly_stats['month'].dt.strftime('%Y-%m')
 
     fig = go.Figure()
 
@@ -245,25 +230,19 @@ def plot_monthly_revenue_trend(df, title="📈 Динамика выручки 
 
 
 def plot_sales_heatmap(df, title="🔥 Тепловая карта продаж"):
-    """Визуализирует heatmap продаж по дням недели и месяцам"""
-    df_copy = df.copy()
-    df_copy['weekday'] = pd.to_datetime(df_copy['Datasales']).dt.day_name()
-    df_copy['month'] = pd.to_datetime(df_copy['Datasales']).dt.to_period('M').astype(str)
-
-    # Порядок дней недели
-    weekday_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    weekday_ru = ['Пн', 'Вт', 'Ср', 'Чт', 'Пт', 'Сб', 'Вс']
-
-    # Создаем pivot таблицу
-    heatmap_data = df_copy.pivot_table(
-        values='Sum',
+    """Визуализирует heatmap продаж по дням недели и месяцам (df - набор продаж или SalesCube)"""
+    # Свертка куба по кодам дней недели и месяцев
+    weekday_month = sales_cube(df).rollup(['weekday', 'month'])
+
+    heatmap_data = weekday_month.pivot(
         index='weekday',
         columns='month',
-        aggfunc='sum',
-        fill_value=0
-    ).reindex(weekday_order)
+        values='Sum'
+    ).fillna(0).reindex(range(7))
 
-    heatmap_data.index = weekday_ru
+    # Подписи месяцев и дней недели
+    heatmap_data.columns = heatmap_data.columns.strftime('%Y-%m')
+    heatmap_data.index = WEEKDAY_SHORT_LABELS
 
     fig = go.Figure(data=go.Heatmap(
         z=heatmap_data.values,
@@ -285,23 +264,13 @@ def plot_sales_heatmap(df, title="🔥 Тепловая карта продаж"
 
 
 def plot_daily_sales_distribution(df, title="📊 Распределение продаж по дням недели"):
-    """Визуализирует box plot распределения продаж по дням недели"""
-    df_copy = df.copy()
-    df_copy['weekday'] = pd.to_datetime(df_copy['Datasales']).dt.day_name()
-    df_copy['date'] = pd.to_datetime(df_copy['Datasales']).dt.date
-
-    # Группируем по дате и дню недели
-    daily_sales = df_copy.groupby(['date', 'weekday']).agg({
-        'Sum': 'sum'
-    }).reset_index()
-
-    # Порядок дней недели
-    weekday_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    weekday_ru = ['Понедельник', 'Вторник', 'Среда', 'Четверг', 'Пятница', 'Суббота', 'Воскресенье']
+    """Визуализирует box plot распределения продаж по дням недели (df - набор продаж или SalesCube)"""
+    # Дневные суммы из куба по индексу дня
+    daily_sales = sales_cube(df).rollup(['day', 'weekday'])
 
     fig = go.Figure()
 
-    for weekday, weekday_name in zip(weekday_order, weekday_ru):
+    for weekday, weekday_name in enumerate(WEEKDAY_LABELS):
         weekday_data = daily_sales[daily_sales['weekday'] == weekday]['Sum']
 
         fig.add_trace(go.Box(
@@ -322,23 +291,28 @@ def plot_daily_sales_distribution(df, title="📊 Распределение п
 
 
 def plot_sales_trend_comparison(df, title="📊 Сравнение периодов продаж"):
-    """Сравнивает продажи текущего и предыдущего периода"""
-    df_copy = df.copy()
-    df_copy['date'] = pd.to_datetime(df_copy['Datasales'])
+    """Сравнивает продажи текущего и предыдущего периода (df - набор продаж или SalesCube)"""
+    cube = sales_cube(df)
+
+    # Дневная выручка по индексу дня
+    daily = cube.rollup(['day'])
+    days = daily['day'].to_numpy()
 
     # Разделяем на два периода
-    max_date = df_copy['date'].max()
-    mid_date = max_date - pd.Timedelta(days=len(df_copy['date'].unique()) // 2)
+    mid_day = days.max() - len(days) // 2
 
-    period1 = df_copy[df_copy['date'] < mid_date].copy()
-    period2 = df_copy[df_copy['date'] >= mid_date].copy()
+    period1 = daily[days < mid_day]
+    period2 = daily[days >= mid_day]
 
     # Агрегация по дням от начала периода
-    period1['day_num'] = (period1['date'] - period1['date'].min()).dt.days
-    period2['day_num'] = (period2['date'] - period2['date'].min()).dt.days
+    period1_agg = period1.set_index(period1['day'] - period1['day'].min())['Sum']
+    period2_agg = period2.set_index(period2['day'] - period2['day'].min())['Sum']
 
-    period1_agg = period1.groupby('day_num')['Sum'].sum()
-    period2_agg = period2.groupby('day_num')['Sum'].sum()
+    def period_name(number, period):
+        first, last = pd.DatetimeIndex(
+            cube.calendar.dates([period['day'].min(), period['day'].max()])
+        ).strftime('%Y-%m-%d')
+        return f"Период {number} ({first} - {last})"
 
     fig = go.Figure()
 
@@ -346,7 +320,7 @@ def plot_sales_trend_comparison(df, title="📊 Сравнение период
         x=period1_agg.index,
         y=period1_agg.values,
         mode='lines',
-        name=f'Период 1 ({period1["date"].min().strftime("%Y-%m-%d")} - {period1["date"].max().strftime("%Y-%m-%d")})',
+        name=period_name(1, period1),
         line=dict(color='#667eea', width=2)
     ))
 
@@ -354,7 +328,7 @@ def plot_sales_trend_comparison(df, title="📊 Сравнение период
         x=period2_agg.index,
         y=period2_agg.values,
         mode='lines',
-        name=f'Период 2 ({period2["date"].min().strftime("%Y-%m-%d")} - {period2["date"].max().strftime("%Y-%m-%d")})',
+        name=period_name(2, period2),
         line=dict(color='#ff7f0e', width=2)
     ))
 
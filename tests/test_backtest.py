@@ -0,0 +1,125 @@
+"""Unit-тесты для бэктестинга"""
+
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from src.config.settings import MODEL_CACHE_CONFIG
+from src.models import prophet_model
+from src.models.backtest import BACKTEST_METRICS, backtest, make_folds, score_predictions
+from src.utils.data_processing import smooth_data
+
+
+class TestMakeFolds(unittest.TestCase):
+    """Тесты построения фолдов"""
+
+    def setUp(self):
+        self.ds = pd.Series(pd.date_range('2024-01-01', periods=120))
+
+    def test_folds_end_at_last_day(self):
+        """Тест фолдов от конца ряда с шагом"""
+        folds = make_folds(self.ds, horizon=14, step=7, folds=3, min_train_days=30)
+
+        self.assertEqual(list(folds['fold']), [0, 1, 2])
+        self.assertEqual(folds['test_end'].iloc[-1], self.ds.iloc[-1])
+        self.assertTrue((folds['cutoff'].diff().dropna() == pd.Timedelta(days=7)).all())
+        self.assertTrue((folds['train_start'] == self.ds.iloc[0]).all())
+
+    def test_adding_fold_keeps_cutoffs(self):
+        """Тест: новый фолд добавляется раньше, прежние не меняются"""
+        three = make_folds(self.ds, horizon=14, step=7, folds=3, min_train_days=30)
+        four = make_folds(self.ds, horizon=14, step=7, folds=4, min_train_days=30)
+
+        self.assertEqual(list(four['cutoff'].iloc[1:]), list(three['cutoff']))
+
+    def test_rolling_window_and_min_train(self):
+        """Тест скользящего окна и пропуска коротких фолдов"""
+        rolling = make_folds(self.ds, horizon=14, step=7, folds=3, window=30, min_train_days=30)
+        short = make_folds(self.ds, horizon=14, step=7, folds=20, min_train_days=60)
+
+        self.assertTrue(((rolling['cutoff'] - rolling['train_start']).dt.days == 29).all())
+        self.assertTrue(((short['cutoff'] - short['train_start']).dt.days >= 59).all())
+
+
+class TestScorePredictions(unittest.TestCase):
+    """Тесты векторной оценки фолдов"""
+
+    def test_metrics(self):
+        """Тест MAE, RMSE, WAPE и MASE по фолдам"""
+        predictions = pd.DataFrame({
+            'fold': [0, 0, 1, 1],
+            'y': [10.0, 20.0, 5.0, 5.0],
+            'yhat': [12.0, 16.0, 5.0, 5.0]
+        })
+        scores = score_predictions(predictions, pd.Series({0: 2.0, 1: 1.0})).set_index('fold')
+
+        self.assertAlmostEqual(scores.loc[0, 'MAE'], 3.0)
+        self.assertAlmostEqual(scores.loc[0, 'RMSE'], np.sqrt(10.0))
+        self.assertAlmostEqual(scores.loc[0, 'WAPE'], 20.0)
+        self.assertAlmostEqual(scores.loc[0, 'MASE'], 1.5)
+        self.assertEqual(scores.loc[1, 'MAE'], 0.0)
+
+
+class TestBacktest(unittest.TestCase):
+    """Тесты бэктеста Prophet"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.config = patch.dict(MODEL_CACHE_CONFIG, {'path': self.cache_dir})
+        self.config.start()
+        prophet_model._model_cache.clear()
+
+        rng = np.random.default_rng(0)
+        dates = pd.date_range('2024-01-01', periods=100)
+        self.data = pd.DataFrame({
+            'ds': dates,
+            'y': 50 + 10 * np.sin(2 * np.pi * np.arange(100) / 7) + rng.normal(0, 2, 100)
+        })
+
+    def tearDown(self):
+        self.config.stop()
+        prophet_model._model_cache.clear()
+        shutil.rmtree(self.cache_dir)
+
+    def test_added_fold_reuses_cached_folds(self):
+        """Тест: добавление фолда обучает только новый фолд"""
+        with patch('src.models.prophet_model.fit_prophet_forecast',
+                   side_effect=prophet_model.fit_prophet_forecast) as fit:
+            scores, predictions = backtest(self.data, horizon=7, step=7, folds=2, workers=1)
+            more_scores, _ = backtest(self.data, horizon=7, step=7, folds=3, workers=1)
+
+        self.assertEqual(fit.call_count, 3)
+        self.assertEqual(list(scores.columns),
+                         ['fold', 'train_start', 'cutoff', 'test_end'] + BACKTEST_METRICS + ['error'])
+        self.assertEqual(len(predictions), 14)
+        self.assertTrue(scores['error'].isna().all())
+        pd.testing.assert_frame_equal(more_scores.iloc[1:].reset_index(drop=True)[BACKTEST_METRICS],
+                                      scores[BACKTEST_METRICS])
+        self.assertTrue(np.isfinite(scores[BACKTEST_METRICS].to_numpy()).all())
+
+    def test_preprocessing_uses_train_days_only(self):
+        """Тест: сглаживание только по обучающим дням фолда, оценка по исходным продажам"""
+        preprocessing = {'remove_outliers': False, 'smooth_method': 'ma', 'smooth_window': 7}
+        trains = []
+
+        def fake_forecast(train, periods, *args, **kwargs):
+            trains.append(train)
+            future = pd.date_range(train['ds'].max() + pd.Timedelta(days=1), periods=periods)
+            return None, pd.DataFrame({'ds': future, 'yhat': 0.0})
+
+        with patch('src.models.backtest.forecast_series', side_effect=fake_forecast):
+            _, predictions = backtest(self.data, horizon=7, step=7, folds=1, workers=1,
+                                      preprocessing=preprocessing)
+
+        raw_train = self.data['y'].iloc[:93].reset_index(drop=True)
+        full_history = smooth_data(self.data['y'], 'ma', 7).iloc[:93].reset_index(drop=True)
+
+        np.testing.assert_allclose(trains[0]['y'], smooth_data(raw_train, 'ma', 7).clip(lower=0))
+        self.assertNotAlmostEqual(trains[0]['y'].iloc[-1], full_history.iloc[-1])
+        np.testing.assert_array_equal(predictions['y'], self.data['y'].iloc[93:])
+
+
+if __name__ == '__main__':
+    unittest.main()
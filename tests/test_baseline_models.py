@@ -0,0 +1,127 @@
+"""Unit-тесты для векторных базовых моделей"""
+
+import unittest
+import numpy as np
+import pandas as pd
+from src.models.baseline_models import (
+    BASELINE_METHODS, FORECAST_COLUMNS, forecast_matrix, series_matrix, train_baseline_model
+)
+from src.models.batch_forecast import batch_forecast
+from src.utils.data_processing import preprocess_matrix
+from tests.test_batch_forecast import make_sales
+
+
+class TestForecastMatrix(unittest.TestCase):
+    """Тесты прогноза матрицы рядов"""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        days = np.arange(140)
+        weekly = np.array([10, 12, 14, 16, 20, 30, 25], dtype=float)
+        self.regular = weekly[days % 7] + 0.05 * days
+        self.intermittent = np.where(rng.random(140) < 0.25, 4.0, 0.0)
+        self.values = np.vstack([self.regular, self.intermittent])
+
+    def test_seasonal_naive_repeats_last_week(self):
+        """Тест сезонного наивного прогноза"""
+        result = forecast_matrix(self.values, 14, 'seasonal_naive')
+
+        np.testing.assert_array_equal(result['yhat'][0, :7], self.regular[-7:])
+        np.testing.assert_array_equal(result['yhat'][0, 7:], self.regular[-7:])
+
+    def test_holt_winters_follows_season(self):
+        """Тест Холта-Винтерса на ряду с трендом и недельной сезонностью"""
+        days = np.arange(140, 154)
+        expected = np.array([10, 12, 14, 16, 20, 30, 25], dtype=float)[days % 7] + 0.05 * days
+        result = forecast_matrix(self.values, 14, 'holt_winters')
+
+        self.assertLess(np.abs(result['yhat'][0] - expected).mean(), 1.0)
+
+    def test_intermittent_demand_rate(self):
+        """Тест Кростона и TSB на прерывистом спросе"""
+        rate = self.intermittent.mean()
+
+        for method in ['croston', 'tsb']:
+            result = forecast_matrix(self.values, 7, method)
+            self.assertAlmostEqual(result['yhat'][1, 0], rate, delta=0.5 * rate)
+            self.assertTrue(np.allclose(result['yhat'][1], result['yhat'][1, 0]))
+
+    def test_intervals(self):
+        """Тест интервалов всех методов"""
+        for method in BASELINE_METHODS:
+            result = forecast_matrix(self.values, 10, method)
+
+            self.assertEqual(result['yhat'].shape, (2, 10))
+            self.assertTrue((result['yhat_lower'] <= result['yhat']).all())
+            self.assertTrue((result['yhat'] <= result['yhat_upper']).all())
+            self.assertTrue((result['yhat_lower'] >= 0).all())
+
+    def test_history_shorter_than_season(self):
+        """Тест: на истории короче сезона сезонные методы дают среднее истории"""
+        values = self.values[:, :5]
+
+        for method in BASELINE_METHODS:
+            result = forecast_matrix(values, 10, method)
+
+            self.assertEqual(result['yhat'].shape, (2, 10))
+            self.assertTrue(np.isfinite(result['yhat']).all())
+            self.assertTrue((result['yhat_lower'] <= result['yhat_upper']).all())
+
+        for method in ['seasonal_naive', 'moving_average', 'holt_winters']:
+            result = forecast_matrix(values, 10, method)
+            np.testing.assert_allclose(result['yhat'][0], self.regular[:5].mean())
+
+        with self.assertRaises(ValueError):
+            forecast_matrix(self.values[:, :0], 10, 'holt_winters')
+
+    def test_unknown_method(self):
+        """Тест неизвестного метода"""
+        with self.assertRaises(ValueError):
+            forecast_matrix(self.values, 7, 'arima')
+
+
+class TestBaselineFrames(unittest.TestCase):
+    """Тесты таблиц прогноза в схеме Prophet"""
+
+    def test_series_matrix(self):
+        """Тест плотной матрицы рядов с нулями в днях без продаж"""
+        keys, dates, values = series_matrix(make_sales(), ['Magazin', 'Segment'])
+
+        self.assertEqual(list(keys.columns), ['Magazin', 'Segment'])
+        self.assertEqual(values.shape, (7, 60))
+        self.assertEqual(len(dates), 60)
+        shop4 = keys.index[keys['Magazin'] == 'Shop4'][0]
+        self.assertEqual(values[shop4].sum(), 3)
+
+    def test_train_baseline_model_schema(self):
+        """Тест схемы прогноза одного ряда как у train_prophet_model"""
+        data = pd.DataFrame({'ds': pd.date_range('2024-01-01', periods=30), 'y': 5.0})
+        forecast = train_baseline_model(data, periods=7, method='moving_average')
+
+        self.assertEqual(list(forecast.columns), FORECAST_COLUMNS)
+        self.assertEqual(len(forecast), 37)
+        np.testing.assert_allclose(forecast['yhat'].tail(7), 5.0)
+
+    def test_batch_forecast_with_baseline(self):
+        """Тест пакетного прогноза базовой моделью"""
+        forecast, failures = batch_forecast(make_sales(), ['Magazin', 'Segment'],
+                                            periods=7, method='tsb')
+
+        self.assertEqual(list(forecast.columns), ['Magazin', 'Segment'] + FORECAST_COLUMNS)
+        self.assertEqual(len(forecast), 7 * 7)
+        self.assertEqual(len(failures), 0)
+
+    def test_batch_baseline_preprocessing(self):
+        """Тест предобработки матрицы рядов в пакетном прогнозе базовой моделью"""
+        df = make_sales()
+        _, _, values = series_matrix(df, ['Magazin', 'Segment'])
+        expected = forecast_matrix(preprocess_matrix(values, True, 'savgol', 7), 7, 'moving_average')
+
+        forecast, _ = batch_forecast(df, ['Magazin', 'Segment'], periods=7, method='moving_average',
+                                     remove_outliers=True, smooth_method='savgol', smooth_window=7)
+
+        np.testing.assert_allclose(forecast['yhat'].to_numpy(), expected['yhat'].ravel())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+"""Unit-тесты для пакетного прогнозирования"""
+
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from src.config.settings import MODEL_CACHE_CONFIG
+from src.models import prophet_model
+from src.models.batch_forecast import FORECAST_COLUMNS, batch_forecast, iter_series
+from src.models.prophet_model import fit_prophet_forecast
+from src.ui.tabs.forecast_tab import _store_key
+from src.utils.forecast_store import series_id
+
+
+def make_sales(days=60, seed=0):
+    """Дневные продажи трех магазинов по двум сегментам и короткий ряд"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2024-01-01', periods=days)
+    frames = []
+
+    for shop in ['Shop1', 'Shop2', 'Shop3']:
+        for segment in ['Men', 'Women']:
+            frames.append(pd.DataFrame({
+                'Datasales': dates,
+                'Magazin': shop,
+                'Segment': segment,
+                'Model': 'M1',
+                'Qty': rng.poisson(20, days),
+                'Sum': 100.0
+            }))
+
+    # Ряд с продажами только в 3 дня
+    frames.append(pd.DataFrame({
+        'Datasales': dates[:3], 'Magazin': 'Shop4', 'Segment': 'Men',
+        'Model': 'M1', 'Qty': 1, 'Sum': 100.0
+    }))
+    return pd.concat(frames, ignore_index=True)
+
+
+class TestBatchForecast(unittest.TestCase):
+    """Тесты пакетного прогнозирования"""
+
+    def setUp(self):
+        self.df = make_sales()
+        self.cache_dir = tempfile.mkdtemp()
+        self.config = patch.dict(MODEL_CACHE_CONFIG, {'path': self.cache_dir})
+        self.config.start()
+        prophet_model._model_cache.clear()
+
+    def tearDown(self):
+        self.config.stop()
+        prophet_model._model_cache.clear()
+        shutil.rmtree(self.cache_dir)
+
+    def test_iter_series(self):
+        """Тест перечисления рядов из куба продаж"""
+        series = dict(iter_series(self.df, ['Magazin', 'Segment']))
+
+        self.assertEqual(len(series), 7)
+        self.assertEqual(len(series[('Shop1', 'Men')]), 60)
+        self.assertEqual(list(series[('Shop4', 'Men')].columns), ['Datasales', 'Qty'])
+
+    def test_failures_are_isolated(self):
+        """Тест изоляции ошибки одного ряда"""
+        def flaky_fit(data, periods=30, init=None, profile=None, params=None):
+            if data['y'].iloc[0] == self.df['Qty'].iloc[0]:
+                raise ValueError('сбой')
+            return fit_prophet_forecast(data, periods, init, profile, params)
+
+        progress = []
+        with patch('src.models.prophet_model.fit_prophet_forecast', side_effect=flaky_fit):
+            forecast, failures = batch_forecast(self.df, ['Magazin', 'Segment'], periods=7,
+                                                workers=1, on_progress=lambda done, total: progress.append(done))
+
+        self.assertEqual(list(forecast.columns), ['Magazin', 'Segment'] + FORECAST_COLUMNS)
+        self.assertEqual(len(forecast), 5 * 7)
+        self.assertEqual(set(failures['Magazin']), {'Shop1', 'Shop4'})
+        self.assertIn('ValueError', failures['error'].iloc[0])
+        self.assertEqual(progress, [1, 2, 3, 4, 5, 6])
+
+    def test_series_keys_shared_with_forecast_tab(self):
+        """Тест: ключи рядов пакета совпадают с ключом ряда во вкладке прогноза"""
+        with patch('src.models.batch_forecast.forecast_series',
+                   side_effect=prophet_model.forecast_series) as forecast, \
+                patch('src.models.tuning.tuned_params', return_value=None) as tuned:
+            batch_forecast(self.df[self.df['Magazin'] == 'Shop1'], ['Magazin', 'Segment'], periods=7, workers=1)
+
+        expected = {series_id(_store_key('Shop1', segment)) for segment in ['Men', 'Women']}
+        self.assertEqual({call.kwargs['series_key'] for call in forecast.call_args_list}, expected)
+        self.assertEqual({call.args[0] for call in tuned.call_args_list}, expected)
+
+    def test_process_pool(self):
+        """Тест обучения на пуле процессов"""
+        forecast, failures = batch_forecast(self.df, ['Magazin', 'Segment'], periods=7, workers=2)
+
+        self.assertEqual(len(forecast), 6 * 7)
+        self.assertEqual(len(failures), 1)
+        self.assertTrue((forecast['ds'] > self.df['Datasales'].max()).all())
+        self.assertTrue((forecast['yhat'] >= 0).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
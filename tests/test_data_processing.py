@@ -7,7 +7,11 @@ from src.utils.data_processing import (
     remove_outliers_iqr,
     smooth_data,
     prepare_prophet_data,
-    calculate_segment_volatility
+    calculate_segment_volatility,
+    optimize_sales_dtypes,
+    remove_outliers_iqr_matrix,
+    smooth_matrix,
+    preprocess_matrix
 )
 
 
@@ -149,5 +153,127 @@ class TestDataProcessing(unittest.TestCase):
         self.assertEqual(volatility, 0.3)
 
 
+class TestOptimizeSalesDtypes(unittest.TestCase):
+    """Тесты нормализации типов набора продаж"""
+
+    def setUp(self):
+        """Подготовка тестовых данных"""
+        rng = np.random.default_rng(42)
+        n = 1000
+
+        self.test_df = pd.DataFrame({
+            'Datasales': pd.date_range('2023-01-01', periods=n, freq='h'),
+            'Magazin': rng.choice(['Store1', 'Store2', 'Store3'], n).astype(object),
+            'Segment': rng.choice(['Men', 'Women'], n).astype(object),
+            'Model': rng.choice([f'Model_{i}' for i in range(50)], n).astype(object),
+            'Art': rng.choice([f'Art_{i}' for i in range(200)], n).astype(object),
+            'Describe': rng.choice([f'Product {i}' for i in range(200)], n).astype(object),
+            'Qty': rng.integers(1, 10, n).astype('float64'),
+            'Price': rng.uniform(100, 3000, n).round(2),
+            'Sum': rng.uniform(100, 30000, n).round(2)
+        })
+
+    def test_dimensions_become_categories(self):
+        """Тест преобразования измерений в категории"""
+        result = optimize_sales_dtypes(self.test_df)
+
+        for col in ['Magazin', 'Segment', 'Model', 'Art', 'Describe']:
+            self.assertIsInstance(result[col].dtype, pd.CategoricalDtype)
+
+    def test_measures_are_narrowed_safely(self):
+        """Тест сужения целочисленных мер без потери значений"""
+        result = optimize_sales_dtypes(self.test_df)
+
+        self.assertEqual(result['Qty'].dtype, np.int32)
+        self.assertEqual(result['Qty'].sum(), self.test_df['Qty'].sum())
+
+    def test_derived_arithmetic_does_not_overflow(self):
+        """Тест: производная арифметика над мерой не переполняет целый тип"""
+        df = self.test_df.copy()
+        df['Qty'] = np.where(np.arange(len(df)) % 2, 100.0, -100.0)
+
+        result = optimize_sales_dtypes(df)
+
+        np.testing.assert_array_equal(result['Qty'] * 2, df['Qty'] * 2)
+        np.testing.assert_array_equal(result['Qty'].diff().dropna(), df['Qty'].diff().dropna())
+        np.testing.assert_array_equal(result['Qty'] - 100, df['Qty'] - 100)
+
+    def test_money_keeps_float64(self):
+        """Тест: денежные меры остаются float64, итоги выручки точные"""
+        df = self.test_df.copy()
+        df['Sum'] = 123456789.37
+        df['Price'] = df['Price'].round(0)
+
+        result = optimize_sales_dtypes(df)
+
+        self.assertEqual(result['Sum'].dtype, np.float64)
+        self.assertEqual(result['Price'].dtype, np.float64)
+        self.assertEqual(result['Sum'].sum(), df['Sum'].sum())
+
+    def test_reports_memory_saving(self):
+        """Тест учета объема памяти до и после"""
+        result = optimize_sales_dtypes(self.test_df)
+
+        self.assertLess(result.attrs['memory_after_mb'], result.attrs['memory_before_mb'])
+
+    def test_groupby_matches_original(self):
+        """Тест совпадения агрегатов после нормализации"""
+        result = optimize_sales_dtypes(self.test_df)
+
+        expected = self.test_df.groupby('Model')['Qty'].sum()
+        actual = result.groupby('Model', observed=True)['Qty'].sum()
+
+        np.testing.assert_array_equal(actual.values, expected.values)
+
+
+class TestMatrixPreprocessing(unittest.TestCase):
+    """Тесты предобработки матрицы рядов: результат совпадает с поштучной"""
+
+    def setUp(self):
+        """Ряды с выбросами, постоянными участками и отрицательными значениями"""
+        rng = np.random.default_rng(7)
+        self.values = rng.gamma(2, 5, (50, 60))
+        self.values[rng.random(self.values.shape) < 0.02] *= 20
+        self.values[:5, 10:20] = 3.0
+        self.values[5:10] = np.round(self.values[5:10]) - 5
+
+        self.gaps = self.values.copy()
+        self.gaps[rng.random(self.gaps.shape) < 0.05] = np.nan
+        self.gaps[:3, :4] = np.nan
+
+    def by_series(self, values, func):
+        """Эталон: функция ряда pandas для каждой строки"""
+        return np.array([func(pd.Series(row)).to_numpy() for row in values])
+
+    def test_outliers_match_series(self):
+        """Тест IQR по строкам, в том числе с пропусками и коротких рядов"""
+        for values in (self.values, self.gaps, self.values[:, :3]):
+            np.testing.assert_array_equal(
+                remove_outliers_iqr_matrix(values), self.by_series(values, remove_outliers_iqr)
+            )
+
+    def test_smoothing_matches_series(self):
+        """Тест сглаживания всеми методами и окнами, побитовое совпадение"""
+        for values in (self.values, self.gaps):
+            for method in ('ma', 'ema', 'savgol', 'none'):
+                for window in (1, 2, 7, 8, 59, 60, 100):
+                    with self.subTest(method=method, window=window):
+                        expected = self.by_series(values, lambda data: smooth_data(data, method, window))
+                        np.testing.assert_array_equal(smooth_matrix(values, method, window), expected)
+
+    def test_preprocess_matches_prepare_prophet_data(self):
+        """Тест совпадения с предобработкой prepare_prophet_data"""
+        dates = pd.date_range('2024-01-01', periods=self.values.shape[1])
+
+        for smooth_method in (None, 'ma', 'ema', 'savgol'):
+            expected = np.array([
+                prepare_prophet_data(pd.DataFrame({'Datasales': dates, 'Qty': row}),
+                                     remove_outliers=True, smooth_method=smooth_method)[0]['y'].to_numpy()
+                for row in self.values
+            ])
+            result = preprocess_matrix(self.values, remove_outliers=True, smooth_method=smooth_method)
+            np.testing.assert_array_equal(result, expected)
+
+
 if __name__ == '__main__':
     unittest.main()
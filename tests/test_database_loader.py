@@ -0,0 +1,377 @@
+"""Unit-тесты для модуля загрузки из базы данных"""
+
+import re
+import unittest
+from datetime import datetime, timedelta
+from decimal import Decimal
+import pandas as pd
+import numpy as np
+from src.utils.database_loader import (
+    SALES_QUERY_COLUMNS,
+    _aggregate_columns,
+    _assemble_sales_frame,
+    _build_aggregate_query,
+    _build_page_query,
+    _stream_aggregate_columns,
+    complete_aggregate_frame,
+    _extract_partitioned,
+    _month_partitions,
+    _stream_sales_rows
+)
+from src.utils.db_pool import ConnectionPool
+
+
+class FakeSalesCursor:
+    """Курсор-заглушка, исполняющий keyset-страницы над списком строк"""
+
+    def __init__(self, rows, executed):
+        self.rows = rows
+        self.executed = executed
+        self.result = []
+
+    def execute(self, query, params=None):
+        self.executed.append((query, params))
+
+        date_pos = [alias for _, alias, _ in SALES_QUERY_COLUMNS].index('Datasales')
+        params = list(params or ())
+        page_size = params.pop(0) if 'TOP (%s)' in query else None
+        since = params.pop(0) if 'Datasales >= %s' in query else None
+        until = params.pop(0) if 'Datasales < %s' in query else None
+        shop = params.pop(0) if 'shop = %s' in query else None
+        after = params.pop(0) if 'Datasales > %s' in query else None
+
+        candidates = [
+            r for r in self.rows
+            if (after is None or r[date_pos] > after)
+            and (since is None or r[date_pos] >= since)
+            and (until is None or r[date_pos] < until)
+            and (shop is None or r[0] == shop)
+            and ('shop IS NULL' not in query or r[0] is None)
+        ]
+
+        if query.lstrip().startswith('SELECT COUNT(*)'):
+            self.result = [(len(candidates),)]
+            return
+
+        if query.lstrip().startswith('SELECT DISTINCT shop'):
+            self.result = [(value,) for value in {r[0] for r in candidates}]
+            return
+
+        if 'GROUP BY' in query:
+            self.result = self.aggregate(query, candidates)
+            return
+
+        candidates.sort(key=lambda r: r[date_pos])
+
+        page = candidates[:page_size]
+        # TOP ... WITH TIES
+        while page and len(page) < len(candidates) and \
+                candidates[len(page)][date_pos] == page[-1][date_pos]:
+            page.append(candidates[len(page)])
+
+        self.result = page
+
+    @staticmethod
+    def aggregate(query, candidates):
+        """Дневные суммы по псевдонимам измерений из списка выборки"""
+        positions = {alias: i for i, (_, alias, _) in enumerate(SALES_QUERY_COLUMNS)}
+        aliases = re.findall(r' as (\w+)', query)
+        dims = aliases[1:aliases.index('Qty')]
+        groups = {}
+
+        for r in candidates:
+            day = r[positions['Datasales']].date()
+            key = (day,) + tuple(r[positions[dim]] for dim in dims)
+            qty, total, cost = groups.get(key, (0, 0, 0))
+            groups[key] = (
+                qty + r[positions['Qty']],
+                total + r[positions['Sum']],
+                cost + r[positions['Purchaiseprice']] * r[positions['Qty']]
+            )
+
+        return [
+            key + (qty, total, float(total) / qty, float(cost) / qty)
+            for key, (qty, total, cost) in sorted(groups.items())
+        ]
+
+    def fetchone(self):
+        return self.result.pop(0) if self.result else None
+
+    def fetchall(self):
+        result, self.result = self.result, []
+        return result
+
+    def fetchmany(self, size):
+        batch, self.result = self.result[:size], self.result[size:]
+        return batch
+
+    def close(self):
+        pass
+
+
+class FakeSalesConnection:
+    """Соединение-заглушка в стиле DB-API"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = []
+
+    def cursor(self):
+        return FakeSalesCursor(self.rows, self.executed)
+
+
+def make_sales_rows(n_days=20, rows_per_day=7):
+    """Генерирует строки выгрузки в порядке колонок SALES_QUERY_COLUMNS"""
+    start = datetime(2024, 1, 1)
+    rows = []
+
+    for day in range(n_days):
+        for i in range(rows_per_day):
+            rows.append((
+                f'Shop{i % 3}', start + timedelta(days=day), f'A{i}', f'Item {i}',
+                f'M{i % 4}', 'Seg', Decimal('10.50'), Decimal('20.00'), i + 1,
+                Decimal('20.00') * (i + 1)
+            ))
+
+    return rows
+
+
+class TestStreamingExtraction(unittest.TestCase):
+    """Тесты потоковой keyset-выгрузки"""
+
+    def test_page_query_uses_keyset(self):
+        """Тест условия keyset-пагинации в запросе страницы"""
+        query, params = _build_page_query('Sales_table', 12, 1000, after=datetime(2024, 1, 5))
+
+        self.assertIn('WITH TIES', query)
+        self.assertIn('Datasales > %s', query)
+        self.assertNotIn('DESC', query)
+        self.assertEqual(params, (1000, datetime(2024, 1, 5)))
+
+    def test_stream_returns_all_rows(self):
+        """Тест выгрузки всех строк без обрезки и дублей"""
+        rows = make_sales_rows()
+        conn = FakeSalesConnection(rows)
+
+        df = _stream_sales_rows(conn, 'Sales_table', page_size=10, fetch_size=4)
+
+        self.assertEqual(len(df), len(rows))
+        self.assertEqual(df['Qty'].sum(), sum(r[8] for r in rows))
+        self.assertTrue(df['Datasales'].is_monotonic_increasing)
+
+    def test_stream_page_boundary_with_ties(self):
+        """Тест границы страницы внутри одного значения Datasales"""
+        rows = make_sales_rows(n_days=5, rows_per_day=9)
+        conn = FakeSalesConnection(rows)
+
+        df = _stream_sales_rows(conn, 'Sales_table', page_size=4, fetch_size=3)
+
+        self.assertEqual(len(df), len(rows))
+        self.assertEqual(df.groupby('Datasales').size().tolist(), [9] * 5)
+
+    def test_stream_typed_columns(self):
+        """Тест типов колонок результата"""
+        conn = FakeSalesConnection(make_sales_rows(n_days=3))
+
+        df = _stream_sales_rows(conn, 'Sales_table', page_size=5, fetch_size=2)
+
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(df['Datasales']))
+        self.assertEqual(df['Qty'].dtype, np.int64)
+        self.assertEqual(df['Price'].dtype, np.float64)
+        self.assertEqual(list(df.columns), [alias for _, alias, _ in SALES_QUERY_COLUMNS])
+
+    def test_stream_reports_progress(self):
+        """Тест отчета о прогрессе по фактически загруженным строкам"""
+        rows = make_sales_rows(n_days=4)
+        conn = FakeSalesConnection(rows)
+        progress = []
+
+        _stream_sales_rows(conn, 'Sales_table', page_size=10, fetch_size=5,
+                           on_progress=lambda loaded, total: progress.append((loaded, total)))
+
+        self.assertEqual(progress[-1], (len(rows), len(rows)))
+        self.assertEqual([p[0] for p in progress], sorted(p[0] for p in progress))
+
+    def test_stream_since_lower_bound(self):
+        """Тест выгрузки только строк начиная с водяного знака"""
+        rows = make_sales_rows(n_days=10, rows_per_day=3)
+        since = datetime(2024, 1, 8)
+
+        df = _stream_sales_rows(FakeSalesConnection(rows), 'Sales_table',
+                                page_size=4, fetch_size=2, since=since)
+
+        self.assertEqual(len(df), 9)
+        self.assertGreaterEqual(df['Datasales'].min(), pd.Timestamp(since))
+
+    def test_stream_empty_result(self):
+        """Тест пустой выгрузки"""
+        df = _stream_sales_rows(FakeSalesConnection([]), 'Sales_table')
+
+        self.assertEqual(len(df), 0)
+        self.assertIn('Datasales', df.columns)
+
+
+
+class FlakySalesConnection(FakeSalesConnection):
+    """Соединение, первый курсор которого обрывается на середине выгрузки"""
+
+    failures = 0
+
+    def cursor(self):
+        cursor = FakeSalesCursor(self.rows, self.executed)
+
+        if FlakySalesConnection.failures > 0:
+            FlakySalesConnection.failures -= 1
+
+            def broken_fetchmany(size):
+                raise ConnectionError('connection reset')
+
+            cursor.fetchmany = broken_fetchmany
+
+        return cursor
+
+
+class TestPartitionedExtraction(unittest.TestCase):
+    """Тесты параллельной выгрузки по партициям"""
+
+    def setUp(self):
+        self.now = datetime(2024, 3, 20)
+        self.rows = make_sales_rows(n_days=70, rows_per_day=5)
+
+    def make_pool(self, connection_cls=FakeSalesConnection, max_size=3):
+        return ConnectionPool(lambda: connection_cls(self.rows), max_size=max_size)
+
+    def test_month_partitions_cover_window(self):
+        """Тест смежных месячных границ без пропусков и пересечений"""
+        partitions = _month_partitions(3, now=self.now)
+
+        self.assertIsNone(partitions[0]['since'])
+        self.assertIsNone(partitions[-1]['until'])
+        for left, right in zip(partitions[:-1], partitions[1:]):
+            self.assertEqual(left['until'], right['since'])
+        self.assertEqual(partitions[-1]['since'], datetime(2024, 3, 1))
+
+    def test_month_partitions_respect_since(self):
+        """Тест первой партиции, начинающейся с since"""
+        partitions = _month_partitions(12, since=datetime(2024, 2, 25), now=self.now)
+
+        self.assertEqual(partitions, [
+            {'since': datetime(2024, 2, 25), 'until': datetime(2024, 3, 1)},
+            {'since': datetime(2024, 3, 1), 'until': None}
+        ])
+
+    def test_partitioned_matches_serial(self):
+        """Тест совпадения параллельной и последовательной выгрузки"""
+        serial = _stream_sales_rows(FakeSalesConnection(self.rows), 'Sales_table',
+                                    page_size=7, fetch_size=5)
+
+        for partition_by in ('month', 'shop'):
+            parallel = _extract_partitioned(self.make_pool(), 'Sales_table', 12,
+                                            partition_by=partition_by, workers=4)
+
+            self.assertEqual(len(parallel), len(self.rows))
+            self.assertTrue(parallel['Datasales'].is_monotonic_increasing)
+            pd.testing.assert_series_equal(
+                parallel.groupby('Datasales')['Qty'].sum(),
+                serial.groupby('Datasales')['Qty'].sum()
+            )
+
+    def test_workers_capped_by_pool(self):
+        """Тест ограничения числа соединений размером пула"""
+        pool = self.make_pool(max_size=2)
+
+        _extract_partitioned(pool, 'Sales_table', 12, workers=8)
+
+        self.assertLessEqual(pool.size, 2)
+
+    def test_failed_partition_is_retried(self):
+        """Тест повтора партиции на новом соединении без дублей строк"""
+        FlakySalesConnection.failures = 1
+        pool = self.make_pool(FlakySalesConnection)
+
+        df = _extract_partitioned(pool, 'Sales_table', 12, retries=2)
+
+        self.assertEqual(len(df), len(self.rows))
+        self.assertEqual(FlakySalesConnection.failures, 0)
+
+    def test_exhausted_retries_raise(self):
+        """Тест ошибки после исчерпания повторов"""
+        FlakySalesConnection.failures = 100
+        pool = self.make_pool(FlakySalesConnection)
+
+        try:
+            with self.assertRaises(ConnectionError):
+                _extract_partitioned(pool, 'Sales_table', 12, retries=0)
+        finally:
+            FlakySalesConnection.failures = 0
+
+    def test_progress_reported_from_caller_thread(self):
+        """Тест прогресса, доходящего до общего числа строк"""
+        calls = []
+
+        _extract_partitioned(self.make_pool(), 'Sales_table', 12,
+                             on_progress=lambda loaded, total: calls.append((loaded, total)))
+
+        self.assertEqual(calls[-1], (len(self.rows), len(self.rows)))
+
+
+
+class TestAggregatedExtraction(unittest.TestCase):
+    """Тесты загрузки дневных сумм"""
+
+    def setUp(self):
+        self.rows = make_sales_rows(n_days=40, rows_per_day=24)
+        self.dimensions = ('Magazin', 'Segment', 'Model')
+
+    def test_aggregate_query_groups_by_day(self):
+        """Тест группировки по дню и измерениям на стороне сервера"""
+        query, params = _build_aggregate_query('Sales_table', 12, self.dimensions,
+                                               since=datetime(2024, 1, 10))
+
+        self.assertIn('GROUP BY CAST(Datasales AS date), shop, Gender, Model', query)
+        self.assertIn('SUM(Qty) as Qty', query)
+        self.assertNotIn('TOP', query)
+        self.assertEqual(params, (datetime(2024, 1, 10),))
+
+    def test_aggregates_match_raw_rows(self):
+        """Тест совпадения дневных сумм с агрегацией исходных строк"""
+        conn = FakeSalesConnection(self.rows)
+        raw = _stream_sales_rows(conn, 'Sales_table')
+
+        chunks = _stream_aggregate_columns(conn, 'Sales_table', 12, self.dimensions,
+                                           fetch_size=7)
+        daily = _assemble_sales_frame([chunks], _aggregate_columns(self.dimensions))
+
+        expected = raw.groupby(['Datasales', 'Magazin', 'Segment', 'Model'])[['Qty', 'Sum']].sum()
+        actual = daily.set_index(['Datasales', 'Magazin', 'Segment', 'Model'])[['Qty', 'Sum']]
+
+        self.assertLess(len(daily), len(raw))
+        pd.testing.assert_frame_equal(actual.sort_index(), expected, check_dtype=False)
+        np.testing.assert_allclose(daily['Price'], daily['Sum'] / daily['Qty'])
+
+    def test_partitioned_aggregates(self):
+        """Тест параллельной загрузки дневных сумм по месяцам"""
+        pool = ConnectionPool(lambda: FakeSalesConnection(self.rows), max_size=3)
+        calls = []
+
+        df = _extract_partitioned(pool, 'Sales_table', 12, dimensions=self.dimensions,
+                                  on_progress=lambda done, total: calls.append((done, total)))
+
+        self.assertEqual(df['Qty'].sum(), sum(r[8] for r in self.rows))
+        self.assertTrue(df['Datasales'].is_monotonic_increasing)
+        self.assertEqual(calls[-1][0], calls[-1][1])
+
+    def test_complete_aggregate_frame(self):
+        """Тест заполнения товарных колонок моделью"""
+        df = pd.DataFrame({'Datasales': [datetime(2024, 1, 1)], 'Model': ['M1'],
+                           'Qty': [1], 'Sum': [10.0]})
+
+        df = complete_aggregate_frame(df)
+
+        self.assertEqual(df.loc[0, 'Art'], 'M1')
+        self.assertEqual(df.loc[0, 'Describe'], 'M1')
+        self.assertEqual(df.loc[0, 'Magazin'], 'Все')
+
+
+if __name__ == '__main__':
+    unittest.main()
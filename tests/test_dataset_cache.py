@@ -0,0 +1,91 @@
+"""Unit-тесты для дискового кэша наборов данных"""
+
+import io
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import pandas as pd
+import numpy as np
+from src.utils.dataset_cache import (
+    file_fingerprint,
+    load_cached_dataset,
+    store_cached_dataset,
+    evict_lru
+)
+
+
+class TestDatasetCache(unittest.TestCase):
+    """Тесты кэша наборов данных"""
+
+    def setUp(self):
+        """Подготовка тестовых данных"""
+        self.cache_dir = tempfile.mkdtemp()
+        self.payload = os.urandom(300000)
+
+        self.test_df = pd.DataFrame({
+            'Magazin': ['Store1', 'Store2'] * 50,
+            'Datasales': pd.date_range('2024-01-01', periods=100, freq='D'),
+            'Qty': np.arange(100),
+            'Sum': np.linspace(10, 1000, 100)
+        })
+
+    def tearDown(self):
+        """Удаление временного каталога"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_fingerprint_stable(self):
+        """Тест стабильности отпечатка для одинакового содержимого"""
+        key1 = file_fingerprint(io.BytesIO(self.payload), version=1)
+        key2 = file_fingerprint(io.BytesIO(self.payload), version=1)
+
+        self.assertEqual(key1, key2)
+
+    def test_fingerprint_detects_changes(self):
+        """Тест изменения отпечатка при изменении конца файла и версии"""
+        changed = self.payload[:-10] + b'0123456789'
+
+        base = file_fingerprint(io.BytesIO(self.payload), version=1)
+
+        self.assertNotEqual(base, file_fingerprint(io.BytesIO(changed), version=1))
+        self.assertNotEqual(base, file_fingerprint(io.BytesIO(self.payload), version=2))
+
+    def test_fingerprint_keeps_position(self):
+        """Тест сохранения позиции файлового объекта"""
+        f = io.BytesIO(self.payload)
+        f.seek(123)
+
+        file_fingerprint(f, version=1)
+
+        self.assertEqual(f.tell(), 123)
+
+    def test_store_and_load_roundtrip(self):
+        """Тест сохранения и чтения набора из кэша"""
+        self.assertTrue(store_cached_dataset('key', self.test_df, cache_dir=self.cache_dir))
+
+        loaded = load_cached_dataset('key', cache_dir=self.cache_dir)
+
+        pd.testing.assert_frame_equal(loaded, self.test_df, check_dtype=False)
+
+    def test_load_cache_miss(self):
+        """Тест промаха кэша"""
+        self.assertIsNone(load_cached_dataset('missing', cache_dir=self.cache_dir))
+
+    def test_evict_lru_removes_oldest(self):
+        """Тест вытеснения наименее давно использованных файлов"""
+        for i, name in enumerate(['old', 'mid', 'new']):
+            path = os.path.join(self.cache_dir, f'{name}.feather')
+            with open(path, 'wb') as f:
+                f.write(b'x' * 1000)
+            os.utime(path, (time.time() - 100 + i, time.time() - 100 + i))
+
+        removed = evict_lru(self.cache_dir, max_bytes=2000, suffix='.feather')
+
+        self.assertEqual(removed, 1)
+        self.assertFalse(os.path.exists(os.path.join(self.cache_dir, 'old.feather')))
+        self.assertTrue(os.path.exists(os.path.join(self.cache_dir, 'new.feather')))
+
+
+if __name__ == '__main__':
+    unittest.main()
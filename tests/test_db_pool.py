@@ -0,0 +1,159 @@
+"""Unit-тесты для пула соединений"""
+
+import sqlite3
+import threading
+import unittest
+from unittest.mock import patch
+from src.config.settings import DB_POOL_CONFIG
+from src.utils.database_loader import get_sales_pool
+from src.utils.db_pool import (
+    ConnectionPool,
+    PoolTimeoutError,
+    get_pool,
+    make_pool_key,
+    close_all_pools
+)
+
+
+class FakeClock:
+    """Управляемые часы для проверки простоя"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingConnect:
+    """Фабрика sqlite3 соединений со счетчиком созданных"""
+
+    def __init__(self):
+        self.created = []
+
+    def __call__(self):
+        conn = sqlite3.connect(':memory:', check_same_thread=False)
+        self.created.append(conn)
+        return conn
+
+
+class TestConnectionPool(unittest.TestCase):
+    """Тесты пула соединений на локальном DB-API драйвере"""
+
+    def setUp(self):
+        """Подготовка пула"""
+        self.clock = FakeClock()
+        self.connect = CountingConnect()
+        self.pool = ConnectionPool(self.connect, max_size=2, idle_timeout=100,
+                                   health_check_after=10, clock=self.clock)
+
+    def tearDown(self):
+        """Закрытие соединений"""
+        self.pool.close_all()
+
+    def test_reuses_warm_connection(self):
+        """Тест повторного использования соединения"""
+        with self.pool.connection() as conn1:
+            conn1.execute('SELECT 1')
+        with self.pool.connection() as conn2:
+            conn2.execute('SELECT 1')
+
+        self.assertIs(conn1, conn2)
+        self.assertEqual(len(self.connect.created), 1)
+
+    def test_respects_max_size(self):
+        """Тест ограничения размера пула"""
+        conn1 = self.pool.acquire()
+        conn2 = self.pool.acquire()
+
+        with self.assertRaises(PoolTimeoutError):
+            self.pool.acquire(timeout=0)
+
+        self.pool.release(conn1)
+        self.pool.release(conn2)
+        self.assertEqual(self.pool.size, 2)
+
+    def test_waiting_acquire_gets_released_connection(self):
+        """Тест ожидания освобождения соединения другим потоком"""
+        pool = ConnectionPool(self.connect, max_size=1)
+        conn = pool.acquire()
+        acquired = []
+
+        worker = threading.Thread(target=lambda: acquired.append(pool.acquire(timeout=5)))
+        worker.start()
+        pool.release(conn)
+        worker.join(5)
+
+        self.assertEqual(acquired, [conn])
+        pool.release(conn)
+        pool.close_all()
+
+    def test_evicts_idle_connections(self):
+        """Тест закрытия простаивающих соединений"""
+        with self.pool.connection():
+            pass
+
+        self.clock.now = 150
+        evicted = self.pool.evict_idle()
+
+        self.assertEqual(evicted, 1)
+        self.assertEqual(self.pool.size, 0)
+
+    def test_replaces_unhealthy_connection(self):
+        """Тест замены соединения, не прошедшего проверку здоровья"""
+        with self.pool.connection() as conn:
+            pass
+        conn.close()
+
+        self.clock.now = 20
+        with self.pool.connection() as new_conn:
+            new_conn.execute('SELECT 1')
+
+        self.assertIsNot(conn, new_conn)
+        self.assertEqual(len(self.connect.created), 2)
+
+    def test_broken_connection_is_discarded(self):
+        """Тест закрытия соединения после ошибки в запросе"""
+        with self.assertRaises(sqlite3.OperationalError):
+            with self.pool.connection() as conn:
+                conn.execute('SELECT * FROM missing_table')
+
+        self.assertEqual(self.pool.size, 0)
+
+
+class TestPoolRegistry(unittest.TestCase):
+    """Тесты общего реестра пулов"""
+
+    def tearDown(self):
+        """Очистка реестра"""
+        close_all_pools()
+
+    def test_same_key_returns_same_pool(self):
+        """Тест общего пула для одинаковых параметров подключения"""
+        key = make_pool_key('10.0.0.1', 1433, 'bdop', 'sales', 'secret')
+
+        pool1 = get_pool(key, CountingConnect())
+        pool2 = get_pool(key, CountingConnect())
+
+        self.assertIs(pool1, pool2)
+
+    def test_password_is_part_of_key(self):
+        """Тест отдельного пула при другом пароле"""
+        key1 = make_pool_key('10.0.0.1', 1433, 'bdop', 'sales', 'secret')
+        key2 = make_pool_key('10.0.0.1', 1433, 'bdop', 'sales', 'wrong')
+
+        self.assertNotEqual(key1, key2)
+        self.assertNotIn('secret', key1)
+
+    def test_sales_pool_keeps_query_timeout(self):
+        """Тест: соединения пула SQL Server создаются с таймаутом запроса"""
+        with patch('pymssql.connect', side_effect=lambda **kwargs: sqlite3.connect(':memory:')) as connect:
+            with get_sales_pool('10.0.0.1', 1433, 'bdop', 'sales', 'secret').connection():
+                pass
+
+        self.assertEqual(connect.call_args.kwargs['timeout'], DB_POOL_CONFIG['query_timeout'])
+        self.assertGreater(DB_POOL_CONFIG['query_timeout'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
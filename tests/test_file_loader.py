@@ -0,0 +1,89 @@
+"""Unit-тесты для загрузки Excel файлов"""
+
+import io
+import unittest
+import pandas as pd
+import numpy as np
+from src.config.settings import REQUIRED_COLUMNS
+from src.utils.file_loader import (
+    read_sales_excel,
+    _read_excel_openpyxl,
+    detect_date_format,
+    parse_sales_dates
+)
+
+
+def make_workbook(df):
+    """Сохраняет DataFrame в xlsx в памяти"""
+    buffer = io.BytesIO()
+    df.to_excel(buffer, index=False)
+    buffer.seek(0)
+    return buffer
+
+
+class TestExcelIngest(unittest.TestCase):
+    """Тесты быстрого чтения Excel"""
+
+    def setUp(self):
+        """Подготовка тестовых данных"""
+        n = 120
+        self.test_df = pd.DataFrame({
+            'Extra': np.arange(n),
+            'Magazin': ['Store1', 'Store2'] * (n // 2),
+            'Datasales': pd.date_range('2024-01-01', periods=n, freq='D').strftime('%d.%m.%Y'),
+            'Art': np.arange(n),
+            'Describe': ['Item'] * n,
+            'Model': ['M1', 'M2', 'M3'] * (n // 3),
+            'Segment': ['Seg'] * n,
+            'Price': np.linspace(10, 100, n),
+            'Qty': np.ones(n, dtype=int),
+            'Sum': np.linspace(10, 100, n)
+        })
+
+    def test_reads_only_required_columns(self):
+        """Тест проекции колонок"""
+        df, missing = read_sales_excel(make_workbook(self.test_df))
+
+        self.assertEqual(missing, [])
+        self.assertEqual(list(df.columns), REQUIRED_COLUMNS)
+        self.assertEqual(len(df), len(self.test_df))
+
+    def test_applies_dtype_plan(self):
+        """Тест плана типов"""
+        df, _ = read_sales_excel(make_workbook(self.test_df))
+
+        self.assertEqual(df['Qty'].dtype, np.float64)
+        self.assertEqual(df['Art'].iloc[5], '5')
+        self.assertAlmostEqual(df['Price'].sum(), self.test_df['Price'].sum())
+
+    def test_openpyxl_stream_matches(self):
+        """Тест потокового чтения openpyxl (без python-calamine)"""
+        df, missing = _read_excel_openpyxl(make_workbook(self.test_df))
+        expected, _ = read_sales_excel(make_workbook(self.test_df))
+
+        self.assertEqual(missing, [])
+        pd.testing.assert_frame_equal(df, expected, check_dtype=False)
+
+    def test_reports_missing_columns(self):
+        """Тест отсутствующих колонок"""
+        df, missing = read_sales_excel(make_workbook(self.test_df.drop(columns=['Sum'])))
+
+        self.assertIsNone(df)
+        self.assertEqual(missing, ['Sum'])
+
+    def test_detect_date_format_dayfirst(self):
+        """Тест определения формата дат с днем первым"""
+        self.assertEqual(detect_date_format(['01.02.2024', '13.02.2024']), '%d.%m.%Y')
+        self.assertEqual(detect_date_format(['2024-02-13']), '%Y-%m-%d')
+        self.assertIsNone(detect_date_format(['не дата']))
+
+    def test_parse_sales_dates(self):
+        """Тест разбора дат по определенному формату"""
+        result = parse_sales_dates(pd.Series(['05.03.2024', 'мусор', None]))
+
+        self.assertEqual(result.iloc[0], pd.Timestamp('2024-03-05'))
+        self.assertTrue(result.iloc[1:].isna().all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+"""Unit-тесты для хранилища прогнозов"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from src.config.settings import FORECAST_STORE_CONFIG
+from src.utils.forecast_store import ForecastStore
+
+
+def make_forecast(start='2025-01-01', periods=10, level=1.0):
+    """Прогноз одного ряда"""
+    return pd.DataFrame({
+        'ds': pd.date_range(start, periods=periods),
+        'yhat': np.full(periods, level),
+        'yhat_lower': np.full(periods, level - 1),
+        'yhat_upper': np.full(periods, level + 1)
+    })
+
+
+class TestForecastStore(unittest.TestCase):
+    """Тесты сохранения версий и запросов"""
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.store = ForecastStore(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def test_latest_returns_newest_version(self):
+        """Тест: последний прогноз ряда - последняя сохраненная версия"""
+        key = {'Magazin': 'Магазин/1', 'Segment': 'A'}
+        self.store.save(make_forecast(level=1.0), key, params={'changepoint_prior_scale': 0.05},
+                        created_at='2025-01-01')
+        run_id = self.store.save(make_forecast(level=2.0), key, created_at='2025-01-02')
+        self.store.save(make_forecast(level=3.0), {'Magazin': 'Магазин/1'}, created_at='2025-01-03')
+
+        latest = self.store.latest(Magazin='Магазин/1', Segment='A')
+
+        self.assertEqual(list(latest.columns), ['ds', 'yhat', 'yhat_lower', 'yhat_upper'])
+        self.assertTrue((latest['yhat'] == 2.0).all())
+        self.assertEqual(latest.attrs['run']['run_id'], run_id)
+        self.assertEqual(len(self.store.runs(Magazin='Магазин/1', Segment='A')), 2)
+        self.assertTrue((self.store.latest(Magazin='Магазин/1')['yhat'] == 3.0).all())
+        self.assertIsNone(self.store.latest(Magazin='Другой'))
+
+    def test_batch_and_date_range_query(self):
+        """Тест пакетного сохранения и запроса диапазона дат"""
+        forecasts = pd.concat([
+            make_forecast(level=level).assign(Magazin=magazin, Model='M1')
+            for level, magazin in [(1.0, 'S1'), (2.0, 'S2')]
+        ], ignore_index=True)
+        self.store.save_batch(forecasts, ['Magazin', 'Model'], method='holt_winters')
+        self.store.save(make_forecast('2025-03-01'), {'Magazin': 'S1', 'Model': 'M1'})
+
+        result = self.store.query('2025-01-03', '2025-01-05')
+        history = self.store.query('2025-01-03', '2025-01-05', latest_only=False, Magazin='S2')
+
+        # Последняя версия S1 вне диапазона, поэтому остается только S2
+        self.assertEqual(set(result['Magazin']), {'S2'})
+        self.assertEqual(len(result), 3)
+        self.assertTrue(result['Segment'].isna().all())
+        self.assertEqual(len(history), 3)
+        # Ряды магазина в одном разделе: S1 из двух запусков и S2
+        partitions = self.store.index()['path'].map(os.path.dirname)
+        self.assertEqual(partitions.nunique(), 2)
+
+    def test_index_fragment_per_run(self):
+        """Тест: запуск добавляет свой фрагмент индекса, прежние не переписываются"""
+        self.store.save(make_forecast(level=1.0), {'Magazin': 'S1'}, created_at='2025-01-01')
+        first = os.listdir(os.path.join(self.path, 'index'))
+        mtime = os.path.getmtime(os.path.join(self.path, 'index', first[0]))
+        self.store.save(make_forecast(level=2.0), {'Magazin': 'S1'}, created_at='2025-01-02')
+
+        fragments = os.listdir(os.path.join(self.path, 'index'))
+        self.assertEqual(len(fragments), 2)
+        self.assertEqual(os.path.getmtime(os.path.join(self.path, 'index', first[0])), mtime)
+        self.assertEqual(len(ForecastStore(self.path).index()), 2)
+        self.assertTrue((self.store.latest(Magazin='S1')['yhat'] == 2.0).all())
+
+    def test_compaction_and_retention(self):
+        """Тест уплотнения индекса с лимитом версий ряда"""
+        for day, level in enumerate([1.0, 2.0, 3.0], start=1):
+            self.store.save(make_forecast(level=level), {'Magazin': 'S1'}, created_at=f'2025-01-0{day}')
+            self.store.save(make_forecast(level=level), {'Magazin': 'S2'}, created_at=f'2025-01-0{day}')
+
+        removed = self.store.compact(keep_runs=2)
+
+        self.assertEqual(removed, 2)
+        self.assertEqual(len(os.listdir(os.path.join(self.path, 'index'))), 1)
+        self.assertEqual(len(self.store.runs(Magazin='S1')), 2)
+        self.assertTrue((self.store.latest(Magazin='S2')['yhat'] == 3.0).all())
+        # Файлы версий, вышедших из индекса, удалены
+        files = sum(len(names) for _, _, names in os.walk(self.path))
+        self.assertEqual(files, 1 + 4)
+
+    def test_automatic_compaction(self):
+        """Тест уплотнения после compact_after фрагментов"""
+        with patch.dict(FORECAST_STORE_CONFIG, {'compact_after': 2}):
+            for day in range(1, 4):
+                self.store.save(make_forecast(), {'Magazin': 'S1'}, created_at=f'2025-01-0{day}')
+
+        self.assertEqual(len(os.listdir(os.path.join(self.path, 'index'))), 1)
+        self.assertEqual(len(self.store.runs(Magazin='S1')), 3)
+
+    def test_unknown_level(self):
+        """Тест ошибки неизвестного уровня ключа"""
+        with self.assertRaises(ValueError):
+            self.store.save(make_forecast(), {'Art': 'X'})
+        with self.assertRaises(ValueError):
+            self.store.runs(Art='X')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""Unit-тесты для иерархического прогноза"""
+
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from src.config.settings import HIERARCHY_CONFIG
+from src.models.baseline_models import forecast_matrix, series_matrix
+from src.models.hierarchy import (
+    RECONCILIATION_METHODS, hierarchical_forecast, reconcile_mint,
+    shrink_covariance, summing_matrix
+)
+
+LEVELS = ['Magazin', 'Segment', 'Model']
+
+
+def make_sales(days=90, seed=0):
+    """Продажи двух магазинов, двух сегментов и трех моделей"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2024-01-01', periods=days)
+    frames = []
+
+    for shop, segment, model in [('Shop1', 'Men', 'M1'), ('Shop1', 'Men', 'M2'),
+                                 ('Shop1', 'Women', 'M3'), ('Shop2', 'Men', 'M1'),
+                                 ('Shop2', 'Women', 'M3')]:
+        frames.append(pd.DataFrame({
+            'Datasales': dates, 'Magazin': shop, 'Segment': segment, 'Model': model,
+            'Qty': rng.poisson(rng.uniform(3, 15), days), 'Sum': 100.0
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+class TestSummingMatrix(unittest.TestCase):
+    """Тесты суммирующей матрицы"""
+
+    def test_structure(self):
+        """Тест узлов и строк S"""
+        keys, _, _ = series_matrix(make_sales(), LEVELS)
+        summing, nodes = summing_matrix(keys)
+
+        # Итог, 2 магазина, 4 магазина × сегмента, 5 нижних рядов
+        self.assertEqual(summing.shape, (12, 5))
+        self.assertEqual(list(nodes['level'].value_counts().sort_index()), [1, 2, 4, 5])
+        self.assertEqual(summing[0].sum(), 5)
+        np.testing.assert_array_equal(summing[-5:].toarray(), np.eye(5))
+        self.assertIsNone(nodes.loc[1, 'Segment'])
+
+
+class TestReconciliation(unittest.TestCase):
+    """Тесты согласования"""
+
+    def setUp(self):
+        self.df = make_sales()
+
+    def test_all_methods_are_coherent(self):
+        """Тест согласованности узлов и выборок для всех методов"""
+        for method in RECONCILIATION_METHODS:
+            forecast = hierarchical_forecast(self.df, LEVELS, periods=7, method=method)
+            reconciled = forecast.reconciled
+
+            np.testing.assert_allclose(reconciled[0], forecast.bottom.sum(axis=0))
+            shop1 = forecast.nodes.index[(forecast.nodes['level'] == 1)
+                                         & (forecast.nodes['Magazin'] == 'Shop1')][0]
+            np.testing.assert_allclose(forecast.view(Magazin='Shop1')['yhat'], reconciled[shop1])
+            self.assertTrue((forecast.bottom >= 0).all())
+
+    def test_bottom_up_and_top_down(self):
+        """Тест снизу вверх и сверху вниз по историческим долям"""
+        _, _, values = series_matrix(self.df, LEVELS)
+
+        bottom_up = hierarchical_forecast(self.df, LEVELS, periods=7, method='bottom_up')
+        np.testing.assert_allclose(bottom_up.bottom, forecast_matrix(values, 7)['yhat'])
+
+        top_down = hierarchical_forecast(self.df, LEVELS, periods=7, method='top_down')
+        shares = top_down.bottom / top_down.bottom.sum(axis=0)
+        np.testing.assert_allclose(shares[:, 0], values.sum(axis=1) / values.sum())
+
+    def test_view_across_hierarchy(self):
+        """Тест выборки не по узлу иерархии (сегмент во всех магазинах)"""
+        forecast = hierarchical_forecast(self.df, LEVELS, periods=7, method='bottom_up')
+        men = forecast.keys['Segment'] == 'Men'
+
+        np.testing.assert_allclose(forecast.view(Segment='Men')['yhat'],
+                                   forecast.bottom[men.to_numpy()].sum(axis=0))
+        self.assertTrue(forecast.view(Magazin='Shop9').empty)
+        with self.assertRaises(ValueError):
+            forecast.view(Art='A1')
+
+    def test_mint_keeps_coherent_forecasts(self):
+        """Тест MinT: уже согласованные прогнозы не меняются (плотная и разреженная W)"""
+        keys, _, values = series_matrix(self.df, LEVELS)
+        summing, _ = summing_matrix(keys)
+        rng = np.random.default_rng(1)
+        bottom = rng.uniform(1, 10, (len(keys), 4))
+        residuals = rng.normal(0, 1, (summing.shape[0], 60))
+
+        for dense_nodes in [1000, 1]:
+            with patch.dict(HIERARCHY_CONFIG, {'mint_dense_nodes': dense_nodes}):
+                reconciled = reconcile_mint(summing, summing @ bottom, residuals)
+            np.testing.assert_allclose(reconciled, bottom, rtol=1e-6)
+
+    def test_shrink_covariance(self):
+        """Тест сжатия ковариации к диагонали"""
+        residuals = np.random.default_rng(2).normal(0, 1, (6, 40))
+        covariance, intensity = shrink_covariance(residuals)
+
+        self.assertTrue(0 <= intensity <= 1)
+        np.testing.assert_allclose(np.diag(covariance), (residuals ** 2).mean(axis=1))
+        np.testing.assert_allclose(covariance, covariance.T)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+"""Unit-тесты для очереди фоновых задач"""
+
+import threading
+import unittest
+from src.utils.job_queue import CANCELLED, DONE, FAILED, QUEUED, JobQueue
+
+
+def wait_finished(queue, job_id, timeout=5):
+    """Ждет завершения задачи и возвращает ее"""
+    job = queue.get(job_id)
+    job._future.result(timeout=timeout)
+    return job
+
+
+class TestJobQueue(unittest.TestCase):
+    """Тесты очереди задач"""
+
+    def setUp(self):
+        self.queue = JobQueue(workers=1, keep_finished=3)
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+        self.queue.shutdown()
+
+    def blocking(self, job, value=None):
+        """Задача, ждущая разрешения теста"""
+        job.report(0, 2, "Ожидание")
+        self.release.wait(5)
+        job.report(1, 2, "Вычисление")
+        return value
+
+    def test_result_and_progress(self):
+        """Тест результата и прогресса задачи"""
+        job_id = self.queue.submit('key', self.blocking, 'result')
+        self.release.set()
+        job = wait_finished(self.queue, job_id)
+
+        self.assertEqual(job.status, DONE)
+        self.assertEqual(job.result, 'result')
+        self.assertEqual(job.progress, 1.0)
+        self.assertEqual(job.message, "Вычисление")
+        self.assertIs(self.queue.find('key'), job)
+
+    def test_deduplicates_active_keys(self):
+        """Тест: одинаковая задача в работе не ставится повторно"""
+        first = self.queue.submit('key', self.blocking)
+        second = self.queue.submit('key', self.blocking)
+        other = self.queue.submit('other', self.blocking)
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+
+        self.release.set()
+        wait_finished(self.queue, other)
+        # Завершенная задача не мешает новой с тем же ключом
+        self.assertNotEqual(self.queue.submit('key', self.blocking), first)
+
+    def test_failure_is_captured(self):
+        """Тест: исключение задачи сохраняется как ошибка"""
+        def failing(job):
+            raise ValueError("сбой")
+
+        job = wait_finished(self.queue, self.queue.submit('key', failing))
+
+        self.assertEqual(job.status, FAILED)
+        self.assertEqual(job.error, "ValueError: сбой")
+        self.assertIsNone(job.result)
+
+    def test_cancel_queued_and_running(self):
+        """Тест отмены задачи в очереди и выполняемой задачи"""
+        running = self.queue.submit('running', self.blocking, 'result')
+        queued = self.queue.submit('queued', self.blocking)
+
+        self.assertEqual(self.queue.get(queued).status, QUEUED)
+        self.assertTrue(self.queue.cancel(queued))
+        self.assertEqual(self.queue.get(queued).status, CANCELLED)
+
+        self.assertTrue(self.queue.cancel(running))
+        self.release.set()
+        job = wait_finished(self.queue, running)
+
+        self.assertEqual(job.status, CANCELLED)
+        self.assertIsNone(job.result)
+        self.assertFalse(self.queue.cancel(running))
+
+    def test_old_finished_jobs_are_evicted(self):
+        """Тест: хранится не больше keep_finished завершенных задач"""
+        self.release.set()
+        jobs = [self.queue.get(self.queue.submit(index, self.blocking, index)) for index in range(5)]
+        for job in jobs:
+            job._future.result(timeout=5)
+        ids = [job.id for job in jobs]
+
+        self.assertEqual([job.id for job in self.queue.jobs()], ids[-3:])
+        self.assertIsNone(self.queue.get(ids[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,20 +1,51 @@
 """Unit-тесты для модели Prophet"""
 
+import shutil
+import tempfile
 import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
 import pandas as pd
 import numpy as np
+from src.config.settings import MODEL_CACHE_CONFIG
+from src.models import prophet_model
 from src.models.prophet_model import (
     train_prophet_model,
     calculate_model_accuracy,
-    get_forecast_scenarios
+    get_forecast_scenarios,
+    extend_forecast,
+    model_cache_key,
+    prophet_params,
+    warm_start_params
 )
 
 
-class TestProphetModel(unittest.TestCase):
+class TempModelCacheMixin:
+    """
+    Кэш моделей во временном каталоге и пустой кэш в памяти
+
+    Тесты не пишут .model_cache в рабочий каталог, и каждая подгонка
+    действительно обучает модель, а не берет ее из кэша другого теста.
+    """
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.config = patch.dict(MODEL_CACHE_CONFIG, {'path': self.cache_dir})
+        self.config.start()
+        prophet_model._model_cache.clear()
+
+    def tearDown(self):
+        self.config.stop()
+        prophet_model._model_cache.clear()
+        shutil.rmtree(self.cache_dir)
+
+
+class TestProphetModel(TempModelCacheMixin, unittest.TestCase):
     """Тесты для функций модели Prophet"""
 
     def setUp(self):
         """Подготовка тестовых данных"""
+        super().setUp()
         np.random.seed(42)
 
         # Создаем синтетический временной ряд
@@ -129,11 +160,12 @@ class TestProphetModel(unittest.TestCase):
         self.assertIsNone(forecast, "Прогноз не должен быть создан на пустых данных")
 
 
-class TestProphetModelIntegration(unittest.TestCase):
+class TestProphetModelIntegration(TempModelCacheMixin, unittest.TestCase):
     """Интеграционные тесты для модели Prophet"""
 
     def setUp(self):
         """Подготовка тестовых данных"""
+        super().setUp()
         np.random.seed(42)
         dates = pd.date_range('2023-01-01', periods=100, freq='D')
 
@@ -170,5 +202,160 @@ class TestProphetModelIntegration(unittest.TestCase):
         self.assertTrue(np.all(realistic >= 0))
 
 
+class ModelCacheMixin(TempModelCacheMixin):
+    """Кэш моделей во временном каталоге и ряд для проверок кэша"""
+
+    def setUp(self):
+        super().setUp()
+        dates = pd.date_range('2023-01-01', periods=60, freq='D')
+        self.data = pd.DataFrame({'ds': dates, 'y': 50 + 10 * np.sin(np.arange(60))})
+
+    def fit_counting(self):
+        return patch('src.models.prophet_model.fit_prophet_forecast',
+                     side_effect=prophet_model.fit_prophet_forecast)
+
+
+class TestModelCache(ModelCacheMixin, unittest.TestCase):
+    """Тесты кэша обученных моделей"""
+
+    def test_repeat_request_skips_fit(self):
+        """Тест повторного запроса без обучения"""
+        with self.fit_counting() as fit:
+            _, first = train_prophet_model(self.data, periods=7)
+            _, second = train_prophet_model(self.data, periods=7)
+
+        self.assertEqual(fit.call_count, 1)
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_key_includes_settings(self):
+        """Тест ключа по ряду и предобработке, но не по горизонту"""
+        key = model_cache_key(self.data)
+        changed = self.data.assign(y=self.data['y'] + 1)
+
+        self.assertNotEqual(key, model_cache_key(changed))
+        self.assertNotEqual(key, model_cache_key(self.data, {'remove_outliers': True}))
+        self.assertNotEqual(key, model_cache_key(self.data, profile='fast'))
+
+    def test_horizon_change_skips_fit(self):
+        """Тест смены горизонта без переобучения"""
+        with self.fit_counting() as fit:
+            _, short = train_prophet_model(self.data, periods=7)
+            _, longer = train_prophet_model(self.data, periods=14)
+            _, shorter = train_prophet_model(self.data, periods=3)
+
+        self.assertEqual(fit.call_count, 1)
+        self.assertEqual(len(longer), 60 + 14)
+        self.assertEqual(len(shorter), 60 + 3)
+        pd.testing.assert_frame_equal(longer.iloc[:67], short)
+        pd.testing.assert_frame_equal(shorter, short.iloc[:63])
+
+    def test_disk_round_trip(self):
+        """Тест восстановления модели и прогноза с диска"""
+        model, forecast = train_prophet_model(self.data, periods=7)
+        prophet_model._model_cache.clear()
+
+        with self.fit_counting() as fit:
+            cached_model, cached_forecast = train_prophet_model(self.data, periods=7)
+
+        self.assertEqual(fit.call_count, 0)
+        pd.testing.assert_frame_equal(cached_forecast, forecast)
+        np.testing.assert_allclose(
+            cached_model.predict(self.data[['ds']])['yhat'],
+            model.predict(self.data[['ds']])['yhat']
+        )
+
+
+class TestExtendForecast(unittest.TestCase):
+    """Тесты продления прогноза обученной модели"""
+
+    def test_predicts_only_new_days(self):
+        """Тест прогноза только недостающих дней"""
+        dates = pd.date_range('2023-01-01', periods=60, freq='D')
+        data = pd.DataFrame({'ds': dates, 'y': 50 + 10 * np.sin(np.arange(60))})
+        model, forecast = prophet_model.fit_prophet_forecast(data, periods=7)
+        full = model.predict(model.make_future_dataframe(periods=10))
+
+        with patch.object(model, 'predict', wraps=model.predict) as predict:
+            extended = extend_forecast(model, forecast, 10)
+
+        self.assertEqual(len(predict.call_args.args[0]), 3)
+        self.assertEqual(list(extended.columns), list(forecast.columns))
+        pd.testing.assert_series_equal(extended['ds'], full['ds'])
+        np.testing.assert_allclose(extended['yhat'], full['yhat'].clip(lower=0))
+
+
+class TestProphetProfiles(unittest.TestCase):
+    """Тесты профилей скорости Prophet"""
+
+    def test_profile_params(self):
+        """Тест переопределения PROPHET_PARAMS профилем"""
+        params = prophet_params('fast')
+
+        self.assertEqual(params['uncertainty_samples'], 0)
+        self.assertEqual(params['seasonality_mode'], 'multiplicative')
+        self.assertGreater(prophet_params('accurate')['mcmc_samples'], 0)
+        with self.assertRaises(ValueError):
+            prophet_params('turbo')
+
+    def test_fast_profile_intervals(self):
+        """Тест интервалов по ошибкам на истории без симуляции"""
+        dates = pd.date_range('2023-01-01', periods=60, freq='D')
+        data = pd.DataFrame({'ds': dates, 'y': 50 + 10 * np.sin(np.arange(60))})
+        model, forecast = prophet_model.fit_prophet_forecast(data, periods=7, profile='fast')
+        extended = extend_forecast(model, forecast, 14)
+
+        for frame in [forecast, extended]:
+            self.assertTrue((frame['yhat_lower'] <= frame['yhat']).all())
+            self.assertTrue((frame['yhat'] < frame['yhat_upper']).all())
+        self.assertEqual(len(extended), 74)
+
+    def test_warm_start_from_mcmc_samples(self):
+        """Тест теплого старта по средним выборки MCMC (профиль accurate)"""
+        samples = np.arange(4, dtype='float64')
+        model = SimpleNamespace(params={
+            'k': samples, 'm': samples + 1, 'sigma_obs': samples + 2,
+            'delta': np.tile(samples[:, None], (1, 3)), 'beta': np.ones((4, 2))
+        })
+
+        init = warm_start_params(model)
+
+        self.assertEqual(init['k'], 1.5)
+        self.assertEqual(init['sigma_obs'], 3.5)
+        np.testing.assert_array_equal(init['delta'], [1.5, 1.5, 1.5])
+        np.testing.assert_array_equal(init['beta'], [1.0, 1.0])
+
+
+class TestIncrementalFit(ModelCacheMixin, unittest.TestCase):
+    """Тесты дообучения с теплым стартом"""
+
+    def fit_with_key(self, data):
+        with self.fit_counting() as fit:
+            train_prophet_model(data, periods=7, series_key=('Shop1', 'Men'))
+        return fit.call_args.kwargs['init']
+
+    def test_new_day_warm_starts(self):
+        """Тест теплого старта при новом дне"""
+        self.assertIsNone(self.fit_with_key(self.data.iloc[:-1]))
+
+        init = self.fit_with_key(self.data)
+
+        self.assertIsNotNone(init)
+        self.assertEqual(set(init), {'k', 'm', 'sigma_obs', 'delta', 'beta'})
+
+    def test_drift_refits_cold(self):
+        """Тест полной подгонки при дрейфе на новых днях"""
+        self.fit_with_key(self.data.iloc[:-1])
+        drifted = self.data.copy()
+        drifted.loc[drifted.index[-1], 'y'] = 1000
+
+        self.assertIsNone(self.fit_with_key(drifted))
+
+    def test_changed_history_refits_cold(self):
+        """Тест полной подгонки, если история не продолжается"""
+        self.fit_with_key(self.data.iloc[:-1])
+
+        self.assertIsNone(self.fit_with_key(self.data.iloc[1:]))
+
+
 if __name__ == '__main__':
     unittest.main()
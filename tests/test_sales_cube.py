@@ -0,0 +1,136 @@
+"""Unit-тесты для дневного куба продаж"""
+
+import pickle
+import unittest
+import numpy as np
+import pandas as pd
+from src.utils.sales_cube import SalesCalendar, SalesCube, get_sales_cube
+from src.utils.sales_index import register_sales_dataset
+from src.visualization.plots import (
+    plot_daily_sales_distribution,
+    plot_monthly_revenue_trend,
+    plot_sales_by_weekday,
+    plot_sales_heatmap,
+    plot_sales_trend_comparison
+)
+
+
+def make_sales(n=3000, seed=0):
+    """Сырые продажи со временем внутри дня и пропусками"""
+    rng = np.random.default_rng(seed)
+    seconds = rng.integers(0, 120 * 86400, n)
+    df = pd.DataFrame({
+        'Datasales': pd.Timestamp('2024-01-01') + pd.to_timedelta(seconds, unit='s'),
+        'Magazin': rng.choice(['Shop1', 'Shop2', 'Shop3'], n),
+        'Segment': rng.choice(['Men', 'Women', 'Kids'], n),
+        'Model': rng.choice([f'M{i}' for i in range(40)], n),
+        'Qty': rng.integers(1, 5, n),
+        'Sum': rng.uniform(100, 1000, n)
+    })
+    df.loc[3, 'Segment'] = None
+    return df.astype({'Magazin': 'category', 'Segment': 'category', 'Model': 'category'})
+
+
+class TestSalesCalendar(unittest.TestCase):
+    """Тесты календаря дней набора"""
+
+    def test_codes_match_pandas(self):
+        """Тест кодов дня недели, ISO недели и месяца"""
+        calendar = SalesCalendar(np.datetime64('2023-12-20'), 60)
+        dates = pd.date_range('2023-12-20', periods=60)
+        day_codes = np.arange(60)
+
+        weekday, _ = calendar.lookup('weekday', day_codes)
+        week, n_weeks = calendar.lookup('week', day_codes)
+        month, n_months = calendar.lookup('month', day_codes)
+
+        np.testing.assert_array_equal(weekday, dates.dayofweek)
+        np.testing.assert_array_equal(calendar.decode('week', week), dates.to_period('W').start_time)
+        np.testing.assert_array_equal(calendar.decode('month', month), dates.to_period('M').start_time)
+        self.assertEqual((n_weeks, n_months), (9, 3))
+        self.assertEqual(weekday.dtype, np.int8)
+
+    def test_missing_day_code(self):
+        """Тест кода пропуска для строк без даты"""
+        calendar = SalesCalendar(np.datetime64('2024-01-01'), 10)
+
+        codes, size = calendar.lookup('month', np.array([10]))
+        self.assertEqual(codes[0], size)
+
+
+class TestSalesCube(unittest.TestCase):
+    """Тесты куба продаж"""
+
+    def setUp(self):
+        self.df = make_sales()
+        self.cube = SalesCube(self.df)
+        self.days = self.df['Datasales'].dt.normalize()
+
+    def test_cells_are_daily(self):
+        """Тест свертки строк в дневные ячейки"""
+        expected = self.df.groupby([self.days, 'Magazin', 'Segment', 'Model'],
+                                   observed=True, dropna=False).ngroups
+
+        self.assertEqual(self.cube.n_cells, expected)
+        self.assertEqual(self.cube.total('Rows'), len(self.df))
+        self.assertEqual(self.cube.total('Qty'), self.df['Qty'].sum())
+
+    def test_rollup_matches_groupby(self):
+        """Тест совпадения сверток с groupby по строкам"""
+        cases = [
+            (['Model'], ['Model']),
+            (['Datasales', 'Model'], [self.days.rename('Datasales'), 'Model']),
+            (['Magazin', 'Segment'], ['Magazin', 'Segment']),
+            (['weekday'], [self.df['Datasales'].dt.dayofweek.rename('weekday')]),
+            (['month'], [self.df['Datasales'].dt.to_period('M').dt.to_timestamp().rename('month')]),
+            (['week'], [self.df['Datasales'].dt.to_period('W').dt.start_time.rename('week')])
+        ]
+
+        for dimensions, keys in cases:
+            actual = self.cube.rollup(dimensions)
+            expected = self.df.groupby(keys, observed=True)[['Qty', 'Sum']].sum().reset_index()
+
+            self.assertEqual(len(actual), len(expected), dimensions)
+            np.testing.assert_array_equal(actual['Qty'].values, expected['Qty'].values)
+            np.testing.assert_allclose(actual['Sum'].values, expected['Sum'].values)
+            for dimension in dimensions:
+                np.testing.assert_array_equal(np.asarray(actual[dimension]),
+                                              np.asarray(expected[dimension]))
+
+    def test_subset_matches_filter(self):
+        """Тест отбора магазина и сегмента по ячейкам"""
+        actual = self.cube.subset('Shop2', 'Men').rollup(['Model'])
+        rows = self.df[(self.df['Magazin'] == 'Shop2') & (self.df['Segment'] == 'Men')]
+        expected = rows.groupby('Model', observed=True)['Sum'].sum()
+
+        np.testing.assert_allclose(actual['Sum'].values, expected.values)
+        self.assertEqual(self.cube.subset('Нет').n_cells, 0)
+        self.assertIs(self.cube.subset(), self.cube)
+
+    def test_missing_columns(self):
+        """Тест набора без дат и выручки"""
+        cube = SalesCube(self.df[['Model', 'Qty']])
+
+        self.assertEqual(cube.measures, ['Qty'])
+        self.assertEqual(len(cube.rollup(['Model'])), 40)
+        with self.assertRaises(KeyError):
+            cube.rollup(['weekday'])
+
+    def test_cached_by_dataset_id(self):
+        """Тест одного куба на набор"""
+        grouped = register_sales_dataset(self.df)
+
+        self.assertIs(get_sales_cube(pickle.loads(pickle.dumps(grouped))), get_sales_cube(grouped))
+        self.assertIsNot(get_sales_cube(grouped.assign(Qty=grouped['Qty'] * 2)), get_sales_cube(grouped))
+
+    def test_plots_accept_cube(self):
+        """Тест графиков по кубу и по набору"""
+        subset = self.cube.subset('Shop1')
+
+        for plot in (plot_sales_by_weekday, plot_monthly_revenue_trend, plot_sales_heatmap,
+                     plot_daily_sales_distribution, plot_sales_trend_comparison):
+            self.assertEqual(len(plot(subset).data), len(plot(self.df[self.df['Magazin'] == 'Shop1']).data))
+
+
+if __name__ == '__main__':
+    unittest.main()
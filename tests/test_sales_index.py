@@ -0,0 +1,116 @@
+"""Unit-тесты для индекса строк по магазину и сегменту"""
+
+import pickle
+import unittest
+import numpy as np
+import pandas as pd
+from src.utils.sales_index import (
+    SalesIndex,
+    filter_sales,
+    get_sales_index,
+    register_sales_dataset,
+    select_sales
+)
+
+
+def make_sales(n=600, seed=0):
+    """Набор продаж, отсортированный по дате"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'Datasales': pd.date_range('2024-01-01', periods=n, freq='h'),
+        'Magazin': rng.choice(['Shop1', 'Shop2', 'Shop3'], n),
+        'Segment': rng.choice(['Men', 'Women', 'Kids'], n),
+        'Qty': rng.integers(1, 5, n)
+    })
+    df.loc[5, 'Segment'] = None
+    return df
+
+
+def mask_filter(df, magazin, segment):
+    """Эталон: прежняя фильтрация булевыми масками"""
+    filtered = df
+    if magazin != 'Все магазины':
+        filtered = filtered[filtered['Magazin'] == magazin]
+    if segment != 'Все сегменты':
+        filtered = filtered[filtered['Segment'] == segment]
+    return filtered
+
+
+class TestSalesIndex(unittest.TestCase):
+    """Тесты индекса строк"""
+
+    def setUp(self):
+        self.raw = make_sales()
+        self.grouped = register_sales_dataset(self.raw.astype({'Magazin': 'category',
+                                                         'Segment': 'category'}))
+
+    def assert_same_rows(self, actual, expected):
+        pd.testing.assert_frame_equal(
+            actual.reset_index(drop=True).astype({'Magazin': str, 'Segment': object}),
+            expected.reset_index(drop=True).astype({'Magazin': str, 'Segment': object})
+        )
+
+    def test_registered_rows_keep_date_order(self):
+        """Тест: регистрация набора не меняет порядок строк по дате"""
+        self.assertTrue(self.grouped['Datasales'].is_monotonic_increasing)
+        np.testing.assert_array_equal(self.grouped['Qty'], self.raw['Qty'])
+
+    def test_matches_mask_filter(self):
+        """Тест совпадения с фильтрацией масками для всех выборов"""
+        for df in (self.raw, self.grouped):
+            for magazin in ['Все магазины', 'Shop1', 'Shop3', 'Нет']:
+                for segment in ['Все сегменты', 'Men', 'Kids', 'Нет']:
+                    self.assert_same_rows(filter_sales(df, magazin, segment),
+                                          mask_filter(df, magazin, segment))
+
+    def test_contiguous_views_are_slices(self):
+        """Тест срезов без копирования для уже сгруппированных строк"""
+        grouped = self.grouped.sort_values(['Magazin', 'Segment'], kind='stable').reset_index(drop=True)
+        index = SalesIndex(grouped)
+
+        self.assertTrue(index.contiguous)
+        self.assertIsInstance(index.positions('Shop2'), slice)
+        self.assertIsInstance(index.positions('Shop2', 'Men'), slice)
+        self.assertFalse(SalesIndex(self.raw).contiguous)
+
+    def test_date_ordered_positions(self):
+        """Тест позиций по устойчивой сортировке ключей для набора в порядке дат"""
+        index = SalesIndex(self.grouped)
+        positions = index.positions('Shop2', 'Men')
+
+        self.assertFalse(index.contiguous)
+        self.assertTrue((np.diff(positions) > 0).all())
+        self.assertTrue(filter_sales(self.grouped, 'Shop2')['Datasales'].is_monotonic_increasing)
+
+    def test_all_returns_same_frame(self):
+        """Тест выбора без фильтров"""
+        self.assertIs(filter_sales(self.grouped), self.grouped)
+
+    def test_select_many(self):
+        """Тест отбора нескольких магазинов и сегментов"""
+        actual = select_sales(self.grouped, ['Shop1', 'Shop3'], ['Men', 'Women'])
+        expected = self.grouped[self.grouped['Magazin'].isin(['Shop1', 'Shop3'])
+                                & self.grouped['Segment'].isin(['Men', 'Women'])]
+
+        self.assert_same_rows(actual, expected)
+
+    def test_selector_options(self):
+        """Тест списков магазинов и сегментов для селекторов"""
+        index = get_sales_index(self.grouped)
+
+        self.assertEqual(index.magazins, ['Shop1', 'Shop2', 'Shop3'])
+        self.assertEqual(index.segments('Shop1'), ['Kids', 'Men', 'Women'])
+
+    def test_index_cached_by_dataset_id(self):
+        """Тест: копия между перезапусками использует индекс, производный набор - нет"""
+        restored = pickle.loads(pickle.dumps(self.grouped))
+        reordered = self.grouped.sort_values('Magazin')
+
+        self.assertIs(get_sales_index(restored), get_sales_index(self.grouped))
+        self.assertIsNot(get_sales_index(reordered), get_sales_index(self.grouped))
+        self.assertIsNot(get_sales_index(self.grouped.copy()), get_sales_index(self.grouped))
+        self.assert_same_rows(filter_sales(reordered, 'Shop1'), mask_filter(reordered, 'Shop1', 'Все сегменты'))
+        self.assertNotIn('dataset_id', filter_sales(restored, 'Shop1').attrs)
+
+if __name__ == '__main__':
+    unittest.main()
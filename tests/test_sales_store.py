@@ -0,0 +1,75 @@
+"""Unit-тесты для локальной копии таблицы продаж"""
+
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from src.utils.sales_store import (
+    make_store_key,
+    load_local_sales,
+    save_local_sales,
+    merge_incremental
+)
+
+
+class TestSalesStore(unittest.TestCase):
+    """Тесты инкрементальной синхронизации локальной копии"""
+
+    def setUp(self):
+        """Подготовка тестовых данных"""
+        self.store_dir = tempfile.mkdtemp()
+        dates = pd.date_range('2024-01-01', periods=10, freq='D')
+
+        self.local_df = pd.DataFrame({
+            'Magazin': ['Store1'] * 10,
+            'Datasales': dates,
+            'Qty': [1] * 10,
+            'Sum': [100.0] * 10
+        })
+
+    def tearDown(self):
+        """Удаление временного каталога"""
+        shutil.rmtree(self.store_dir, ignore_errors=True)
+
+    def test_store_key_is_stable(self):
+        """Тест стабильности ключа копии"""
+        key1 = make_store_key('10.0.0.1', 'bdop', 'Sales_table')
+        key2 = make_store_key('10.0.0.1', 'BDOP', 'Sales_table')
+
+        self.assertEqual(key1, key2)
+        self.assertNotEqual(key1, make_store_key('10.0.0.2', 'bdop', 'Sales_table'))
+
+    def test_save_and_load_roundtrip(self):
+        """Тест сохранения копии и водяного знака"""
+        meta = save_local_sales(self.local_df, 'sales', store_dir=self.store_dir)
+        loaded, loaded_meta = load_local_sales('sales', store_dir=self.store_dir)
+
+        pd.testing.assert_frame_equal(loaded, self.local_df, check_dtype=False)
+        self.assertEqual(pd.Timestamp(meta['watermark']), pd.Timestamp('2024-01-10'))
+        self.assertEqual(loaded_meta['rows'], 10)
+
+    def test_load_missing_store(self):
+        """Тест отсутствующей копии"""
+        df, meta = load_local_sales('missing', store_dir=self.store_dir)
+
+        self.assertIsNone(df)
+        self.assertIsNone(meta)
+
+    def test_merge_replaces_overlap_window(self):
+        """Тест замены окна перекрытия свежими строками"""
+        fresh = pd.DataFrame({
+            'Magazin': ['Store1'] * 4,
+            'Datasales': pd.date_range('2024-01-08', periods=4, freq='D'),
+            'Qty': [5] * 4,
+            'Sum': [500.0] * 4
+        })
+
+        merged = merge_incremental(self.local_df, fresh, pd.Timestamp('2024-01-08'))
+
+        self.assertEqual(len(merged), 11)
+        self.assertEqual(merged['Qty'].sum(), 7 + 20)
+        self.assertTrue(merged['Datasales'].is_monotonic_increasing)
+
+
+if __name__ == '__main__':
+    unittest.main()
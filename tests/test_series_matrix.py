@@ -0,0 +1,84 @@
+"""Unit-тесты для плотных матриц рядов"""
+
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from src.utils.sales_index import register_sales_dataset
+from src.utils.series_matrix import SeriesMatrix, build_series_matrices, get_series_matrix
+from tests.test_sales_cube import make_sales
+
+
+class TestSeriesMatrix(unittest.TestCase):
+    """Тесты построения, чтения строк и сохранения матриц"""
+
+    def setUp(self):
+        self.df = make_sales()
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_levels_share_calendar(self):
+        """Тест: все уровни выровнены по одному календарю, суммы сходятся"""
+        matrices = build_series_matrices(self.df)
+
+        self.assertEqual(set(matrices), {'shop', 'shop_segment', 'shop_model'})
+        for matrix in matrices.values():
+            self.assertEqual(matrix.values.dtype, np.float32)
+            self.assertTrue(matrix.values.flags['C_CONTIGUOUS'])
+            self.assertEqual(len(matrix.dates), 120)
+            self.assertEqual(matrix.dates[0], pd.Timestamp('2024-01-01'))
+
+        self.assertEqual(len(matrices['shop']), 3)
+        self.assertEqual(list(matrices['shop_segment'].keys.columns), ['Magazin', 'Segment'])
+        # Строка без сегмента не входит в ряды магазин × сегмент
+        self.assertEqual(matrices['shop'].values.sum(), self.df['Qty'].sum())
+        self.assertEqual(matrices['shop_segment'].values.sum(), self.df['Qty'].sum() - self.df.loc[3, 'Qty'])
+
+    def test_rows_match_groupby(self):
+        """Тест: строка ряда - дневные суммы с нулями в днях без продаж"""
+        matrix = build_series_matrices(self.df)['shop_model']
+        days = self.df['Datasales'].dt.normalize()
+        selected = self.df[(self.df['Magazin'] == 'Shop2') & (self.df['Model'] == 'M5')]
+        expected = selected.groupby(days[selected.index])['Qty'].sum().reindex(matrix.dates, fill_value=0)
+
+        frame = matrix.frame('Shop2', 'M5')
+
+        np.testing.assert_array_equal(frame['y'], expected.to_numpy(dtype='float64'))
+        self.assertEqual(list(frame['ds']), list(matrix.dates))
+        self.assertIsNone(matrix.frame('Shop2', 'M999'))
+        self.assertEqual(len(matrix.select(Magazin='Shop2')), 40)
+        with self.assertRaises(ValueError):
+            matrix.select(Segment='Men')
+
+    def test_save_and_memory_map(self):
+        """Тест сохранения и чтения с отображением в память"""
+        original = build_series_matrices(self.df, path=self.path)['shop_segment']
+
+        mapped = SeriesMatrix.load(f"{self.path}/shop_segment", mmap=True)
+        loaded = SeriesMatrix.load(f"{self.path}/shop_segment", mmap=False)
+
+        self.assertIsInstance(mapped.values, np.memmap)
+        self.assertNotIsInstance(loaded.values, np.memmap)
+        np.testing.assert_array_equal(mapped.values, original.values)
+        pd.testing.assert_frame_equal(mapped.keys, original.keys)
+        pd.testing.assert_index_equal(mapped.dates, original.dates)
+        self.assertEqual(mapped.position('Shop3', 'Kids'), original.position('Shop3', 'Kids'))
+
+    def test_missing_columns(self):
+        """Тест ошибки уровня, которого нет в наборе"""
+        with self.assertRaises(ValueError):
+            build_series_matrices(self.df.drop(columns='Model'))
+
+    def test_cached_per_dataset(self):
+        """Тест кэша матрицы набора"""
+        df = register_sales_dataset(self.df)
+
+        self.assertIs(get_series_matrix(df, ['Magazin']), get_series_matrix(df, ['Magazin']))
+        self.assertIsNot(get_series_matrix(df.copy(), ['Magazin']), get_series_matrix(df, ['Magazin']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+"""Unit-тесты для локальных движков источника продаж"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+import numpy as np
+from src.utils.database_loader import (
+    _aggregate_columns,
+    _assemble_sales_frame,
+    _build_page_query,
+    _extract_partitioned,
+    _stream_aggregate_columns,
+    _stream_sales_rows,
+    get_source_pool
+)
+from src.utils.sql_backends import get_dialect, import_error_message
+from benchmarks.synthetic_sales import iter_chunks, write_parquet, write_sqlite
+
+try:
+    import duckdb  # noqa: F401
+    HAS_DUCKDB = True
+except ImportError:
+    HAS_DUCKDB = False
+
+
+class TestDialects(unittest.TestCase):
+    """Тесты диалектов запросов"""
+
+    def test_sqlserver_query_unchanged(self):
+        """Тест исходного вида запроса SQL Server"""
+        query, params = _build_page_query('Sales_table', 12, 100)
+
+        self.assertIn('TOP (%s) WITH TIES', query)
+        self.assertIn('[dbo].[Sales_table]', query)
+        self.assertEqual(params, (100,))
+
+    def test_sqlite_page_query(self):
+        """Тест эквивалента WITH TIES и параметров ? в SQLite"""
+        query, params = _build_page_query('Sales_table', 12, 100, after='x',
+                                          dialect=get_dialect('sqlite'))
+
+        self.assertNotIn('%s', query)
+        self.assertNotIn('[', query)
+        self.assertIn('LIMIT ?', query)
+        self.assertEqual(params, ('x', 'x', 100))
+
+    def test_sqlite_dates_bound_as_text(self):
+        """Тест: даты передаются в SQLite строками ISO, без адаптеров sqlite3"""
+        _, params = _build_page_query('Sales_table', 12, 100, after=datetime(2024, 3, 1, 10, 30),
+                                      dialect=get_dialect('sqlite'))
+
+        self.assertEqual(params, ('2024-03-01 10:30:00', '2024-03-01 10:30:00', 100))
+
+    def test_import_error_message(self):
+        """Тест сообщения об отсутствующем драйвере"""
+        self.assertIn('pip install duckdb', import_error_message('duckdb'))
+
+
+class LocalBackendMixin:
+    """Общие проверки локального движка на синтетических данных"""
+
+    backend = None
+    rows = 3000
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'sales')
+        chunks = iter_chunks(self.rows, chunk_rows=1000, months=3)
+
+        if self.backend == 'sqlite':
+            write_sqlite(self.path, 'Sales_table', chunks)
+        else:
+            write_parquet(self.path, chunks)
+
+        self.pool, self.dialect = get_source_pool(
+            self.backend, '', '', '', '', '', 'Sales_table', self.path
+        )
+
+    def tearDown(self):
+        self.pool.close_all()
+        shutil.rmtree(self.temp_dir)
+
+    def serial(self):
+        with self.pool.connection() as conn:
+            return _stream_sales_rows(conn, 'Sales_table', 12, page_size=700,
+                                      fetch_size=300, dialect=self.dialect)
+
+    def test_serial_pages(self):
+        """Тест постраничной выгрузки всех строк в порядке дат"""
+        df = self.serial()
+
+        self.assertEqual(len(df), self.rows)
+        self.assertTrue(df['Datasales'].is_monotonic_increasing)
+        self.assertEqual(df['Datasales'].dtype, np.dtype('datetime64[ns]'))
+
+    def test_partitioned_matches_serial(self):
+        """Тест совпадения параллельной выгрузки с последовательной"""
+        serial = self.serial()
+
+        for partition_by in ('month', 'shop'):
+            df = _extract_partitioned(self.pool, 'Sales_table', 12,
+                                      partition_by=partition_by, dialect=self.dialect)
+
+            self.assertEqual(len(df), len(serial))
+            self.assertEqual(df['Qty'].sum(), serial['Qty'].sum())
+
+    def test_aggregate_push_down(self):
+        """Тест дневных сумм, посчитанных движком"""
+        serial = self.serial()
+        dimensions = ('Magazin', 'Segment', 'Model')
+
+        with self.pool.connection() as conn:
+            chunks = _stream_aggregate_columns(conn, 'Sales_table', 12, dimensions,
+                                               dialect=self.dialect)
+        daily = _assemble_sales_frame([chunks], _aggregate_columns(dimensions, self.dialect))
+
+        expected = serial.assign(Datasales=serial['Datasales'].dt.normalize()) \
+            .groupby(['Datasales', 'Magazin', 'Segment', 'Model'])['Sum'].sum()
+        actual = daily.set_index(['Datasales', 'Magazin', 'Segment', 'Model'])['Sum']
+
+        self.assertEqual(len(daily), len(expected))
+        np.testing.assert_allclose(actual.sort_index().values, expected.values)
+        self.assertTrue(daily['Datasales'].is_monotonic_increasing)
+
+
+class TestSQLiteBackend(LocalBackendMixin, unittest.TestCase):
+    """Тесты движка SQLite"""
+
+    backend = 'sqlite'
+
+
+@unittest.skipUnless(HAS_DUCKDB, 'duckdb не установлен')
+class TestDuckDBBackend(LocalBackendMixin, unittest.TestCase):
+    """Тесты движка DuckDB над Parquet"""
+
+    backend = 'duckdb'
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+"""Unit-тесты для подбора параметров Prophet"""
+
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from src.config.settings import MODEL_CACHE_CONFIG, TUNING_CONFIG
+from src.models import prophet_model
+from src.models.tuning import (
+    halving_budgets, load_tuning, parameter_grid, successive_halving, tune_series, tuned_params
+)
+
+
+def make_series(periods=120):
+    """Ряд с недельной сезонностью"""
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'ds': pd.date_range('2024-01-01', periods=periods),
+        'y': 50 + 10 * np.sin(2 * np.pi * np.arange(periods) / 7) + rng.normal(0, 2, periods)
+    })
+
+
+def fake_fold(fold, train, test, preprocessing, season, profile=None, params=None):
+    """Фолд без Prophet: ошибка прогноза равна параметру x конфигурации"""
+    predictions = test.assign(yhat=test['y'] + params['x'])
+    return fold, predictions, 1.0, None, 0.0
+
+
+class TestSearchSpace(unittest.TestCase):
+    """Тесты пространства поиска и ступеней"""
+
+    def test_grid_and_samples(self):
+        """Тест полной сетки и случайной выборки"""
+        space = {'a': [1, 2, 3], 'b': ['x', 'y']}
+
+        self.assertEqual(len(parameter_grid(space)), 6)
+        self.assertIn({'a': 2, 'b': 'y'}, parameter_grid(space))
+        self.assertEqual(parameter_grid(space, samples=3), parameter_grid(space, samples=3))
+        self.assertEqual(len(parameter_grid(space, samples=3)), 3)
+
+    def test_budgets(self):
+        """Тест числа фолдов на ступенях"""
+        self.assertEqual(halving_budgets(4, min_folds=1, eta=2), [1, 2, 4])
+        self.assertEqual(halving_budgets(3, min_folds=1, eta=3), [1, 3])
+        self.assertEqual(halving_budgets(2, min_folds=2, eta=3), [2])
+
+
+class TestSuccessiveHalving(unittest.TestCase):
+    """Тесты отбора конфигураций"""
+
+    def test_bad_configs_are_dropped_early(self):
+        """Тест: худшие конфигурации выбывают после первой ступени"""
+        configs = [{'x': x} for x in [4, 1, 3, 0, 2, 5]]
+        progress = []
+
+        with patch('src.models.tuning._backtest_fold', side_effect=fake_fold) as fold:
+            ranking = successive_halving(make_series(), configs, eta=3, min_folds=1, max_folds=3,
+                                         horizon=7, step=7, metric='MAE', workers=1,
+                                         on_progress=lambda done, total: progress.append((done, total)))
+
+        # 6 конфигураций на 1 фолде, затем 2 лучшие еще на 2 фолдах
+        self.assertEqual(fold.call_count, 10)
+        self.assertEqual(progress[-1], (10, 10))
+        self.assertEqual(list(ranking['config'][:2]), [3, 1])
+        self.assertEqual(list(ranking['folds']), [3, 3, 1, 1, 1, 1])
+        self.assertAlmostEqual(ranking['score'].iloc[0], 0.0)
+
+
+class TestTuneSeries(unittest.TestCase):
+    """Тесты подбора и сохранения параметров ряда"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.patches = [
+            patch.dict(MODEL_CACHE_CONFIG, {'path': f"{self.cache_dir}/models"}),
+            patch.dict(TUNING_CONFIG, {
+                'path': f"{self.cache_dir}/tuning", 'eta': 2, 'min_folds': 1, 'max_folds': 2,
+                'horizon': 7, 'step': 7, 'retune_top': 2, 'workers': 1,
+                'space': {'changepoint_prior_scale': [0.01, 0.5], 'seasonality_mode': ['additive', 'multiplicative']}
+            })
+        ]
+        for item in self.patches:
+            item.start()
+        prophet_model._model_cache.clear()
+
+    def tearDown(self):
+        for item in self.patches:
+            item.stop()
+        prophet_model._model_cache.clear()
+        shutil.rmtree(self.cache_dir)
+
+    def test_tuning_is_saved_and_retuned_cheaply(self):
+        """Тест: неизменный ряд не переобучается, пополненный - только лучшие конфигурации"""
+        data = make_series()
+        more = make_series(127)
+
+        with patch('src.models.prophet_model.fit_prophet_forecast',
+                   side_effect=prophet_model.fit_prophet_forecast) as fit:
+            tuning = tune_series(data, ('Shop1', 'Men'))
+            full_fits = fit.call_count
+            again = tune_series(data, ('Shop1', 'Men'))
+            same_fits = fit.call_count - full_fits
+            retuned = tune_series(more, ('Shop1', 'Men'))
+            retune_fits = fit.call_count - full_fits
+
+        # 4 конфигурации на 1 фолде, 2 лучшие еще на 1 фолде
+        self.assertEqual(full_fits, 6)
+        self.assertEqual(same_fits, 0)
+        self.assertEqual(again, tuning)
+        # 2 лучшие прежние конфигурации на 2 фолдах нового ряда: ранний фолд
+        # совпадает с последним фолдом прежнего подбора и берется из кэша моделей
+        self.assertEqual(retune_fits, 2)
+        self.assertEqual(len(retuned['ranking']), 2)
+
+        self.assertIn(tuning['params'], parameter_grid())
+        self.assertEqual(tuned_params(('Shop1', 'Men')), retuned['params'])
+        self.assertEqual(load_tuning(('Shop1', 'Men'))['data_end'][:10], '2024-05-06')
+        self.assertIsNone(tuned_params(('Shop1', 'Women')))
+
+
+if __name__ == '__main__':
+    unittest.main()